@@ -0,0 +1,53 @@
+# audio_cache.py - TTS 음성 파일 캐시 (SQLite)
+# 스크립트 + 음성 이름 + 오디오 설정의 해시 -> 이미 올려 둔 Google Drive 파일 (file_id, URL, 파일명)
+# URL 업데이트나 마이그레이션 재실행처럼 스크립트가 그대로면 TTS 합성과 Drive 업로드를 다시 하지 않음
+
+import os
+from typing import Optional, Dict
+from dotenv import load_dotenv
+from lru_store import LRUStore, hash_key, shared_instance
+
+# 환경 변수 로드
+load_dotenv()
+
+AUDIO_CACHE_ENABLED = os.getenv('AUDIO_CACHE_ENABLED', 'true').lower() == 'true'
+AUDIO_CACHE_PATH = os.getenv('AUDIO_CACHE_PATH', 'audio_cache.db')
+# 이 기간 동안 사용되지 않은 항목은 삭제 (Drive 파일은 그대로 둠)
+AUDIO_CACHE_MAX_AGE_DAYS = float(os.getenv('AUDIO_CACHE_MAX_AGE_DAYS', '180'))
+# 최대 항목 수 (넘으면 오래 안 쓴 항목부터 삭제)
+AUDIO_CACHE_MAX_ENTRIES = int(os.getenv('AUDIO_CACHE_MAX_ENTRIES', '20000'))
+
+def audio_key(script: str, voice_name: str, audio_config: str) -> str:
+    return hash_key(voice_name, audio_config, script)
+
+class AudioCache(LRUStore):
+    """Drive 파일은 지우지 않고 캐시 항목만 정리"""
+
+    def __init__(self, path: str = AUDIO_CACHE_PATH, max_age_days: float = AUDIO_CACHE_MAX_AGE_DAYS,
+                 max_entries: int = AUDIO_CACHE_MAX_ENTRIES):
+        super().__init__(path, "audio", {
+            "voice": "TEXT NOT NULL",
+            "file_id": "TEXT NOT NULL",
+            "audio_url": "TEXT NOT NULL",
+            "filename": "TEXT NOT NULL"
+        }, max_age_days, max_entries)
+
+    def get(self, script: str, voice_name: str, audio_config: str) -> Optional[Dict]:
+        """저장된 파일 정보 반환 (없으면 None), 적중/미스 집계"""
+        row = self.lookup(audio_key(script, voice_name, audio_config))
+        return {"file_id": row["file_id"], "audio_url": row["audio_url"], "filename": row["filename"]} if row else None
+
+    def put(self, script: str, voice_name: str, audio_config: str, file_id: str, audio_url: str, filename: str):
+        self.store(audio_key(script, voice_name, audio_config), voice=voice_name, file_id=file_id,
+                   audio_url=audio_url, filename=filename)
+
+_shared_audio_cache = shared_instance(AudioCache)
+
+def get_audio_cache() -> Optional[AudioCache]:
+    """프로세스 전체에서 공유하는 음성 파일 캐시 (AUDIO_CACHE_ENABLED=false면 None)"""
+    return _shared_audio_cache() if AUDIO_CACHE_ENABLED else None
+
+def print_audio_cache_stats():
+    cache = get_audio_cache()
+    if cache is not None:
+        cache.print_stats("🎙️ 음성 캐시")
@@ -0,0 +1,76 @@
+# bench_gemini_batch.py - Gemini 일괄 요약 벤치마크 (한 건씩 vs 묶음)
+# 스텁 클라이언트로 Gemini 지연(요청당 고정 비용 + 사이트당 생성 시간)과 마이그레이션의 처리 간격을 흉내내어
+# 묶음 크기별 분당 처리 URL 수를 비교. 실제로는 SCALE 배율로 줄여서 기다리고 결과는 원래 시간으로 환산
+#
+# 사용법: python bench_gemini_batch.py [URL 수] [요청당 지연(초)] [사이트당 생성 시간(초)] [처리 간격(초)]
+
+import contextlib
+import io
+import re
+import sys
+import time
+import google.ai.generativelanguage as glm
+import gemini_client
+import sub1
+
+SCALE = 0.01
+CALL_LATENCY = 3.0
+PER_SITE_SECONDS = 8.0
+
+class LatencyStubClient:
+    def __init__(self, api_key):
+        pass
+
+    def generate_content(self, request, timeout=None):
+        prompt = request.contents[0].parts[0].text
+        urls = re.findall(r'^URL: (https://site\d+\.example)$', prompt, re.M)
+        time.sleep((CALL_LATENCY + PER_SITE_SECONDS * len(urls)) * SCALE)
+        blocks = [
+            f"=== 사이트 {number} ===\n사이트 이름: Site {number}\nURL: {url}\n평가/효용성: 보통\n요약 설명: 요약"
+            for number, url in enumerate(urls, 1)
+        ]
+        return glm.GenerateContentResponse(candidates=[{"content": {"parts": [{"text": "\n\n".join(blocks)}]}}])
+
+def run(pages, batch_size, delay):
+    start = time.perf_counter()
+    for i in range(0, len(pages), batch_size):
+        batch = pages[i:i + batch_size]
+        if batch_size == 1:
+            sub1.gemini_extract_notion_fields(batch[0][1], batch[0][0], "key", use_cache=False)
+        else:
+            sub1.gemini_extract_notion_fields_batch(batch, "key", use_cache=False)
+        if i + batch_size < len(pages):
+            time.sleep(delay * SCALE)
+    return (time.perf_counter() - start) / SCALE
+
+def main():
+    global CALL_LATENCY, PER_SITE_SECONDS
+    url_count = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    CALL_LATENCY = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    PER_SITE_SECONDS = float(sys.argv[3]) if len(sys.argv) > 3 else 8.0
+    delay = float(sys.argv[4]) if len(sys.argv) > 4 else 30.0
+
+    gemini_client._make_client = LatencyStubClient
+    pages = [(f"https://site{i}.example", f"사이트 {i}의 본문입니다. " * 50) for i in range(url_count)]
+
+    print("=" * 60)
+    print(f"Gemini 일괄 요약 벤치마크 (URL {url_count}건, 요청당 {CALL_LATENCY}초, "
+          f"사이트당 {PER_SITE_SECONDS}초, 처리 간격 {delay}초)")
+    print("=" * 60)
+
+    # 요약 함수의 디버그 출력은 버림
+    baseline = None
+    results = []
+    for batch_size in (1, 2, 4, 8):
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = run(pages, batch_size, delay)
+        per_minute = url_count / elapsed * 60
+        baseline = baseline or per_minute
+        results.append((batch_size, elapsed, per_minute))
+
+    print(f"{'묶음 크기':<10} {'총 시간(분)':>12} {'분당 URL':>10} {'배율':>8}")
+    for batch_size, elapsed, per_minute in results:
+        print(f"{batch_size:<10} {elapsed / 60:>12.1f} {per_minute:>10.2f} {per_minute / baseline:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
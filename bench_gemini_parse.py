@@ -0,0 +1,66 @@
+# bench_gemini_parse.py - Gemini 응답 파싱 벤치마크 ("키: 값" 줄 파서 vs JSON 구조화 파서)
+# bench_corpus/gemini_responses/ 의 기록된 응답(같은 내용의 줄 형식 / JSON 형식 응답과 기대값)에 대해
+# 응답당 파싱 시간과 필드 손실률(기대값과 다르게 파싱된 필드 비율)을 비교
+#
+# 사용법: python bench_gemini_parse.py [반복 횟수]
+
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+import sub1
+from gemini_schema import FIELD_NAMES
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_corpus', 'gemini_responses')
+
+def normalize(value):
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    return " ".join(str(value).split())
+
+def lost_fields(fields: dict, expected: dict) -> list:
+    return [key for key, name in FIELD_NAMES.items() if normalize(fields.get(name, "")) != normalize(expected[key])]
+
+def measure(mode: str, response: str, url: str, repeat: int):
+    best = float('inf')
+    # 파서의 디버그 출력도 비용에 포함되도록 버퍼로만 돌림
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fields = sub1._notion_fields_from_response(response, url, mode)
+            best = min(best, time.perf_counter() - start)
+    return best, fields
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    samples = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, '*.json'))):
+        with open(path, encoding='utf-8') as f:
+            samples.append((os.path.basename(path), json.load(f)))
+
+    print("=" * 80)
+    print(f"Gemini 응답 파싱 벤치마크 (응답 {len(samples)}개, 반복 {repeat}회 중 최소 시간)")
+    print("=" * 80)
+    print(f"{'응답':<32} {'파서':<8} {'시간(ms)':>10} {'손실 필드':<30}")
+
+    totals = {"text": [0.0, 0], "json": [0.0, 0]}
+    for name, sample in samples:
+        for mode, key in (("text", "text_response"), ("json", "json_response")):
+            elapsed, fields = measure(mode, sample[key], sample["url"], repeat)
+            lost = lost_fields(fields, sample["expected"])
+            totals[mode][0] += elapsed
+            totals[mode][1] += len(lost)
+            print(f"{name:<32} {mode:<8} {elapsed * 1000:>10.3f} {', '.join(lost) or '-':<30}")
+            name = ""
+
+    field_count = len(samples) * len(FIELD_NAMES)
+    print("-" * 80)
+    for mode, (elapsed, lost) in totals.items():
+        print(f"{mode:<8} 응답당 평균 {elapsed / len(samples) * 1000:.3f}ms, "
+              f"필드 손실률 {lost / field_count * 100:.1f}% ({lost}/{field_count})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_google_clients.py - TTS/Drive 클라이언트 재사용 벤치마크
+# 호출마다 TextToSpeechClient 생성 + 서비스 계정 파일 읽기 + build('drive', 'v3')를 하던 방식과
+# google_clients 홀더(한 번만 생성)를 쓰는 방식의 호출당 준비 시간을 비교
+# 클라이언트는 임시로 만든 서비스 계정 키로 실제 생성하고, TTS/Drive 요청 자체는 스텁으로 바꿔 네트워크 없이 측정
+#
+# 사용법: python bench_google_clients.py [호출 수]
+
+import json
+import os
+import sys
+import tempfile
+import time
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+import drive_publisher
+import google_clients
+import sub3
+
+class StubResponse:
+    audio_content = b"\xff\xfb" * 1000
+
+def stub_call_upstream(upstream, key, func, idempotent=True, tokens=0):
+    """실제 요청 대신 업스트림별 스텁 응답"""
+    if upstream == "tts":
+        return StubResponse()
+    return {"id": "stub-file-id"}
+
+def write_fake_service_account(path):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    with open(path, "w") as f:
+        json.dump({
+            "type": "service_account", "project_id": "bench", "private_key_id": "bench",
+            "private_key": pem.decode(), "client_email": "bench@bench.iam.gserviceaccount.com",
+            "client_id": "1", "token_uri": "https://oauth2.googleapis.com/token"
+        }, f)
+
+def setup_per_call():
+    """예전 방식 - 호출마다 import, 클라이언트 생성, 인증 파일 읽기, discovery 처리"""
+    from google.cloud import texttospeech
+    from googleapiclient.discovery import build
+    from google.oauth2.service_account import Credentials
+    texttospeech.TextToSpeechClient()
+    creds = Credentials.from_service_account_file(os.environ['GOOGLE_APPLICATION_CREDENTIALS'],
+                                                  scopes=['https://www.googleapis.com/auth/drive.file'])
+    build('drive', 'v3', credentials=creds)
+
+def setup_shared():
+    clients = google_clients.get_google_clients()
+    clients.tts()
+    clients.drive()
+
+def run(label, func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    per_call = (time.perf_counter() - start) / calls * 1000
+    print(f"{label:<28} 호출당 {per_call:.2f}ms")
+    return per_call
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    with tempfile.TemporaryDirectory() as tmp:
+        key_file = os.path.join(tmp, "service_account.json")
+        write_fake_service_account(key_file)
+        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = key_file
+
+        print("=" * 50)
+        print(f"TTS/Drive 클라이언트 재사용 벤치마크 (호출 {calls}회)")
+        print("=" * 50)
+
+        # 처음 import 비용은 양쪽 모두 한 번만 내도록 미리 불러 둠
+        setup_per_call()
+        before = run("매번 생성 (예전 방식)", setup_per_call, calls)
+        after = run("공용 홀더", setup_shared, calls)
+        print(f"\n호출당 절감: {before - after:.2f}ms ({(1 - after / before) * 100:.1f}%)")
+
+        # 스텁 요청으로 process_script_to_tts_google_drive 전체 경로도 확인
+        # 음성 캐시는 끄고 매번 합성/업로드 경로를 지나게 함
+        original = (sub3.call_upstream, drive_publisher.call_upstream, sub3.get_audio_cache)
+        sub3.call_upstream = drive_publisher.call_upstream = stub_call_upstream
+        sub3.get_audio_cache = lambda: None
+        try:
+            stdout = sys.stdout
+            sys.stdout = open(os.devnull, "w")
+            try:
+                start = time.perf_counter()
+                for _ in range(calls):
+                    assert sub3.process_script_to_tts_google_drive("Hello there.", site_name="Bench")["success"]
+                total = (time.perf_counter() - start) / calls * 1000
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+        finally:
+            sub3.call_upstream, drive_publisher.call_upstream, sub3.get_audio_cache = original
+        print(f"{'TTS→Drive 전체 (스텁 요청)':<28} 호출당 {total:.2f}ms")
+        print(f"홀더 통계: {google_clients.get_google_clients().get_stats()}")
+
+if __name__ == "__main__":
+    main()
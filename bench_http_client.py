@@ -0,0 +1,84 @@
+# bench_http_client.py - 공용 HTTP 세션(커넥션 재사용) 벤치마크
+# 로컬 스텁 서버에 URL 1건 처리 시 나가는 요청(Airtable 조회/생성/수정 + 텔레그램)을 흉내내어
+# 매번 새 연결을 맺는 requests.get/post 방식과 공용 세션 방식의 URL당 지연 시간을 비교
+#
+# 사용법: python bench_http_client.py [URL 수] [연결당 핸드셰이크 지연(ms)]
+# 핸드셰이크 지연은 실제 API 서버와의 TLS 핸드셰이크 비용을 흉내내기 위한 값
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from http_client import PooledSession
+
+HANDSHAKE_DELAY = 0.0
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # 새 연결마다 한 번만 발생하는 비용
+        time.sleep(HANDSHAKE_DELAY)
+        super().setup()
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        body = b'{"id": "rec123", "fields": {}, "records": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+    do_PATCH = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+def simulate_url(http, base):
+    """URL 1건 처리 시의 외부 API 호출 패턴"""
+    http.get(f"{base}/v0/app/table/rec123", timeout=5)
+    http.post(f"{base}/v0/app/table", json={"fields": {"URL": "https://example.com"}}, timeout=5)
+    http.patch(f"{base}/v0/app/table/rec123", json={"fields": {"TTS_URL": "x"}}, timeout=5)
+    http.post(f"{base}/bot123/sendMessage", data={"chat_id": "1", "text": "hi"}, timeout=5)
+
+def run(label, http, base, url_count):
+    start = time.perf_counter()
+    for _ in range(url_count):
+        simulate_url(http, base)
+    elapsed = time.perf_counter() - start
+    per_url = elapsed / url_count * 1000
+    print(f"{label:<20} 총 {elapsed:.3f}초, URL당 {per_url:.2f}ms")
+    return per_url
+
+def main():
+    global HANDSHAKE_DELAY
+    url_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    HANDSHAKE_DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    print("=" * 50)
+    print(f"HTTP 커넥션 재사용 벤치마크 (URL {url_count}건, 핸드셰이크 {HANDSHAKE_DELAY * 1000:.0f}ms)")
+    print("=" * 50)
+
+    bare = run("requests 직접 호출", requests, base, url_count)
+    session = PooledSession()
+    pooled = run("공용 세션", session, base, url_count)
+
+    print(f"\nURL당 절감: {bare - pooled:.2f}ms ({(1 - pooled / bare) * 100:.1f}%)")
+    for host, stat in session.get_stats().items():
+        print(f"{host}: 요청 {stat['requests']}회, 새 연결 {stat['new_connections']}회, 재사용 {stat['reused']}회")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
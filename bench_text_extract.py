@@ -0,0 +1,60 @@
+# bench_text_extract.py - 본문 추출 벤치마크 (기존 find_all 방식 vs text_extract)
+# bench_corpus/ 의 HTML 페이지(랜딩 페이지, 히어로 헤더 랜딩 페이지, 블로그, 문서, SPA, 깊은 중첩)에 대해
+# 처리 시간, 최대 메모리(tracemalloc), 출력 크기를 비교
+#
+# 사용법: python bench_text_extract.py [반복 횟수]
+
+import glob
+import os
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from text_extract import extract_main_text, HTML_PARSER
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_corpus')
+
+def legacy_extract(html: str) -> str:
+    """기존 sub1.extract_text_from_url의 추출 방식 (비교용)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.find('title')
+    title_text = title.get_text() if title else ''
+    content_tags = soup.find_all(['p', 'article', 'div', 'section'])
+    content_text = ' '.join([tag.get_text().strip() for tag in content_tags])
+    return f"{title_text}\n\n{content_text}".strip()
+
+def measure(func, html: str, repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(html)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(output)
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    extractors = [("기존 find_all", legacy_extract), ("text_extract (html.parser)", lambda html: extract_main_text(html, 'html.parser'))]
+    if HTML_PARSER == 'lxml':
+        extractors.append(("text_extract (lxml)", lambda html: extract_main_text(html, 'lxml')))
+
+    print("=" * 90)
+    print(f"본문 추출 벤치마크 (반복 {repeat}회 중 최소 시간)")
+    print("=" * 90)
+    print(f"{'페이지':<26} {'추출기':<28} {'시간(ms)':>10} {'최대 메모리(MB)':>16} {'출력(자)':>12}")
+
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        name = f"{os.path.basename(path)} ({len(html) // 1024}KB)"
+        for label, func in extractors:
+            elapsed, peak, size = measure(func, html, repeat)
+            print(f"{name:<26} {label:<28} {elapsed * 1000:>10.1f} {peak / 1024 / 1024:>16.1f} {size:>12,}")
+            name = ""
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# crawl_cache.py - 크롤링 결과 디스크 캐시 (SQLite)
+# 정규화된 URL -> ETag / Last-Modified / HTML 해시, HTML과 추출 텍스트는 해시로 저장(같은 내용은 한 번만)
+# 재처리·마이그레이션 재실행 시 조건부 요청(If-None-Match / If-Modified-Since)으로 304면 다운로드와 파싱을 생략
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict
+from dotenv import load_dotenv
+from url_utils import canonicalize_url
+
+# 환경 변수 로드
+load_dotenv()
+
+CRAWL_CACHE_ENABLED = os.getenv('CRAWL_CACHE_ENABLED', 'true').lower() == 'true'
+CRAWL_CACHE_PATH = os.getenv('CRAWL_CACHE_PATH', 'crawl_cache.db')
+# 이 시간 안에는 서버에 묻지 않고 캐시를 그대로 사용, 지나면 조건부 요청으로 재검증
+CRAWL_CACHE_TTL_HOURS = float(os.getenv('CRAWL_CACHE_TTL_HOURS', '24'))
+# 이 기간 동안 사용되지 않은 항목은 삭제
+CRAWL_CACHE_MAX_AGE_DAYS = float(os.getenv('CRAWL_CACHE_MAX_AGE_DAYS', '30'))
+# 저장된 HTML 총 크기 제한 (넘으면 오래 안 쓴 항목부터 삭제)
+CRAWL_CACHE_MAX_MB = float(os.getenv('CRAWL_CACHE_MAX_MB', '200'))
+
+class CrawlCache:
+    def __init__(self, path: str = CRAWL_CACHE_PATH, ttl_hours: float = CRAWL_CACHE_TTL_HOURS,
+                 max_age_days: float = CRAWL_CACHE_MAX_AGE_DAYS, max_mb: float = CRAWL_CACHE_MAX_MB):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_age = max_age_days * 86400
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evicted": 0}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS contents (
+                content_hash TEXT PRIMARY KEY,
+                html TEXT NOT NULL,
+                text TEXT,
+                text_version TEXT,
+                size INTEGER NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        캐시 항목 조회 (없으면 None)
+        반환값의 "fresh"가 True면 재검증 없이 사용 가능
+        """
+        key = canonicalize_url(url)
+        with self.lock:
+            row = self.conn.execute("""
+                SELECT e.content_hash, e.etag, e.last_modified, e.fetched_at, c.html, c.text, c.text_version
+                FROM entries e JOIN contents c ON e.content_hash = c.content_hash
+                WHERE e.url = ?
+            """, (key,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "content_hash": row[0],
+            "etag": row[1],
+            "last_modified": row[2],
+            "fresh": time.time() - row[3] < self.ttl,
+            "html": row[4],
+            "text": row[5],
+            "text_version": row[6]
+        }
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict:
+        """재검증용 요청 헤더"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, html: str, text: str, text_version: str, etag: str = None, last_modified: str = None):
+        """새로 받은 페이지 저장"""
+        key = canonicalize_url(url)
+        content_hash = hashlib.sha256(html.encode('utf-8', 'replace')).hexdigest()
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO contents (content_hash, html, text, text_version, size) VALUES (?, ?, ?, ?, ?)",
+                (content_hash, html, text, text_version, len(html))
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (url, content_hash, etag, last_modified, fetched_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, content_hash, etag, last_modified, now, now)
+            )
+            self.conn.commit()
+        self.evict()
+
+    def update_text(self, content_hash: str, text: str, text_version: str):
+        """추출기 버전이 바뀐 경우 저장된 HTML로 다시 뽑은 텍스트 저장"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE contents SET text = ?, text_version = ? WHERE content_hash = ?",
+                (text, text_version, content_hash)
+            )
+            self.conn.commit()
+
+    def touch(self, url: str, revalidated: bool = False):
+        """캐시를 사용했음을 기록 (재검증 성공 시 fetched_at도 갱신)"""
+        key = canonicalize_url(url)
+        now = time.time()
+        with self.lock:
+            if revalidated:
+                self.conn.execute("UPDATE entries SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, key))
+            else:
+                self.conn.execute("UPDATE entries SET last_access = ? WHERE url = ?", (now, key))
+            self.conn.commit()
+
+    def record(self, outcome: str):
+        """hits / revalidated / misses 집계"""
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def evict(self):
+        """오래 안 쓴 항목 삭제 + 총 크기 제한"""
+        with self.lock:
+            removed = self.conn.execute(
+                "DELETE FROM entries WHERE last_access < ?", (time.time() - self.max_age,)
+            ).rowcount
+            self.conn.execute(
+                "DELETE FROM contents WHERE content_hash NOT IN (SELECT content_hash FROM entries)"
+            )
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self.conn.execute("""
+                    SELECT e.url, c.size FROM entries e JOIN contents c ON e.content_hash = c.content_hash
+                    ORDER BY e.last_access, e.rowid
+                """).fetchall()
+                for url, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                    total -= size
+                    removed += 1
+                self.conn.execute(
+                    "DELETE FROM contents WHERE content_hash NOT IN (SELECT content_hash FROM entries)"
+                )
+            self.conn.commit()
+            self.stats["evicted"] += removed
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            stats["bytes"] = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_crawl_cache = None
+_crawl_cache_lock = threading.Lock()
+
+def get_crawl_cache() -> Optional[CrawlCache]:
+    """프로세스 전체에서 공유하는 크롤링 캐시 (CRAWL_CACHE_ENABLED=false면 None)"""
+    global _crawl_cache
+    if not CRAWL_CACHE_ENABLED:
+        return None
+    with _crawl_cache_lock:
+        if _crawl_cache is None:
+            _crawl_cache = CrawlCache()
+        return _crawl_cache
+
+def print_crawl_cache_stats():
+    cache = get_crawl_cache()
+    if cache is None:
+        return
+    stats = cache.get_stats()
+    print(f"🗂️ 크롤링 캐시: 적중 {stats['hits']}회, 재검증(304) {stats['revalidated']}회, "
+          f"미스 {stats['misses']}회, 적중률 {stats['hit_rate'] * 100:.1f}%, "
+          f"항목 {stats['entries']}개, {stats['bytes'] / 1024 / 1024:.1f}MB")
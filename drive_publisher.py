@@ -0,0 +1,146 @@
+# drive_publisher.py - TTS 음성 파일 Google Drive 업로드 / 공개 권한 부여
+# 작은 MP3는 재개 가능(resumable) 업로드 세션을 열지 않고 multipart 요청 한 번으로 올림
+# 공개 권한은 파일마다 따로 요청하지 않고, 잠깐 동안 모인 요청을 Drive 배치 HTTP 요청 하나로 묶어 보냄
+# GOOGLE_DRIVE_FOLDER_SHARED=true면 폴더가 이미 "링크가 있는 모든 사용자"에게 공유된 것으로 보고 권한 요청 자체를 하지 않음
+
+import io
+import os
+import threading
+from typing import Dict, List
+from dotenv import load_dotenv
+from resilience import call_upstream
+
+# 환경 변수 로드
+load_dotenv()
+
+GOOGLE_DRIVE_FOLDER_ID = os.getenv('GOOGLE_DRIVE_FOLDER_ID', 'root')
+GOOGLE_DRIVE_FOLDER_SHARED = os.getenv('GOOGLE_DRIVE_FOLDER_SHARED', 'false').lower() == 'true'
+# 이보다 큰 파일만 재개 가능 업로드 (multipart 업로드는 5MB까지)
+DRIVE_SIMPLE_UPLOAD_MAX_BYTES = int(os.getenv('DRIVE_SIMPLE_UPLOAD_MAX_BYTES', str(5 * 1024 * 1024)))
+# 권한 요청을 모으는 시간(초) / 배치 하나에 넣는 최대 요청 수 (Drive 배치 한도 100)
+DRIVE_PERMISSION_BATCH_SECONDS = float(os.getenv('DRIVE_PERMISSION_BATCH_SECONDS', '0.5'))
+DRIVE_PERMISSION_BATCH_SIZE = min(100, int(os.getenv('DRIVE_PERMISSION_BATCH_SIZE', '100')))
+
+PUBLIC_READER = {'role': 'reader', 'type': 'anyone'}
+
+class PermissionBatcher:
+    """
+    동시에 들어온 공개 권한 요청을 배치 요청으로 묶음
+    배치가 비어 있을 때 들어온 호출이 아직 업로드 중인 파일의 요청을 최대 batch_seconds 동안(또는 batch_size가 찰 때까지)
+    기다렸다가 모인 요청을 보내고, 나머지 호출은 자기 요청의 결과가 나올 때까지 기다림 (돌아오면 링크가 바로 열림)
+    다른 업로드가 없으면 기다리지 않고 바로 보냄
+    """
+
+    def __init__(self, batch_seconds: float = DRIVE_PERMISSION_BATCH_SECONDS, batch_size: int = DRIVE_PERMISSION_BATCH_SIZE):
+        self.batch_seconds = batch_seconds
+        self.batch_size = max(1, batch_size)
+        self.cond = threading.Condition()
+        self.pending = []
+        # expect()로 알린 뒤 아직 grant()/cancel()하지 않은 업로드 수
+        self.uploading = 0
+        self.stats = {"grants": 0, "batches": 0, "errors": 0}
+
+    def expect(self):
+        """곧 grant()할 업로드가 시작됨 (먼저 보내는 배치가 이 요청을 기다림)"""
+        with self.cond:
+            self.uploading += 1
+
+    def cancel(self):
+        """expect()한 업로드가 실패해 grant()하지 않음"""
+        with self.cond:
+            self.uploading = max(0, self.uploading - 1)
+            self.cond.notify_all()
+
+    def grant(self, drive_service, file_id: str):
+        """file_id를 링크가 있는 모든 사용자에게 공개 (실패하면 예외)"""
+        entry = {"file_id": file_id, "done": threading.Event(), "error": None}
+        with self.cond:
+            self.uploading = max(0, self.uploading - 1)
+            self.pending.append(entry)
+            leader = len(self.pending) == 1
+            self.cond.notify_all()
+        if leader:
+            with self.cond:
+                self.cond.wait_for(lambda: len(self.pending) >= self.batch_size or self.uploading == 0,
+                                   timeout=self.batch_seconds)
+                entries, self.pending = self.pending, []
+            for start in range(0, len(entries), self.batch_size):
+                self._send(drive_service, entries[start:start + self.batch_size])
+        entry["done"].wait()
+        if entry["error"] is not None:
+            raise entry["error"]
+
+    def _send(self, drive_service, entries: List[Dict]):
+        def callback(request_id, response, exception):
+            if exception is not None:
+                entries[int(request_id)]["error"] = exception
+
+        try:
+            batch = drive_service.new_batch_http_request(callback=callback)
+            for index, entry in enumerate(entries):
+                batch.add(drive_service.permissions().create(fileId=entry["file_id"], body=PUBLIC_READER, fields='id'),
+                          request_id=str(index))
+            # 같은 권한을 다시 만들어도 결과는 같으므로 재시도 가능
+            call_upstream("drive", None, batch.execute)
+        except Exception as e:
+            for entry in entries:
+                entry["error"] = e
+        failed = sum(1 for entry in entries if entry["error"] is not None)
+        with self.cond:
+            self.stats["grants"] += len(entries)
+            self.stats["batches"] += 1
+            self.stats["errors"] += failed
+        print(f"🔓 Drive 공개 권한 {len(entries)}건을 배치 1회로 요청" + (f" (실패 {failed}건)" if failed else ""))
+        for entry in entries:
+            entry["done"].set()
+
+    def get_stats(self) -> Dict:
+        with self.cond:
+            return dict(self.stats)
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_permission_batcher() -> PermissionBatcher:
+    """프로세스 전체에서 공유하는 공개 권한 배치"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = PermissionBatcher()
+        return _batcher
+
+def publish_audio(drive_service, audio_content: bytes, filename: str, folder_id: str = GOOGLE_DRIVE_FOLDER_ID,
+                  folder_shared: bool = GOOGLE_DRIVE_FOLDER_SHARED) -> str:
+    """MP3를 folder_id 폴더에 올리고 링크로 열 수 있게 한 뒤 file_id 반환"""
+    from googleapiclient.http import MediaIoBaseUpload
+
+    batcher = None if folder_shared else get_permission_batcher()
+    media = MediaIoBaseUpload(
+        io.BytesIO(audio_content),
+        mimetype='audio/mpeg',
+        resumable=len(audio_content) > DRIVE_SIMPLE_UPLOAD_MAX_BYTES
+    )
+    # 업로드는 다시 보내면 파일이 두 개 생길 수 있으므로 요청이 나가지 않았을 때만 재시도
+    if batcher is not None:
+        batcher.expect()
+    try:
+        file = call_upstream("drive", None, lambda: drive_service.files().create(
+            body={'name': filename, 'parents': [folder_id]},
+            media_body=media,
+            fields='id'
+        ).execute(), idempotent=False)
+    except Exception:
+        if batcher is not None:
+            batcher.cancel()
+        raise
+    file_id = file.get('id')
+
+    # 공유된 폴더의 파일은 폴더 권한을 물려받음
+    if batcher is not None:
+        batcher.grant(drive_service, file_id)
+    return file_id
+
+def print_drive_publisher_stats():
+    stats = get_permission_batcher().get_stats()
+    if stats["grants"]:
+        print(f"🔓 Drive 공개 권한: {stats['grants']}건, 배치 {stats['batches']}회, 실패 {stats['errors']}건")
@@ -0,0 +1,123 @@
+# gemini_client.py - Gemini 모델 레지스트리
+# (api_key, 모델 이름)별로 모델 객체를, api_key별로 gRPC 클라이언트(채널)를 한 번만 만들어 프로세스 전체에서 재사용
+# genai.configure()는 전역 설정이라 호출마다 바꾸지 않고, 클라이언트에 키를 직접 넣어 만듦
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Dict, Optional
+import google.ai.generativelanguage as glm
+from google.generativeai.types import generation_types
+from dotenv import load_dotenv
+from prompt_builder import estimate_tokens
+from resilience import call_upstream, call_upstream_async
+
+# 환경 변수 로드
+load_dotenv()
+
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-pro')
+# 호출 1회 제한 시간 (초)
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '120'))
+
+# 설치된 라이브러리 버전의 GenerationConfig가 아는 설정만 보냄 (예: 구버전에는 response_mime_type 없음)
+SUPPORTED_GENERATION_CONFIG = set(glm.GenerationConfig.meta.fields)
+
+def _make_client(api_key: str):
+    return glm.GenerativeServiceClient(client_options={"api_key": api_key})
+
+def _make_async_client(api_key: str):
+    return glm.GenerativeServiceAsyncClient(client_options={"api_key": api_key})
+
+class GeminiModel:
+    """레지스트리가 만든 클라이언트로 generate_content를 호출하는 모델 (요청마다 timeout 지정 가능)"""
+
+    def __init__(self, registry: "GeminiRegistry", api_key: str, model_name: str):
+        self.registry = registry
+        self.api_key = api_key
+        self.model_name = model_name if "/" in model_name else f"models/{model_name}"
+
+    def _request(self, prompt: str, generation_config: Optional[Dict]) -> glm.GenerateContentRequest:
+        request = glm.GenerateContentRequest(
+            model=self.model_name,
+            contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])]
+        )
+        config = {key: value for key, value in (generation_config or {}).items() if key in SUPPORTED_GENERATION_CONFIG}
+        if config:
+            request.generation_config = glm.GenerationConfig(**config)
+        return request
+
+    def generate_content(self, prompt: str, timeout: float = None, generation_config: Dict = None):
+        """동기 호출 (응답의 .text로 결과 사용) - API 키별 RPM/TPM 한도, 일시적 오류 재시도, 서킷 브레이커 적용"""
+        client = self.registry.client(self.api_key)
+        request = self._request(prompt, generation_config)
+        response = call_upstream("gemini", self.api_key, lambda: client.generate_content(request, timeout=timeout or GEMINI_TIMEOUT),
+                                  tokens=estimate_tokens(prompt))
+        return generation_types.GenerateContentResponse.from_response(response)
+
+    async def generate_content_async(self, prompt: str, timeout: float = None, generation_config: Dict = None):
+        """asyncio 호출 - 현재 이벤트 루프의 비동기 클라이언트 사용"""
+        client = self.registry.async_client(self.api_key)
+        request = self._request(prompt, generation_config)
+        response = await call_upstream_async("gemini", self.api_key, lambda: client.generate_content(request, timeout=timeout or GEMINI_TIMEOUT),
+                                              tokens=estimate_tokens(prompt))
+        return generation_types.AsyncGenerateContentResponse.from_response(response)
+
+class GeminiRegistry:
+    """api_key별 클라이언트와 (api_key, 모델 이름)별 모델을 처음 쓸 때 만들어 보관"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = {}
+        # 비동기 gRPC 채널은 만든 이벤트 루프에 묶이므로 루프마다 따로 보관
+        self.async_clients = weakref.WeakKeyDictionary()
+        self.models = {}
+        self.stats = {"clients": 0, "async_clients": 0, "models": 0}
+
+    def client(self, api_key: str):
+        with self.lock:
+            client = self.clients.get(api_key)
+            if client is None:
+                client = _make_client(api_key)
+                self.clients[api_key] = client
+                self.stats["clients"] += 1
+            return client
+
+    def async_client(self, api_key: str):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            clients = self.async_clients.setdefault(loop, {})
+            client = clients.get(api_key)
+            if client is None:
+                client = _make_async_client(api_key)
+                clients[api_key] = client
+                self.stats["async_clients"] += 1
+            return client
+
+    def get_model(self, api_key: str, model_name: str = GEMINI_MODEL) -> GeminiModel:
+        key = (api_key, model_name)
+        with self.lock:
+            model = self.models.get(key)
+            if model is None:
+                model = GeminiModel(self, api_key, model_name)
+                self.models[key] = model
+                self.stats["models"] += 1
+            return model
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return dict(self.stats)
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_gemini_registry() -> GeminiRegistry:
+    """프로세스 전체에서 공유하는 Gemini 레지스트리"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = GeminiRegistry()
+        return _registry
+
+def get_gemini_model(api_key: str, model_name: str = GEMINI_MODEL) -> GeminiModel:
+    return get_gemini_registry().get_model(api_key, model_name)
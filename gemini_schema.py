@@ -0,0 +1,161 @@
+# gemini_schema.py - Gemini 구조화(JSON) 응답 스키마와 검증 파서
+# 응답을 json.loads 한 번으로 읽고, 필드마다 타입·값을 검사해 SiteSummary로 변환
+# (줄 단위 "키: 값" 파싱처럼 여러 줄 요약/스크립트가 첫 줄에서 잘리지 않음)
+
+import json
+import re
+from dataclasses import dataclass, field, fields as dataclass_fields
+from typing import List, Tuple
+from url_utils import canonicalize_url
+
+RATING_VALUES = ('높음', '보통', '낮음')
+MAX_CATEGORIES = 5
+MAX_CATEGORY_CHARS = 100
+
+# JSON 키 -> Airtable 필드 이름
+FIELD_NAMES = {
+    "site_name": "사이트 이름",
+    "url": "URL",
+    "categories": "카테고리",
+    "use_cases": "활용 사례",
+    "rating": "평가/효용성",
+    "summary": "요약 설명",
+    "script_ko": "스크립트",
+    "script_en": "Script"
+}
+
+# 모델에 넘길 응답 스키마 (API가 지원하는 경우)
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        key: {"type": "array", "items": {"type": "string"}} if key == "categories" else {"type": "string"}
+        for key in FIELD_NAMES
+    },
+    "required": list(FIELD_NAMES)
+}
+
+class SchemaError(ValueError):
+    """JSON으로 읽을 수 없거나 객체가 아닌 응답"""
+
+@dataclass
+class SiteSummary:
+    site_name: str = ""
+    url: str = ""
+    categories: List[str] = field(default_factory=list)
+    use_cases: str = ""
+    rating: str = ""
+    summary: str = ""
+    script_ko: str = ""
+    script_en: str = ""
+
+    def to_fields(self) -> dict:
+        """Airtable 필드 이름의 딕셔너리 (카테고리는 리스트)"""
+        return {FIELD_NAMES[item.name]: list(getattr(self, item.name)) if item.name == "categories" else getattr(self, item.name)
+                for item in dataclass_fields(self)}
+
+    def to_airtable_fields(self) -> dict:
+        """Airtable에 보낼 딕셔너리 (카테고리는 쉼표로 연결)"""
+        return airtable_fields(self.to_fields())
+
+def airtable_fields(fields: dict) -> dict:
+    """
+    to_fields() 형식(또는 그 결과를 캐시에서 읽은 것)의 딕셔너리를 Airtable에 보낼 형식으로 변환
+    이미 검증된 값이므로 카테고리 리스트만 쉼표로 연결 (JSON 문자열 재파싱이나 디버그 출력 없음)
+    """
+    result = dict(fields)
+    categories = result.get("카테고리")
+    if isinstance(categories, (list, tuple)):
+        result["카테고리"] = ", ".join(str(item) for item in categories if item)
+    return result
+
+CODE_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$', re.I)
+
+def load_json(text: str):
+    """응답 문자열을 JSON으로 읽음 (```json 코드 블록이나 앞뒤 설명 문장은 무시)"""
+    text = CODE_FENCE.sub('', text.strip())
+    starts = [index for index in (text.find('{'), text.find('[')) if index != -1]
+    if not starts:
+        raise SchemaError("JSON 없음")
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, min(starts))
+    except json.JSONDecodeError as e:
+        raise SchemaError(f"JSON 파싱 실패: {e}")
+    return value
+
+def _to_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "\n".join(_to_text(item) for item in value)
+    return str(value).strip()
+
+def _to_categories(value) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, (list, tuple)):
+        return []
+    categories = []
+    for item in value:
+        item = _to_text(item)
+        if item and len(item) <= MAX_CATEGORY_CHARS and item not in categories:
+            categories.append(item)
+    return categories[:MAX_CATEGORIES]
+
+def _to_rating(value) -> str:
+    value = _to_text(value)
+    for rating in RATING_VALUES:
+        if rating in value:
+            return rating
+    return value
+
+def parse_site_summary(data) -> SiteSummary:
+    """JSON 문자열 또는 이미 읽은 객체를 SiteSummary로 변환 (모르는 키는 무시)"""
+    if isinstance(data, str):
+        data = load_json(data)
+    if isinstance(data, list) and len(data) == 1:
+        data = data[0]
+    if not isinstance(data, dict):
+        raise SchemaError(f"객체가 아님 ({type(data).__name__})")
+
+    # 모델이 Airtable 필드 이름을 키로 쓴 경우도 허용
+    aliases = {name: key for key, name in FIELD_NAMES.items()}
+    values = {aliases.get(key, key): value for key, value in data.items()}
+
+    return SiteSummary(
+        site_name=_to_text(values.get("site_name")),
+        url=_to_text(values.get("url")),
+        categories=_to_categories(values.get("categories")),
+        use_cases=_to_text(values.get("use_cases")),
+        rating=_to_rating(values.get("rating")),
+        summary=_to_text(values.get("summary")),
+        script_ko=_to_text(values.get("script_ko")),
+        script_en=_to_text(values.get("script_en"))
+    )
+
+def parse_site_summaries(text: str) -> List:
+    """일괄 응답(JSON 배열, 또는 {"sites": [...]})을 원소 목록으로 읽음"""
+    data = load_json(text)
+    if isinstance(data, dict):
+        data = data.get("sites", [data])
+    if not isinstance(data, list):
+        raise SchemaError(f"배열이 아님 ({type(data).__name__})")
+    return data
+
+def validate_fields(fields: dict, url: str) -> List[str]:
+    """Airtable 필드 딕셔너리 검증 - 문제 목록 반환 (비어 있으면 정상)"""
+    problems = []
+    if not str(fields.get("사이트 이름", "")).strip():
+        problems.append("사이트 이름 없음")
+    if not str(fields.get("요약 설명", "")).strip():
+        problems.append("요약 설명 없음")
+    if fields.get("평가/효용성") not in RATING_VALUES:
+        problems.append(f"평가/효용성 값 오류({fields.get('평가/효용성')})")
+    # 다른 사이트의 결과가 섞였는지 확인
+    if fields.get("URL") and canonicalize_url(fields["URL"]) != canonicalize_url(url):
+        problems.append(f"URL 불일치({fields['URL']})")
+    return problems
+
+def parse_and_validate(data, url: str) -> Tuple[SiteSummary, List[str]]:
+    """파싱과 검증을 한 번에 (JSON이 아니면 SchemaError)"""
+    summary = parse_site_summary(data)
+    return summary, validate_fields(summary.to_fields(), url)
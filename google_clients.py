@@ -0,0 +1,98 @@
+# google_clients.py - Google TTS / Drive 클라이언트 홀더
+# TTS 클라이언트(gRPC, 스레드 간 공유 가능)는 프로세스에 하나만 만들고, 서비스 계정 인증 정보는 (파일, 스코프)별로 한 번만 읽음
+# Drive 서비스는 httplib2 기반이라 스레드 간에 공유할 수 없으므로, discovery 문서를 한 번만 읽어 두고 스레드마다 하나씩 만들어 재사용
+
+import json
+import os
+import threading
+from typing import Dict, Tuple
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+DRIVE_SCOPES = ('https://www.googleapis.com/auth/drive.file',)
+
+def _make_tts_client():
+    from google.cloud import texttospeech
+    return texttospeech.TextToSpeechClient()
+
+def _load_credentials(credentials_file: str, scopes: Tuple[str, ...]):
+    from google.oauth2.service_account import Credentials
+    return Credentials.from_service_account_file(credentials_file, scopes=list(scopes))
+
+def _load_drive_document() -> Dict:
+    """라이브러리에 들어 있는 Drive v3 discovery 문서 (네트워크 요청 없음)"""
+    from googleapiclient.discovery_cache import get_static_doc
+    return json.loads(get_static_doc('drive', 'v3'))
+
+def _build_drive(document: Dict, credentials):
+    from googleapiclient.discovery import build_from_document
+    return build_from_document(document, credentials=credentials)
+
+class GoogleClients:
+    """처음 쓸 때 만들어 보관 (라이브러리 import, 인증 파일 읽기, discovery 처리도 그때 한 번만)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tts_client = None
+        self.credentials = {}
+        self.drive_document = None
+        self.local = threading.local()
+        self.stats = {"tts_clients": 0, "credentials": 0, "drive_documents": 0, "drive_services": 0}
+
+    def tts(self):
+        with self.lock:
+            if self.tts_client is None:
+                self.tts_client = _make_tts_client()
+                self.stats["tts_clients"] += 1
+            return self.tts_client
+
+    def get_credentials(self, scopes: Tuple[str, ...] = DRIVE_SCOPES):
+        """GOOGLE_APPLICATION_CREDENTIALS 서비스 계정 인증 정보 (설정되지 않았으면 None)"""
+        credentials_file = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+        if not credentials_file:
+            return None
+        key = (credentials_file, tuple(scopes))
+        with self.lock:
+            credentials = self.credentials.get(key)
+            if credentials is None:
+                credentials = _load_credentials(credentials_file, tuple(scopes))
+                self.credentials[key] = credentials
+                self.stats["credentials"] += 1
+            return credentials
+
+    def drive(self):
+        """현재 스레드의 Drive v3 서비스 (인증 파일이 설정되지 않았으면 None)"""
+        credentials = self.get_credentials(DRIVE_SCOPES)
+        if credentials is None:
+            return None
+        services = getattr(self.local, "drive", None)
+        if services is None:
+            services = self.local.drive = {}
+        service = services.get(id(credentials))
+        if service is None:
+            with self.lock:
+                if self.drive_document is None:
+                    self.drive_document = _load_drive_document()
+                    self.stats["drive_documents"] += 1
+                document = self.drive_document
+                self.stats["drive_services"] += 1
+            service = _build_drive(document, credentials)
+            services[id(credentials)] = service
+        return service
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return dict(self.stats)
+
+_clients = None
+_clients_lock = threading.Lock()
+
+def get_google_clients() -> GoogleClients:
+    """프로세스 전체에서 공유하는 Google 클라이언트 홀더"""
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = GoogleClients()
+        return _clients
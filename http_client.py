@@ -0,0 +1,255 @@
+# http_client.py - 공용 HTTP 세션 (호스트별 keep-alive 커넥션 풀 + 기본 타임아웃)
+# requests 세션(동기)과 aiohttp 세션(asyncio) 두 가지를 같은 설정으로 제공
+# Airtable / Telegram / Notion / 크롤링 요청이 매번 TCP·TLS 연결을 새로 맺지 않도록 재사용
+
+import asyncio
+import codecs
+import json
+import os
+import re
+import threading
+import weakref
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 커넥션 풀을 유지할 호스트 수 / 호스트당 최대 커넥션 수
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '20'))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+# 타임아웃을 지정하지 않은 요청에 적용할 기본값 (초)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+
+class PooledSession(requests.Session):
+    """기본 타임아웃과 호스트별 요청 수 집계가 추가된 Session"""
+
+    def __init__(self, pool_connections: int = HTTP_POOL_CONNECTIONS, pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
+        super().__init__()
+        self.default_timeout = timeout
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.mount("https://", self.adapter)
+        self.mount("http://", self.adapter)
+        self.stats_lock = threading.Lock()
+        self.request_counts = {}
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.default_timeout
+        host = urlsplit(url).netloc.lower()
+        with self.stats_lock:
+            self.request_counts[host] = self.request_counts.get(host, 0) + 1
+        return super().request(method, url, **kwargs)
+
+    def get_stats(self) -> dict:
+        """
+        호스트별 요청 수 / 새로 맺은 연결 수 / 재사용된 요청 수
+        (풀에서 밀려난 호스트는 새 연결 수가 초기화될 수 있음)
+        """
+        connections = {}
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            connections[host] = connections.get(host, 0) + pool.num_connections
+
+        stats = {}
+        with self.stats_lock:
+            for host, count in self.request_counts.items():
+                new_connections = connections.get(host, 0)
+                stats[host] = {
+                    "requests": count,
+                    "new_connections": new_connections,
+                    "reused": max(0, count - new_connections)
+                }
+        return stats
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> PooledSession:
+    """프로세스 전체에서 공유하는 HTTP 세션"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PooledSession()
+        return _session
+
+# ---------------------------------------------------------------------------
+# asyncio 백엔드 (aiohttp) - 이벤트 루프마다 세션 하나, 같은 설정값 사용
+# ---------------------------------------------------------------------------
+
+_async_stats_lock = threading.Lock()
+_async_stats = {}
+
+def _count_async(host: str, key: str):
+    with _async_stats_lock:
+        stat = _async_stats.setdefault(host, {"requests": 0, "new_connections": 0, "reused": 0})
+        stat[key] += 1
+
+def _host_of(url) -> str:
+    host = (url.host or "").lower()
+    return host if url.is_default_port() else f"{host}:{url.port}"
+
+async def _on_request_start(session, context, params):
+    context.host = _host_of(params.url)
+    _count_async(context.host, "requests")
+
+async def _on_connection_create_end(session, context, params):
+    _count_async(context.host, "new_connections")
+
+async def _on_connection_reuseconn(session, context, params):
+    _count_async(context.host, "reused")
+
+def _make_trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    return trace_config
+
+_async_sessions = weakref.WeakKeyDictionary()
+
+def get_async_session() -> aiohttp.ClientSession:
+    """현재 이벤트 루프에서 공유하는 aiohttp 세션 (루프마다 하나)"""
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE, limit_per_host=HTTP_POOL_MAXSIZE)
+        timeout = aiohttp.ClientTimeout(sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT)
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[_make_trace_config()])
+        _async_sessions[loop] = session
+    return session
+
+async def close_async_session():
+    """현재 이벤트 루프의 aiohttp 세션 종료"""
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+class AsyncResponse:
+    """본문까지 다 읽은 aiohttp 응답 (requests.Response처럼 status_code / text / json() 사용)"""
+
+    def __init__(self, status_code: int, text: str, headers):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    def json(self):
+        return json.loads(self.text)
+
+async def async_request(method: str, url: str, **kwargs) -> AsyncResponse:
+    """공용 aiohttp 세션으로 요청을 보내고 응답 본문을 읽어옵니다."""
+    timeout = kwargs.pop("timeout", None)
+    if isinstance(timeout, (int, float)):
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+    async with get_async_session().request(method, url, **kwargs) as response:
+        text = await response.text()
+        return AsyncResponse(response.status, text, response.headers)
+
+class StreamedResponse(AsyncResponse):
+    """스트리밍으로 일부(또는 전부)만 읽은 응답"""
+
+    def __init__(self, status_code: int, text: str, headers, bytes_read: int = 0, truncated: bool = False):
+        super().__init__(status_code, text, headers)
+        self.bytes_read = bytes_read
+        self.truncated = truncated
+
+class UnsupportedContentType(Exception):
+    """허용하지 않은 Content-Type (본문을 읽기 전에 중단)"""
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+def _make_decoder(charset: Optional[str], head: bytes):
+    """헤더의 charset -> 첫 청크의 <meta charset> -> utf-8 순으로 증분 디코더 생성"""
+    if not charset:
+        match = _META_CHARSET.search(head[:4096])
+        charset = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return codecs.getincrementaldecoder(charset)(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+async def async_stream_text(url: str, headers: dict = None, timeout: float = None, max_bytes: int = None,
+                            allowed_types: tuple = None, should_stop: Callable[[str], bool] = None,
+                            chunk_size: int = 64 * 1024) -> StreamedResponse:
+    """
+    GET 응답 본문을 청크 단위로 읽어 증분 디코딩합니다.
+    - allowed_types: 본문을 읽기 전에 Content-Type 확인 (목록에 없으면 UnsupportedContentType)
+    - max_bytes: 이만큼 읽으면 중단 (truncated=True)
+    - should_stop: 디코딩된 청크마다 호출, True를 반환하면 중단 (truncated=True)
+    2xx가 아닌 응답은 본문을 읽지 않고 status_code만 돌려줍니다.
+    """
+    kwargs = {"headers": headers}
+    if isinstance(timeout, (int, float)):
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+    async with get_async_session().get(url, **kwargs) as response:
+        if not 200 <= response.status < 300:
+            return StreamedResponse(response.status, "", response.headers)
+        # Content-Type이 없으면 aiohttp가 application/octet-stream으로 보고하므로 헤더가 있을 때만 검사
+        if allowed_types and 'Content-Type' in response.headers and response.content_type not in allowed_types:
+            raise UnsupportedContentType(response.content_type)
+        if max_bytes and response.content_length and response.content_length > max_bytes:
+            print(f"⚠️ 응답이 큼 ({response.content_length:,}B), 앞 {max_bytes:,}B만 읽음: {url}")
+
+        decoder = None
+        parts = []
+        bytes_read = 0
+        truncated = False
+        async for chunk in response.content.iter_chunked(chunk_size):
+            if max_bytes:
+                chunk = chunk[:max_bytes - bytes_read]
+            bytes_read += len(chunk)
+            if decoder is None:
+                decoder = _make_decoder(response.charset, chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            if (max_bytes and bytes_read >= max_bytes) or (should_stop and should_stop(text)):
+                truncated = True
+                break
+        if decoder is not None:
+            parts.append(decoder.decode(b'', final=True))
+        # 중간에 빠져나오면 남은 본문은 읽지 않고 연결을 닫음
+        return StreamedResponse(response.status, ''.join(parts), response.headers, bytes_read, truncated)
+
+# 동기 래퍼용 백그라운드 이벤트 루프 (스레드 하나에서 모든 동기 호출의 네트워크 대기를 처리)
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, name="http-loop", daemon=True).start()
+        return _background_loop
+
+def run_sync(coro):
+    """
+    async 함수를 동기 코드(스크립트, 워커 스레드)에서 실행합니다.
+    공용 백그라운드 루프에서 실행하므로 aiohttp 커넥션 풀이 호출 간에 유지됩니다.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
+def get_http_stats() -> dict:
+    """requests 세션과 aiohttp 세션의 호스트별 통계 합계"""
+    stats = {host: dict(stat) for host, stat in get_session().get_stats().items()}
+    with _async_stats_lock:
+        for host, stat in _async_stats.items():
+            total = stats.setdefault(host, {"requests": 0, "new_connections": 0, "reused": 0})
+            for key, value in stat.items():
+                total[key] += value
+    return stats
+
+def print_http_stats():
+    print("🌐 HTTP 커넥션 재사용 통계:")
+    for host, stat in sorted(get_http_stats().items()):
+        print(f"  {host}: 요청 {stat['requests']}회, 새 연결 {stat['new_connections']}회, 재사용 {stat['reused']}회")
@@ -0,0 +1,314 @@
+# job_queue.py - URL 처리 작업 큐 (SQLite)
+# 디스코드에서 받은 URL을 디스크에 먼저 저장하고, 단계(fetched → summarized → tts_done → stored → notified)를
+# 마칠 때마다 결과를 같이 기록해 두어 재시작/비정상 종료 후에도 마지막으로 끝난 단계 다음부터 이어서 처리
+# (Gemini 요약, TTS는 다시 하지 않음)
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', 'job_queue.db')
+# 작업을 가져간 워커가 이 시간(초) 동안 진행 기록이 없으면 죽은 것으로 보고 다른 워커가 가져감
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '600'))
+# 일시 장애로 미룬 작업의 재시도 간격 (초, 미룰 때마다 두 배, 최대 1시간) / 최대 시도 횟수
+JOB_RETRY_SECONDS = float(os.getenv('JOB_RETRY_SECONDS', '120'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '6'))
+
+# 단계 순서 (queued는 아직 아무것도 안 한 상태)
+STAGES = ["queued", "fetched", "summarized", "tts_done", "stored", "notified"]
+
+def stage_done(job: Dict, stage: str) -> bool:
+    """job이 stage까지 마쳤는지"""
+    return STAGES.index(job["stage"]) >= STAGES.index(stage)
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobQueue:
+    """
+    status: pending(대기, next_attempt_at 이후 가져갈 수 있음) / running(워커가 처리 중) / done / failed
+    여러 프로세스가 같은 파일을 써도 되도록 작업을 가져갈 때는 BEGIN IMMEDIATE로 잠금
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                stage TEXT NOT NULL DEFAULT 'queued',
+                status TEXT NOT NULL DEFAULT 'pending',
+                meta TEXT NOT NULL DEFAULT '{}',
+                data TEXT NOT NULL DEFAULT '{}',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                claims INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                next_attempt_at REAL NOT NULL,
+                error TEXT,
+                progress TEXT,
+                reported_at REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # 진행 상황 보고용 컬럼이 없던 예전 파일
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("progress", "TEXT"), ("reported_at", "REAL")):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+                if column == "reported_at":
+                    # 예전 작업은 이미 봇이 직접 상태 메시지를 갱신했으므로 보고한 것으로 봄
+                    self.conn.execute("UPDATE jobs SET reported_at = updated_at")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, next_attempt_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def _row_to_job(row) -> Dict:
+        return {
+            "id": row[0], "url": row[1], "source": row[2], "stage": row[3], "status": row[4],
+            "meta": json.loads(row[5]), "data": json.loads(row[6]), "attempts": row[7], "claims": row[8],
+            "worker": row[9], "error": row[10], "created_at": row[11], "updated_at": row[12],
+            "progress": row[13], "next_attempt_at": row[14]
+        }
+
+    _COLUMNS = "id, url, source, stage, status, meta, data, attempts, claims, worker, error, created_at, updated_at, progress, next_attempt_at"
+
+    def enqueue(self, url: str, source: str = "discord", meta: Dict = None, data: Dict = None) -> int:
+        """새 작업 추가 (meta: 상태 메시지 위치 등 처리에 필요한 부가 정보, data: 처음부터 가지고 시작할 결과)"""
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (url, source, meta, data, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, source, json.dumps(meta or {}, ensure_ascii=False), json.dumps(data or {}, ensure_ascii=False), now, now, now)
+            )
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def enqueue_followup(self, job: Dict, key: str, meta: Dict = None, data: Dict = None) -> int:
+        """
+        job에 이어지는 작업을 추가하고 그 id를 job의 data[key]에 기록 (한 트랜잭션 - 둘 중 하나만 남지 않음)
+        job을 다시 처리할 때 data[key]가 있으면 이미 추가한 것이므로 중복으로 추가하지 않을 수 있음
+        """
+        now = time.time()
+        with self.lock:
+            try:
+                cursor = self.conn.execute(
+                    "INSERT INTO jobs (url, source, meta, data, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job["url"], job["source"], json.dumps(meta or {}, ensure_ascii=False), json.dumps(data or {}, ensure_ascii=False), now, now, now)
+                )
+                followup = cursor.lastrowid
+                parent_data = dict(job["data"], **{key: followup})
+                self.conn.execute(
+                    "UPDATE jobs SET data = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(parent_data, ensure_ascii=False), now, job["id"])
+                )
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        job["data"][key] = followup
+        return followup
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim(self, worker_id: str = None, source: str = None, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[Dict]:
+        """
+        처리할 작업 하나를 가져감 (먼저 들어온 순서)
+        대기 중이고 재시도 시각이 된 작업, 또는 가져간 워커의 기한이 지난 작업이 대상
+        """
+        now = time.time()
+        condition = "((status = 'pending' AND next_attempt_at <= ?) OR (status = 'running' AND lease_until < ?))"
+        params = [now, now]
+        if source:
+            condition += " AND source = ?"
+            params.append(source)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    f"SELECT id FROM jobs WHERE {condition} ORDER BY id LIMIT 1", params
+                ).fetchone()
+                if row is None:
+                    self.conn.commit()
+                    return None
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, claims = claims + 1, updated_at = ? WHERE id = ?",
+                    (worker_id or default_worker_id(), now + lease_seconds, now, row[0])
+                )
+                job = self.conn.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (row[0],)).fetchone()
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return self._row_to_job(job)
+
+    def report_progress(self, job: Dict, stage: str, lease_seconds: float = JOB_LEASE_SECONDS):
+        """지금 시작한 단계를 기록 (다른 프로세스의 봇이 상태 메시지에 표시), 기한도 연장"""
+        job["progress"] = stage
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET progress = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                (stage, now + lease_seconds, now, job["id"])
+            )
+            self.conn.commit()
+
+    def checkpoint(self, job: Dict, stage: str, lease_seconds: float = JOB_LEASE_SECONDS, **data):
+        """stage를 마쳤음을 기록하고 결과(data)를 작업에 합쳐 저장, 기한도 연장 (job도 같이 갱신)"""
+        job["data"].update(data)
+        job["stage"] = stage
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET stage = ?, data = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                (stage, json.dumps(job["data"], ensure_ascii=False), now + lease_seconds, now, job["id"])
+            )
+            self.conn.commit()
+
+    def complete(self, job: Dict):
+        self._finish(job, "done", None)
+
+    def fail(self, job: Dict, error: str):
+        self._finish(job, "failed", error)
+
+    def _finish(self, job: Dict, status: str, error: Optional[str]):
+        job["status"] = status
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, worker = NULL, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job["id"])
+            )
+            self.conn.commit()
+
+    def defer(self, job: Dict, error: str) -> Optional[float]:
+        """
+        일시 장애로 나중에 다시 처리 - 마친 단계는 그대로 두고 대기열로 돌림
+        다시 시도할 때까지의 시간(초)을 반환 (최대 시도 횟수를 넘으면 failed 처리하고 None)
+        """
+        attempts = job["attempts"] + 1
+        if attempts >= JOB_MAX_ATTEMPTS:
+            job["attempts"] = attempts
+            self.fail(job, error)
+            return None
+        delay = min(3600.0, JOB_RETRY_SECONDS * (2 ** (attempts - 1)))
+        now = time.time()
+        job.update(status="pending", attempts=attempts, error=error)
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = ?, error = ?, next_attempt_at = ?, worker = NULL, "
+                "lease_until = NULL, updated_at = ? WHERE id = ?",
+                (attempts, error, now + delay, now, job["id"])
+            )
+            self.conn.commit()
+        return delay
+
+    def requeue_running(self, workers: List[str] = None, source: str = None) -> int:
+        """
+        처리 중으로 남은 작업을 바로 대기열로 돌림 (재시작 직후 사용)
+        workers를 주면 그 워커들이 가져간 작업만, source를 주면 그 출처의 작업만
+        (둘 다 없으면 전부 - 큐를 처리하는 프로세스가 하나뿐일 때)
+        """
+        query = "UPDATE jobs SET status = 'pending', worker = NULL, lease_until = NULL WHERE status = 'running'"
+        params = []
+        if source is not None:
+            query += " AND source = ?"
+            params.append(source)
+        with self.lock:
+            if workers is not None:
+                cursor = self.conn.executemany(query + " AND worker = ?", [(*params, worker) for worker in workers])
+            else:
+                cursor = self.conn.execute(query, params)
+            self.conn.commit()
+            return cursor.rowcount
+
+    def running_workers(self) -> List[str]:
+        """지금 작업을 가져가 있는 워커 id 목록"""
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT worker FROM jobs WHERE status = 'running' AND worker IS NOT NULL").fetchall()
+        return [row[0] for row in rows]
+
+    def unreported(self, source: str = None, limit: int = 100) -> List[Dict]:
+        """마지막으로 보고한 뒤 바뀐 작업 (상태 메시지 갱신용)"""
+        condition, params = ("AND source = ?", [source]) if source else ("", [])
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE updated_at > COALESCE(reported_at, 0) {condition} ORDER BY id LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def mark_reported(self, job: Dict):
+        """job을 읽어온 시점까지의 변경을 보고했다고 기록 (그 뒤의 변경은 다음에 다시 나옴)"""
+        with self.lock:
+            self.conn.execute("UPDATE jobs SET reported_at = ? WHERE id = ?", (job["updated_at"], job["id"]))
+            self.conn.commit()
+
+    def list_jobs(self, status: str = None, source: str = None, limit: int = 100) -> List[Dict]:
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if source:
+            conditions.append("source = ?")
+            params.append(source)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {self._COLUMNS} FROM jobs {where} ORDER BY id LIMIT ?", params + [limit]).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def active_urls(self, source: str = None) -> set:
+        """대기/처리 중/완료 작업의 URL (같은 URL을 다시 넣지 않도록, 실패한 작업은 제외)"""
+        condition, params = ("AND source = ?", (source,)) if source else ("", ())
+        with self.lock:
+            rows = self.conn.execute(f"SELECT url FROM jobs WHERE status != 'failed' {condition}", params).fetchall()
+        return {row[0] for row in rows}
+
+    def get_stats(self, source: str = None) -> Dict:
+        """상태별 작업 수와 단계별 작업 수, 지금 가져갈 수 있는 대기 작업 수(ready)"""
+        where, params = ("WHERE source = ?", (source,)) if source else ("", ())
+        ready_condition = "AND source = ?" if source else ""
+        with self.lock:
+            by_status = dict(self.conn.execute(f"SELECT status, COUNT(*) FROM jobs {where} GROUP BY status", params).fetchall())
+            by_stage = dict(self.conn.execute(f"SELECT stage, COUNT(*) FROM jobs {where} GROUP BY stage", params).fetchall())
+            ready = self.conn.execute(
+                f"SELECT COUNT(*) FROM jobs WHERE status = 'pending' AND next_attempt_at <= ? {ready_condition}",
+                (time.time(),) + tuple(params)
+            ).fetchone()[0]
+        return {"status": by_status, "stage": by_stage, "ready": ready}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """프로세스 전체에서 공유하는 작업 큐"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
+
+def print_job_queue_stats(source: str = None, queue: JobQueue = None):
+    stats = (queue or get_job_queue()).get_stats(source)
+    status = stats["status"]
+    print(f"🗃️ 작업 큐: 대기 {status.get('pending', 0)}개, 처리 중 {status.get('running', 0)}개, "
+          f"완료 {status.get('done', 0)}개, 실패 {status.get('failed', 0)}개")
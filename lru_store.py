@@ -0,0 +1,108 @@
+# lru_store.py - 해시 키 SQLite LRU 저장소 (요약 캐시, 음성 캐시 공용)
+# 여러 값을 이어 붙인 해시 -> 행, 마지막 사용 시각 기준으로 오래 안 쓴 항목과 개수 초과분을 삭제
+# 적중/미스/삭제 집계와 프로세스 공용 인스턴스도 여기서 처리하고, 각 캐시는 키 구성과 값 열만 정함
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+def hash_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8', 'replace'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class LRUStore:
+    """table(key, columns..., created_at, last_access) 테이블 하나를 쓰는 캐시 (columns: 열 이름 -> SQL 타입)"""
+
+    def __init__(self, path: str, table: str, columns: Dict[str, str], max_age_days: float, max_entries: int):
+        self.path = path
+        self.table = table
+        self.columns = list(columns)
+        self.max_age = max_age_days * 86400
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        column_sql = "".join(f"{name} {sql_type},\n" for name, sql_type in columns.items())
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                {column_sql}created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """저장된 값 열 반환 (없으면 None), 적중/미스 집계"""
+        with self.lock:
+            row = self.conn.execute(f"SELECT {', '.join(self.columns)} FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        return dict(zip(self.columns, row))
+
+    def store(self, key: str, **values):
+        now = time.time()
+        names = ["key", *self.columns, "created_at", "last_access"]
+        with self.lock:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                (key, *(values[name] for name in self.columns), now, now)
+            )
+            self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """오래 안 쓴 항목 삭제 + 항목 수 제한"""
+        with self.lock:
+            removed = self.conn.execute(
+                f"DELETE FROM {self.table} WHERE last_access < ?", (time.time() - self.max_age,)
+            ).rowcount
+            count = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            if count > self.max_entries:
+                removed += self.conn.execute(f"""
+                    DELETE FROM {self.table} WHERE key IN (
+                        SELECT key FROM {self.table} ORDER BY last_access, rowid LIMIT ?
+                    )
+                """, (count - self.max_entries,)).rowcount
+            self.conn.commit()
+            self.stats["evicted"] += removed
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def print_stats(self, label: str):
+        stats = self.get_stats()
+        print(f"{label}: 적중 {stats['hits']}회, 미스 {stats['misses']}회, "
+              f"적중률 {stats['hit_rate'] * 100:.1f}%, 항목 {stats['entries']}개")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+def shared_instance(factory: Callable):
+    """factory()로 처음 쓸 때 한 번만 만들어 프로세스 전체에서 공유하는 인스턴스를 돌려주는 함수"""
+    instance = None
+    lock = threading.Lock()
+
+    def get():
+        nonlocal instance
+        with lock:
+            if instance is None:
+                instance = factory()
+            return instance
+    return get
@@ -1,54 +1,17 @@
 import discord
 import asyncio
 import re
-from sub1 import extract_text_from_url, gemini_extract_notion_fields, flatten_fields_for_airtable
-from sub2 import send_to_airtable, send_to_telegram, check_duplicate_url_airtable
-from sub3 import process_script_to_tts_google_drive  # Google Drive TTS 사용
+import time
+from pipeline import run_blocking, shutdown_executor
+from job_queue import get_job_queue
+from url_jobs import consume_queue, has_tts_url, tts_pending, STAGE_LABELS, ACTION_TEXT
+from url_index import get_url_index
 import os
 from dotenv import load_dotenv
-import json
-import requests
 
 # 환경 변수 로드
 load_dotenv()
 
-def simple_duplicate_check(api_key: str, base_id: str, table_name: str, url: str) -> bool:
-    """간단한 중복 확인 - True면 중복 있음, False면 중복 없음"""
-    try:
-        print(f"🔍 간단 중복 확인: {url}")
-        
-        clean_url = url.strip().lower()
-        if clean_url.startswith('http://'):
-            clean_url = clean_url.replace('http://', 'https://', 1)
-        
-        headers = {"Authorization": f"Bearer {api_key}"}
-        request_url = f"https://api.airtable.com/v0/{base_id}/{table_name}"
-        response = requests.get(request_url, headers=headers)
-        
-        if response.status_code != 200:
-            print(f"❌ Airtable 조회 실패")
-            return False
-        
-        records = response.json().get('records', [])
-        print(f"총 {len(records)}개 레코드 검사 중...")
-        
-        for record in records:
-            existing_url = record.get('fields', {}).get('URL', '').strip().lower()
-            if existing_url.startswith('http://'):
-                existing_url = existing_url.replace('http://', 'https://', 1)
-            
-            if clean_url == existing_url:
-                site_name = record.get('fields', {}).get('사이트 이름', 'N/A')
-                print(f"⚠️ 중복 발견! 기존: {site_name}")
-                return True
-        
-        print(f"✅ 중복 없음")
-        return False
-        
-    except Exception as e:
-        print(f"❌ 중복 확인 오류: {str(e)}")
-        return False
-
 # Discord 설정
 TOKEN = os.getenv('DISCORD_TOKEN')
 CHANNEL_ID = int(os.getenv('DISCORD_CHANNEL_ID'))
@@ -67,6 +30,15 @@ AIRTABLE_TABLE_NAME = os.getenv('AIRTABLE_TABLE_NAME')
 CHECK_DUPLICATES = os.getenv('CHECK_DUPLICATES', 'true').lower() == 'true'
 UPDATE_IF_DUPLICATE = os.getenv('UPDATE_IF_DUPLICATE', 'false').lower() == 'true'
 
+# 동시에 처리할 최대 URL 수 (1이면 순차 처리)
+URL_CONCURRENCY = int(os.getenv('URL_CONCURRENCY', '3'))
+# 새 작업 알림이 없어도 이 간격(초)마다 큐를 확인 (미뤄둔 작업 재시도용)
+JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '30'))
+# bot: 이 프로세스가 큐의 작업을 직접 처리 / worker: URL을 큐에 넣고 상태 메시지만 갱신 (처리는 worker.py)
+JOB_RUNNER = os.getenv('JOB_RUNNER', 'bot').lower()
+# 작업 진행 상황을 큐에서 읽어 상태 메시지에 반영하는 간격 (초)
+STATUS_POLL_SECONDS = float(os.getenv('STATUS_POLL_SECONDS', '2'))
+
 # Discord 클라이언트 설정
 intents = discord.Intents.default()
 intents.messages = True
@@ -137,116 +109,6 @@ async def handle_duplicate_url(message, url: str, duplicate_info: dict) -> bool:
         await duplicate_msg.edit(embed=embed)
         return False
 
-async def process_url(url):
-    try:
-        print("=" * 50)
-        print(f"URL 처리 시작: {url}")
-        
-        # 1. 중복 확인 (선택사항)
-        if CHECK_DUPLICATES:
-            print("1. 중복 URL 확인 중...")
-            duplicate_check = check_duplicate_url_airtable(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME, url)
-            
-            if duplicate_check.get('is_duplicate'):
-                print(f"⚠️ 중복 URL 발견: {url}")
-                if not UPDATE_IF_DUPLICATE:
-                    print("중복 처리 설정: 건너뛰기")
-                    return {"success": False, "message": "중복 URL - 건너뛰기"}
-                else:
-                    print("중복 처리 설정: 업데이트")
-        
-        # 2. 텍스트 추출
-        print("2. 텍스트 추출 중...")
-        text = extract_text_from_url(url)
-        print(f"추출된 텍스트 길이: {len(text)}")
-        
-        # 3. Gemini 분석
-        print("3. Gemini 분석 중...")
-        notion_data = gemini_extract_notion_fields(text, url, GEMINI_API_KEY)
-        print(f"Gemini 결과: {json.dumps(notion_data, ensure_ascii=False, indent=2)}")
-        
-        # 4. Airtable용 변환
-        print("4. Airtable용 데이터 변환 중...")
-        filtered_data = flatten_fields_for_airtable(notion_data)
-        print(f"변환 후 카테고리: '{filtered_data.get('카테고리')}' (타입: {type(filtered_data.get('카테고리'))})")
-        print(f"최종 전송 데이터: {json.dumps(filtered_data, ensure_ascii=False, indent=2)}")
-        
-        # 5. TTS 처리
-        print("5. 영어 스크립트 TTS 변환 중...")
-        english_script = filtered_data.get('Script', '')
-        
-        if english_script and english_script.strip():
-            tts_result = process_script_to_tts_google_drive(
-                english_script, 
-                voice_name="en-US-Journey-F"  # 여성, 따뜻하고 자연스러운
-            )
-            
-            if tts_result["success"]:
-                print(f"✅ TTS 변환 성공: {tts_result['audio_url']}")
-                # TTS URL을 데이터에 추가
-                filtered_data["TTS_URL"] = tts_result["audio_url"]
-                filtered_data["TTS_파일명"] = tts_result["filename"]
-                filtered_data["Drive_파일ID"] = tts_result.get("file_id", "")
-            else:
-                print("❌ TTS 변환 실패")
-                filtered_data["TTS_URL"] = "TTS 생성 실패"
-                filtered_data["TTS_파일명"] = ""
-                filtered_data["Drive_파일ID"] = ""
-        else:
-            print("⚠️ 영어 스크립트가 없어서 TTS 건너뜀")
-            filtered_data["TTS_URL"] = "스크립트 없음"
-            filtered_data["TTS_파일명"] = ""
-            filtered_data["Drive_파일ID"] = ""
-        
-        # 6. Airtable 전송 (중복 확인 포함)
-        print("6. Airtable 전송 중...")
-        airtable_result = send_to_airtable(
-            AIRTABLE_API_KEY, 
-            AIRTABLE_BASE_ID, 
-            AIRTABLE_TABLE_NAME, 
-            filtered_data,
-            check_duplicates=CHECK_DUPLICATES,
-            update_if_duplicate=UPDATE_IF_DUPLICATE
-        )
-        
-        # 7. 텔레그램 전송
-        if airtable_result["success"]:
-            print("7. 텔레그램 전송 중...")
-            action_text = {
-                "created": "새로 추가",
-                "updated": "업데이트",
-                "skipped": "중복으로 건너뜀"
-            }.get(airtable_result["action"], "처리됨")
-            
-            telegram_msg = f"📝 웹사이트 정보 ({action_text})\n\n{filtered_data.get('요약 설명', '')}\n\n{filtered_data.get('URL', url)}"
-            
-            # TTS URL이 있으면 텔레그램 메시지에 추가
-            if filtered_data.get("TTS_URL") and "http" in filtered_data.get("TTS_URL", ""):
-                telegram_msg += f"\n\n🎙️ 영어 음성: {filtered_data['TTS_URL']}"
-            
-            telegram_success = send_to_telegram(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, telegram_msg)
-            
-            return {
-                "success": True, 
-                "airtable_result": airtable_result,
-                "telegram_success": telegram_success,
-                "data": filtered_data
-            }
-        else:
-            print("❌ Airtable 저장 실패로 텔레그램 전송 건너뜀")
-            return {
-                "success": False, 
-                "airtable_result": airtable_result,
-                "telegram_success": False,
-                "data": filtered_data
-            }
-            
-    except Exception as e:
-        print(f"❌ 에러 발생: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        return {"success": False, "message": str(e)}
-
 @client.event
 async def on_ready():
     print(f'{client.user} has connected to Discord!')
@@ -254,6 +116,166 @@ async def on_ready():
     print(f'중복 시 업데이트: {UPDATE_IF_DUPLICATE}')
     print(f'환경변수 CHECK_DUPLICATES 값: {os.getenv("CHECK_DUPLICATES", "설정되지 않음")}')
     print(f'환경변수 UPDATE_IF_DUPLICATE 값: {os.getenv("UPDATE_IF_DUPLICATE", "설정되지 않음")}')
+    
+    # 중복 확인용 URL 인덱스를 미리 채워둠 (첫 메시지가 느려지지 않도록)
+    await run_blocking(get_url_index().warm_from_airtable, AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME)
+    
+    # 재연결 시에도 on_ready가 다시 불리므로 큐 처리/상태 갱신 루프는 한 번만 시작
+    global _queue_task, _status_task
+    if _status_task is None:
+        _status_task = asyncio.create_task(report_job_status())
+    if _queue_task is None and JOB_RUNNER == "bot":
+        # 이 프로세스만 큐를 처리하므로 지난 실행에서 처리 중이던 작업은 바로 이어서 처리
+        # 마이그레이션 등 다른 프로세스가 처리 중인 작업은 건드리지 않음
+        resumed = await run_blocking(get_job_queue().requeue_running, None, "discord")
+        if resumed:
+            print(f"🗃️ 지난 실행에서 끝나지 않은 작업 {resumed}개를 이어서 처리합니다.")
+        _queue_task = asyncio.create_task(run_job_queue())
+    elif JOB_RUNNER != "bot":
+        print(f"🗃️ 작업은 워커 프로세스(worker.py)가 처리합니다. (JOB_RUNNER={JOB_RUNNER})")
+
+# 작업 큐 처리 루프 (on_ready에서 시작, JOB_RUNNER=bot일 때만) / 새 작업이 들어오면 깨우는 이벤트
+_queue_task = None
+_queue_wakeup = asyncio.Event()
+# 상태 메시지 갱신 루프 / 이 프로세스에서 작업이 진행되면 바로 깨우는 이벤트
+_status_task = None
+_status_wakeup = asyncio.Event()
+# 이번 실행에서 보낸 상태 메시지 (재시작 후에는 채널에서 다시 가져옴)
+_status_messages = {}
+
+async def get_status_message(job):
+    """작업의 상태 메시지 (찾지 못하면 None)"""
+    status_msg = _status_messages.get(job["id"])
+    if status_msg is not None:
+        return status_msg
+    try:
+        channel = client.get_channel(job["meta"]["channel_id"]) or await client.fetch_channel(job["meta"]["channel_id"])
+        return await channel.fetch_message(job["meta"]["message_id"])
+    except (KeyError, discord.DiscordException) as e:
+        print(f"⚠️ 작업 {job['id']}의 상태 메시지를 찾지 못함: {str(e)}")
+        return None
+
+async def edit_status(status_msg, **kwargs):
+    if status_msg is None:
+        return
+    try:
+        await status_msg.edit(**kwargs)
+    except discord.DiscordException as e:
+        print(f"⚠️ 상태 메시지 수정 실패: {str(e)}")
+
+async def run_job_queue():
+    """큐에서 디스코드 작업을 가져와 URL_CONCURRENCY개까지 동시에 처리 (미뤄둔 작업은 재시도 시각이 되면 처리)"""
+    # 진행 상황은 큐에 기록되므로 상태 메시지 갱신 루프만 바로 깨움
+    async def on_stage(job, stage):
+        _status_wakeup.set()
+    
+    await consume_queue(get_job_queue(), source="discord", concurrency=URL_CONCURRENCY, poll_seconds=JOB_POLL_SECONDS,
+                        wakeup=_queue_wakeup, on_stage=on_stage, on_finish=lambda job: _status_wakeup.set())
+
+def build_result_embed(url, filtered_data, airtable_result, telegram_success):
+    """처리 완료 메시지(Embed) - 중복 처리 정보 포함"""
+    action_text = ACTION_TEXT.get(airtable_result["action"], "처리됨")
+    action_color = {
+        "created": 0x2ecc71,   # 녹색 - 새 생성
+        "updated": 0x3498db,   # 파란색 - 업데이트
+        "skipped": 0x95a5a6    # 회색 - 건너뛰기
+    }.get(airtable_result["action"], 0x2ecc71)
+    
+    action_emoji = {
+        "created": "✅",
+        "updated": "🔄", 
+        "skipped": "⏭️"
+    }.get(airtable_result["action"], "✅")
+    
+    embed = discord.Embed(
+        title=f"{action_emoji} 웹사이트 처리 완료! ({action_text})",
+        description=f"**{filtered_data.get('사이트 이름', '')}**\n{filtered_data.get('요약 설명', '')}",
+        color=action_color
+    )
+    embed.add_field(name="카테고리", value=filtered_data.get('카테고리', '-') or "-", inline=True)
+    embed.add_field(name="평가/효용성", value=filtered_data.get('평가/효용성', '-') or "-", inline=True)
+    embed.add_field(name="활용 사례", value=filtered_data.get('활용 사례', '-') or "-", inline=True)
+    embed.add_field(name="한국어 스크립트", value="✅ 완료", inline=True)
+    embed.add_field(name="영어 스크립트", value="✅ 완료", inline=True)
+    
+    # TTS 결과 표시
+    if tts_pending(filtered_data):
+        tts_status = "⏳ 생성 중"
+    else:
+        tts_status = "✅ 완료" if has_tts_url(filtered_data) else "❌ 실패"
+    embed.add_field(name="영어 TTS 음성", value=tts_status, inline=True)
+    
+    embed.add_field(name="데이터 저장", value=f"✅ {action_text}", inline=False)
+    embed.add_field(name="텔레그램 전송", value="✅ 성공" if telegram_success else "❌ 실패", inline=False)
+    
+    # TTS URL이 있으면 임베드에 추가
+    if has_tts_url(filtered_data):
+        embed.add_field(name="🎙️ 영어 음성 파일", value=f"[재생하기]({filtered_data['TTS_URL']})", inline=False)
+    
+    # 중복 처리 정보 추가
+    if airtable_result.get("is_duplicate"):
+        embed.add_field(name="ℹ️ 처리 정보", value=airtable_result.get("message", ""), inline=False)
+    
+    embed.set_footer(text=f"URL: {filtered_data.get('URL', url)}")
+    return embed
+
+async def report_job_status():
+    """큐에서 마지막으로 반영한 뒤 바뀐 디스코드 작업을 읽어 상태 메시지를 갱신 (처리한 프로세스와 상관없이)"""
+    queue = get_job_queue()
+    while True:
+        _status_wakeup.clear()
+        try:
+            for job in await run_blocking(queue.unreported, "discord"):
+                await show_job_status(job)
+                await run_blocking(queue.mark_reported, job)
+        except Exception as e:
+            print(f"❌ 상태 메시지 갱신 오류: {str(e)}")
+        try:
+            await asyncio.wait_for(_status_wakeup.wait(), timeout=STATUS_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+async def show_job_status(job):
+    """작업의 현재 상태를 상태 메시지에 표시 (끝난 작업이면 결과 Embed, TTS 작업은 끝났을 때 같은 Embed를 다시 그림)"""
+    url = job["url"]
+    data = job["data"]
+    is_tts_job = job["meta"].get("kind") == "tts"
+    if is_tts_job and job["status"] != "done" and job["status"] != "failed":
+        return
+    if job["status"] == "running":
+        if job["progress"] in STAGE_LABELS:
+            await edit_status(await get_status_message(job), content=f"{STAGE_LABELS[job['progress']]}\nURL: {url}")
+        return
+    if job["status"] == "pending":
+        # 미뤄둔 작업만 표시 (처음 들어온 작업은 이미 대기 메시지가 있음)
+        if job["attempts"] and job["error"]:
+            retry_in = max(0, job["next_attempt_at"] - time.time())
+            await edit_status(await get_status_message(job), content=f"⏸️ 페이지나 Gemini를 일시적으로 사용할 수 없어 {retry_in / 60:.0f}분 후 자동으로 다시 시도합니다.\n"
+                                                                    f"({job['error']})\nURL: {url}")
+        return
+    
+    status_msg = await get_status_message(job)
+    _status_messages.pop(job["id"], None)
+    if data.get("tts_job") and status_msg is not None:
+        # 음성이 만들어지면 TTS 작업이 같은 메시지를 다시 수정
+        _status_messages[data["tts_job"]] = status_msg
+    if is_tts_job and job["status"] == "failed":
+        fields = dict(data["fields"], TTS_URL="TTS 생성 실패")
+        embed = build_result_embed(url, fields, data["airtable_result"], data["telegram_success"])
+        await edit_status(status_msg, content=None, embed=embed)
+    elif job["status"] == "failed":
+        await edit_status(status_msg, content=f"❌ 처리 중 오류가 발생했습니다: {job['error']}\nURL: {url}")
+    elif data.get("duplicate"):
+        embed = discord.Embed(
+            title="⚠️ 중복 URL 발견",
+            description=f"이 URL은 이미 데이터베이스에 존재합니다.\n{url}",
+            color=0xffa500
+        )
+        embed.set_footer(text="중복으로 인해 처리를 건너뛰었습니다.")
+        await edit_status(status_msg, content=None, embed=embed)
+    else:
+        embed = build_result_embed(url, data["fields"], data["airtable_result"], data["telegram_success"])
+        await edit_status(status_msg, content=None, embed=embed)
 
 @client.event
 async def on_message(message):
@@ -261,161 +283,27 @@ async def on_message(message):
     if message.channel.id == CHANNEL_ID and message.author != client.user:
         print(f"메시지 감지: {message.content}")
         urls = re.findall(r'(https?://[^\s]+)', message.content)
+        if not urls:
+            return
+        
+        # URL마다 상태 메시지를 먼저 만들고 작업 큐에 저장 (재시작해도 잃어버리지 않음, 들어온 순서대로 처리)
+        queue = get_job_queue()
         for url in urls:
             print(f"URL 감지: {url}")
-            status_msg = await message.channel.send(f'🔄 **웹사이트 요약을 시작합니다!**\nURL: {url}')
-            
-            try:
-                print("=" * 50)
-                print(f"URL 처리 시작: {url}")
-                
-                # 1. 간단한 중복 확인
-                print("1. 간단 중복 확인 시작")
-                if simple_duplicate_check(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME, url):
-                    embed = discord.Embed(
-                        title="⚠️ 중복 URL 발견",
-                        description=f"이 URL은 이미 데이터베이스에 존재합니다.\n{url}",
-                        color=0xffa500
-                    )
-                    embed.set_footer(text="중복으로 인해 처리를 건너뛰었습니다.")
-                    await status_msg.edit(content=None, embed=embed)
-                    continue
-                
-                # 2. 텍스트 추출
-                print("2. 본문 크롤링 시작")
-                await status_msg.edit(content=f'📄 **웹사이트 내용 추출 중...**\nURL: {url}')
-                text = extract_text_from_url(url)
-                print(f"추출된 텍스트 길이: {len(text)}")
-                
-                # 3. Gemini 분석
-                print("3. Gemini 요약 시작")
-                await status_msg.edit(content=f'🤖 **AI 분석 중...**\nURL: {url}')
-                notion_data = gemini_extract_notion_fields(text, url, GEMINI_API_KEY)
-                print(f"Gemini 원본 결과: {json.dumps(notion_data, ensure_ascii=False, indent=2)}")
-                
-                # 4. Airtable용 변환
-                print("4. Airtable용 데이터 변환")
-                filtered_data = flatten_fields_for_airtable(notion_data)
-                print("=" * 30)
-                print(f"최종 Airtable 전송 데이터:")
-                print(f"카테고리: '{filtered_data.get('카테고리')}' (타입: {type(filtered_data.get('카테고리'))})")
-                print(f"전체 데이터: {json.dumps(filtered_data, ensure_ascii=False, indent=2)}")
-                print("=" * 30)
-                
-                # 5. TTS 처리
-                print("5. 영어 스크립트 TTS 변환 중...")
-                english_script = filtered_data.get('Script', '')
-                
-                if english_script and english_script.strip():
-                    await status_msg.edit(content=f'🎙️ **TTS 음성 생성 중...**\nURL: {url}')
-                    
-                    tts_result = process_script_to_tts_google_drive(
-                        english_script, 
-                        voice_name="en-US-Journey-F"  # 여성, 따뜻하고 자연스러운
-                    )
-                    
-                    if tts_result["success"]:
-                        print(f"✅ TTS 변환 성공: {tts_result['audio_url']}")
-                        # TTS URL을 데이터에 추가
-                        filtered_data["TTS_URL"] = tts_result["audio_url"]
-                        filtered_data["TTS_파일명"] = tts_result["filename"]
-                        filtered_data["Drive_파일ID"] = tts_result.get("file_id", "")
-                    else:
-                        print("❌ TTS 변환 실패")
-                        filtered_data["TTS_URL"] = "TTS 생성 실패"
-                        filtered_data["TTS_파일명"] = ""
-                        filtered_data["Drive_파일ID"] = ""
-                else:
-                    print("⚠️ 영어 스크립트가 없어서 TTS 건너뜀")
-                    filtered_data["TTS_URL"] = "스크립트 없음"
-                    filtered_data["TTS_파일명"] = ""
-                    filtered_data["Drive_파일ID"] = ""
-                
-                # 6. Airtable 전송
-                print("6. Airtable 전송 시도")
-                await status_msg.edit(content=f'💾 **데이터 저장 중...**\nURL: {url}')
-                
-                airtable_result = send_to_airtable(
-                    AIRTABLE_API_KEY, 
-                    AIRTABLE_BASE_ID, 
-                    AIRTABLE_TABLE_NAME, 
-                    filtered_data,
-                    check_duplicates=False,  # 이미 위에서 확인했으므로 false
-                    update_if_duplicate=False
-                )
-                
-                if not airtable_result["success"]:
-                    print("❌ Airtable 저장 실패!")
-                    await status_msg.edit(content=f"❌ 데이터 저장에 실패했습니다.\n{airtable_result.get('message', '알 수 없는 오류')}")
-                    continue
-                
-                print("✅ Airtable 저장 성공!")
-                
-                # 7. 텔레그램 전송
-                print("7. 텔레그램 전송 시도")
-                action_text = {
-                    "created": "새로 추가",
-                    "updated": "업데이트됨",
-                    "skipped": "중복으로 건너뜀"
-                }.get(airtable_result["action"], "처리됨")
-                
-                telegram_msg = f"📝 웹사이트 정보 ({action_text})\n\n{filtered_data.get('요약 설명', '')}\n\n{filtered_data.get('URL', url)}"
-                
-                # TTS URL이 있으면 텔레그램 메시지에 추가
-                if filtered_data.get("TTS_URL") and "http" in filtered_data.get("TTS_URL", ""):
-                    telegram_msg += f"\n\n🎙️ 영어 음성: {filtered_data['TTS_URL']}"
-                
-                telegram_success = send_to_telegram(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, telegram_msg)
-                
-                print("8. 모든 작업 완료")
-                
-                # 8. 성공 메시지(Embed) - 중복 처리 정보 포함
-                action_color = {
-                    "created": 0x2ecc71,   # 녹색 - 새 생성
-                    "updated": 0x3498db,   # 파란색 - 업데이트
-                    "skipped": 0x95a5a6    # 회색 - 건너뛰기
-                }.get(airtable_result["action"], 0x2ecc71)
-                
-                action_emoji = {
-                    "created": "✅",
-                    "updated": "🔄", 
-                    "skipped": "⏭️"
-                }.get(airtable_result["action"], "✅")
-                
-                embed = discord.Embed(
-                    title=f"{action_emoji} 웹사이트 처리 완료! ({action_text})",
-                    description=f"**{filtered_data.get('사이트 이름', '')}**\n{filtered_data.get('요약 설명', '')}",
-                    color=action_color
-                )
-                embed.add_field(name="카테고리", value=filtered_data.get('카테고리', '-') or "-", inline=True)
-                embed.add_field(name="평가/효용성", value=filtered_data.get('평가/효용성', '-') or "-", inline=True)
-                embed.add_field(name="활용 사례", value=filtered_data.get('활용 사례', '-') or "-", inline=True)
-                embed.add_field(name="한국어 스크립트", value="✅ 완료", inline=True)
-                embed.add_field(name="영어 스크립트", value="✅ 완료", inline=True)
-                
-                # TTS 결과 표시
-                tts_status = "✅ 완료" if filtered_data.get("TTS_URL") and "http" in filtered_data.get("TTS_URL", "") else "❌ 실패"
-                embed.add_field(name="영어 TTS 음성", value=tts_status, inline=True)
-                
-                embed.add_field(name="데이터 저장", value=f"✅ {action_text}", inline=False)
-                embed.add_field(name="텔레그램 전송", value="✅ 성공" if telegram_success else "❌ 실패", inline=False)
-                
-                # TTS URL이 있으면 임베드에 추가
-                if filtered_data.get("TTS_URL") and "http" in filtered_data.get("TTS_URL", ""):
-                    embed.add_field(name="🎙️ 영어 음성 파일", value=f"[재생하기]({filtered_data['TTS_URL']})", inline=False)
-                
-                # 중복 처리 정보 추가
-                if airtable_result.get("is_duplicate"):
-                    embed.add_field(name="ℹ️ 처리 정보", value=airtable_result.get("message", ""), inline=False)
-                
-                embed.set_footer(text=f"URL: {filtered_data.get('URL', url)}")
-                await status_msg.edit(content=None, embed=embed)
-                
-            except Exception as e:
-                print(f"❌ 에러 발생: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
-                await status_msg.edit(content=f"❌ 처리 중 오류가 발생했습니다: {str(e)}")
+            if len(urls) > 1:
+                status_msg = await message.channel.send(f'⏳ **처리 대기 중...**\nURL: {url}')
+            else:
+                status_msg = await message.channel.send(f'🔄 **웹사이트 요약을 시작합니다!**\nURL: {url}')
+            job_id = await run_blocking(queue.enqueue, url, "discord", {"channel_id": message.channel.id, "message_id": status_msg.id, "skip_duplicates": True})
+            _status_messages[job_id] = status_msg
+        
+        # 여러 URL을 동시에 처리 (URL_CONCURRENCY개까지, 하나가 실패해도 나머지는 계속)
+        # JOB_RUNNER=worker면 워커 프로세스가 큐를 확인해 가져감
+        print(f"총 {len(urls)}개 URL 작업 추가 (동시 처리 제한: {URL_CONCURRENCY})")
+        _queue_wakeup.set()
 
 if __name__ == "__main__":
-    client.run(TOKEN)
\ No newline at end of file
+    try:
+        client.run(TOKEN)
+    finally:
+        shutdown_executor(wait=False)
\ No newline at end of file
@@ -1,18 +1,35 @@
 # migration.py - 구글시트 → Airtable 마이그레이션 스크립트
 # 한 번만 실행하는 DB 마이그레이션용
+# --parallel: 행을 작업 큐(job_queue, source="migration")에 넣고 여러 행을 동시에 처리 (확인 질문 없음)
+#             행마다 단계별 체크포인트가 남으므로 Ctrl-C 후 다시 실행하면 끝나지 않은 단계부터 이어서 처리
 
 import gspread
 from google.oauth2.service_account import Credentials
-import requests
 import time
 from datetime import datetime
 from dotenv import load_dotenv
 import os
 import json
-from urllib.parse import urlparse
-from sub1 import extract_text_from_url, gemini_extract_notion_fields, flatten_fields_for_airtable
-from sub2 import send_to_airtable
+import asyncio
+import argparse
+import signal
+from datetime import timedelta
+from url_utils import canonicalize_url, canonical_url_set
+from sub1 import extract_text_from_url, extract_text_from_url_async, gemini_extract_notion_fields, gemini_extract_notion_fields_batch, fields_for_airtable, GEMINI_BATCH_SIZE, SummaryUnavailable
+from sub2 import send_to_airtable, fetch_all_airtable_records
 from sub3 import process_script_to_tts_google_drive
+from http_client import print_http_stats, run_sync
+from crawl_cache import print_crawl_cache_stats
+from summary_cache import print_summary_cache_stats
+from audio_cache import print_audio_cache_stats
+from drive_publisher import print_drive_publisher_stats
+from prompt_builder import print_prompt_stats
+from rate_limit import print_rate_limit_stats
+from resilience import print_circuit_stats
+from job_queue import get_job_queue, default_worker_id, print_job_queue_stats
+from url_jobs import consume_queue
+from worker import requeue_dead_workers
+from sheet_status import SheetStatusWriter, print_sheet_status_stats
 import sys
 
 # 환경 변수 로드
@@ -29,8 +46,30 @@ AIRTABLE_API_KEY = os.getenv('AIRTABLE_API_KEY')
 AIRTABLE_BASE_ID = os.getenv('AIRTABLE_BASE_ID')
 AIRTABLE_TABLE_NAME = os.getenv('AIRTABLE_TABLE_NAME')
 
-# 처리 간격 (초)
-PROCESS_DELAY = 30  # 30초 간격 (API 제한 고려)
+# 묶음 사이 추가 대기 (초) - API 한도는 rate_limit의 업스트림별 스케줄러가 지키므로 기본값은 대기 없음
+PROCESS_DELAY = float(os.getenv('MIGRATION_PROCESS_DELAY', '0'))
+
+# 병렬 모드 - 동시에 처리하는 행 수와 그중 단계별로 동시에 실행하는 수 (API 한도는 rate_limit이 지킴)
+MIGRATION_CONCURRENCY = int(os.getenv('MIGRATION_CONCURRENCY', '16'))
+MIGRATION_STAGE_CONCURRENCY = {
+    "fetched": int(os.getenv('MIGRATION_FETCH_CONCURRENCY', '16')),
+    "summarized": int(os.getenv('MIGRATION_SUMMARY_CONCURRENCY', '8')),
+    "tts_done": int(os.getenv('MIGRATION_TTS_CONCURRENCY', '4')),
+    "stored": int(os.getenv('MIGRATION_STORE_CONCURRENCY', '4')),
+}
+# 진행률(URL/분, 남은 시간) 출력 간격 (초)
+MIGRATION_REPORT_SECONDS = float(os.getenv('MIGRATION_REPORT_SECONDS', '30'))
+
+def format_progress(finished: int, remaining: int, elapsed_seconds: float) -> str:
+    """진행률 한 줄 - 이번 실행에서 끝낸 수 기준 처리 속도(URL/분)와 남은 시간"""
+    per_minute = finished / (elapsed_seconds / 60) if elapsed_seconds > 0 else 0.0
+    if remaining == 0:
+        eta = "0:00:00"
+    elif per_minute > 0:
+        eta = str(timedelta(seconds=int(remaining / per_minute * 60)))
+    else:
+        eta = "계산 중"
+    return f"📈 처리 {finished}개, 남음 {remaining}개 | {per_minute:.1f} URL/분 | 남은 시간 {eta}"
 
 class MigrationProcessor:
     def __init__(self):
@@ -39,7 +78,10 @@ class MigrationProcessor:
         self.success_count = 0
         self.error_count = 0
         self.duplicate_count = 0
+        self.deferred_count = 0
         self.setup_google_sheets()
+        # 상태 열은 모아서 한 번에 씀 (행마다 API를 부르지 않도록)
+        self.status_writer = SheetStatusWriter(self.sheet)
         self.load_existing_urls()
         
     def setup_google_sheets(self):
@@ -71,41 +113,13 @@ class MigrationProcessor:
         try:
             print("🔍 Airtable에서 기존 URL 목록 확인 중...")
             
-            url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}"
-            headers = {
-                "Authorization": f"Bearer {AIRTABLE_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            
             # 모든 레코드 가져오기 (페이지네이션 처리)
-            all_records = []
-            offset = None
+            result = fetch_all_airtable_records(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME)
+            all_records = result["records"]
             
-            while True:
-                params = {"pageSize": 100}
-                if offset:
-                    params["offset"] = offset
-                
-                response = requests.get(url, headers=headers, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    all_records.extend(data.get('records', []))
-                    offset = data.get('offset')
-                    if not offset:
-                        break
-                else:
-                    print(f"⚠️ Airtable 조회 실패: {response.status_code}")
-                    break
-            
-            # URL 추출
-            for record in all_records:
-                fields = record.get('fields', {})
-                url = fields.get('URL', '')
-                if url:
-                    # URL 정규화 (프로토콜 제거, 끝의 / 제거 등)
-                    normalized_url = self.normalize_url(url)
-                    self.processed_urls.add(normalized_url)
+            # URL 추출 및 일괄 정규화
+            existing_urls = [record.get('fields', {}).get('URL', '') for record in all_records]
+            self.processed_urls.update(canonical_url_set(existing_urls))
             
             print(f"📋 기존 URL {len(self.processed_urls)}개 확인 완료")
             
@@ -113,20 +127,11 @@ class MigrationProcessor:
             print(f"⚠️ 기존 URL 확인 중 오류: {str(e)}")
     
     def normalize_url(self, url):
-        """URL 정규화 (중복 체크용)"""
-        try:
-            # 프로토콜 통일, 끝의 / 제거, 소문자 변환
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            parsed = urlparse(url.lower())
-            normalized = f"{parsed.netloc}{parsed.path}".rstrip('/')
-            return normalized
-        except:
-            return url.lower().strip()
+        """URL 정규화 (중복 체크용, url_utils.canonicalize_url 사용)"""
+        return canonicalize_url(url)
     
-    def get_urls_from_sheet(self, limit=None):
-        """구글 시트에서 URL 목록 가져오기 (제한 옵션 추가)"""
+    def get_urls_from_sheet(self, limit=None, skip_urls=()):
+        """구글 시트에서 URL 목록 가져오기 (제한 옵션 추가, skip_urls: 이미 작업 큐에 있어 건너뛸 URL)"""
         try:
             all_values = self.sheet.get_all_values()
             urls_to_process = []
@@ -142,6 +147,8 @@ class MigrationProcessor:
                     status = row[1] if len(row) > 1 else ""  # B열이 상태
                     
                     # URL이 있고, 아직 처리되지 않은 경우
+                    if url in skip_urls:
+                        continue
                     if url and url.startswith('http') and status.lower() not in ['완료', 'done', 'processed', '중복', '처리중']:
                         # 중복 체크
                         normalized_url = self.normalize_url(url)
@@ -165,31 +172,42 @@ class MigrationProcessor:
             return []
     
     def mark_status(self, row_number, status):
-        """시트에 처리 상태 표시"""
-        try:
-            # 수정된 방법 사용
-            self.sheet.update_cell(row_number, 2, status)  # 2는 B열
-            print(f"📝 상태 업데이트: 행 {row_number} → {status}")
-        except Exception as e:
-            print(f"❌ 상태 업데이트 실패 (행 {row_number}): {str(e)}")
+        """시트에 처리 상태 표시 (B열, 모아서 batch_update로 씀 - 바로 반영하려면 status_writer.flush())"""
+        self.status_writer.set(row_number, status)
+        print(f"📝 상태 업데이트: 행 {row_number} → {status}")
+    
+    def summarize_batch(self, batch):
+        """여러 URL을 동시에 크롤링하고 Gemini 한 번으로 요약 (batch: [(row_number, url), ...])"""
+        urls = [url for _, url in batch]
+        print(f"\n📦 일괄 크롤링 중: {len(urls)}개")
+        
+        async def crawl_all():
+            return await asyncio.gather(*(extract_text_from_url_async(url) for url in urls), return_exceptions=True)
+        
+        # 가져오지 못한 페이지는 빼고 요약 (그 행은 process_single_url에서 다시 크롤링하고, 계속 실패하면 '대기')
+        texts = run_sync(crawl_all())
+        fetched = [(url, text) for url, text in zip(urls, texts) if not isinstance(text, Exception)]
+        summaries = iter(gemini_extract_notion_fields_batch(fetched, GEMINI_API_KEY) if fetched else [])
+        return [None if isinstance(text, Exception) else next(summaries) for text in texts]
     
-    def process_single_url(self, url, row_number, include_tts=True):
-        """단일 URL 처리"""
+    def process_single_url(self, url, row_number, include_tts=True, notion_data=None):
+        """단일 URL 처리 (notion_data가 있으면 크롤링과 Gemini 분석은 건너뜀)"""
         try:
             print(f"\n{'='*60}")
             print(f"🔄 처리 중: {url}")
             print(f"📍 시트 행: {row_number}")
             
-            # 1. 웹사이트 분석
-            print("1. 웹사이트 크롤링 중...")
-            text = extract_text_from_url(url)
-            
-            if not text.strip():
-                print("⚠️ 텍스트 추출 실패, Gemini로 URL만 분석...")
-            
-            # 2. Gemini 분석
-            print("2. Gemini 분석 중...")
-            notion_data = gemini_extract_notion_fields(text, url, GEMINI_API_KEY)
+            if notion_data is None:
+                # 1. 웹사이트 분석
+                print("1. 웹사이트 크롤링 중...")
+                text = extract_text_from_url(url)
+                
+                if not text.strip():
+                    print("⚠️ 텍스트 추출 실패, Gemini로 URL만 분석...")
+                
+                # 2. Gemini 분석
+                print("2. Gemini 분석 중...")
+                notion_data = gemini_extract_notion_fields(text, url, GEMINI_API_KEY)
             
             if not notion_data or not notion_data.get('사이트 이름'):
                 print("❌ Gemini 분석 실패")
@@ -199,7 +217,7 @@ class MigrationProcessor:
             print(f"✅ 카테고리: {notion_data.get('카테고리')}")
             
             # 3. 데이터 변환
-            filtered_data = flatten_fields_for_airtable(notion_data)
+            filtered_data = fields_for_airtable(notion_data)
             
             # 4. TTS 처리 (옵션) - 수정된 부분
             if include_tts:
@@ -249,19 +267,27 @@ class MigrationProcessor:
                 print("❌ Airtable 저장 실패")
                 return False
                 
+        except SummaryUnavailable:
+            # 기본값을 저장하지 않고 run_migration에서 '대기'로 남김
+            raise
         except Exception as e:
             print(f"❌ 처리 중 오류: {str(e)}")
             import traceback
             print(traceback.format_exc())
             return False
     
-    def run_migration(self, include_tts=True, dry_run=False, limit=None):
-        """마이그레이션 실행 (제한 옵션 추가)"""
+    def run_migration(self, include_tts=True, dry_run=False, limit=None, batch_size=GEMINI_BATCH_SIZE):
+        """
+        마이그레이션 실행 (제한 옵션 추가)
+        batch_size개씩 묶어 Gemini 요청 한 번으로 요약함 (1이면 한 건씩)
+        호출 간격은 업스트림별 요청 한도 스케줄러가 정하고, PROCESS_DELAY를 주면 묶음마다 그만큼 더 쉼
+        """
+        batch_size = max(1, batch_size)
         print("🚀 마이그레이션 시작!")
         print(f"TTS 생성: {'포함' if include_tts else '제외'}")
         print(f"실행 모드: {'테스트' if dry_run else '실제 처리'}")
         print(f"처리 제한: {limit}개" if limit else "처리 제한: 없음 (전체)")
-        print(f"처리 간격: {PROCESS_DELAY}초")
+        print(f"처리 간격: 요청 한도에 맞춰 자동 (추가 대기 {PROCESS_DELAY}초, 일괄 요약 {batch_size}개 단위)")
         
         # URL 목록 가져오기
         urls_to_process = self.get_urls_from_sheet(limit=limit)
@@ -271,7 +297,9 @@ class MigrationProcessor:
             return
         
         print(f"\n📋 총 {len(urls_to_process)}개 URL 처리 예정")
-        print(f"⏱️ 예상 소요 시간: {(len(urls_to_process) * PROCESS_DELAY) // 60}분")
+        batch_count = (len(urls_to_process) + batch_size - 1) // batch_size
+        if PROCESS_DELAY:
+            print(f"⏱️ 추가 대기 시간: {(batch_count * PROCESS_DELAY) // 60:.0f}분")
         
         # 처리할 URL 목록 미리보기 (처음 5개만)
         print(f"\n📋 처리 예정 URL 미리보기:")
@@ -289,6 +317,8 @@ class MigrationProcessor:
         # URL 순차 처리
         start_time = datetime.now()
         
+        summaries = {}
+        
         for i, (row_number, url) in enumerate(urls_to_process):
             current_progress = f"[{i+1}/{len(urls_to_process)}]"
             print(f"\n{current_progress} 진행률: {((i+1)/len(urls_to_process)*100):.1f}%")
@@ -301,7 +331,10 @@ class MigrationProcessor:
             # 실제 처리
             try:
                 self.mark_status(row_number, "처리중")
-                success = self.process_single_url(url, row_number, include_tts)
+                if batch_size > 1 and i % batch_size == 0:
+                    batch = urls_to_process[i:i + batch_size]
+                    summaries = dict(zip((row for row, _ in batch), self.summarize_batch(batch)))
+                success = self.process_single_url(url, row_number, include_tts, notion_data=summaries.pop(row_number, None))
                 
                 if success:
                     self.mark_status(row_number, "완료")
@@ -312,6 +345,11 @@ class MigrationProcessor:
                     self.error_count += 1
                     print(f"❌ {current_progress} 실패: {url}")
                 
+            except SummaryUnavailable as e:
+                # 시트에 '대기'로 남기면 다음 실행 때 다시 처리됨
+                print(f"⏸️ {current_progress} 일시 장애로 보류 ({str(e)}): {url}")
+                self.mark_status(row_number, "대기")
+                self.deferred_count += 1
             except KeyboardInterrupt:
                 print("\n⏹️ 사용자가 중단했습니다.")
                 self.mark_status(row_number, "중단")
@@ -321,25 +359,153 @@ class MigrationProcessor:
                 self.mark_status(row_number, "오류")
                 self.error_count += 1
             
-            # 마지막이 아니면 대기
-            if i < len(urls_to_process) - 1:
+            # 묶음의 마지막이고 전체의 마지막이 아니면 대기
+            if PROCESS_DELAY and (i + 1) % batch_size == 0 and i < len(urls_to_process) - 1:
                 print(f"⏳ {PROCESS_DELAY}초 대기 중...")
                 time.sleep(PROCESS_DELAY)
         
         # 완료 보고서
         end_time = datetime.now()
-        elapsed = end_time - start_time
-        
+        self.status_writer.flush()
+        self.print_report(end_time - start_time)
+    
+    def print_report(self, elapsed):
         print(f"\n{'='*60}")
         print("🎉 마이그레이션 완료!")
         print(f"⏱️ 소요 시간: {elapsed}")
         print(f"✅ 성공: {self.success_count}개")
         print(f"❌ 실패: {self.error_count}개") 
         print(f"🔄 중복: {self.duplicate_count}개")
+        if self.deferred_count:
+            print(f"⏸️ 보류(Gemini 장애, 다음 실행 때 처리): {self.deferred_count}개")
         print(f"📊 총 처리: {self.success_count + self.error_count}개")
+        print_http_stats()
+        print_crawl_cache_stats()
+        print_summary_cache_stats()
+        print_audio_cache_stats()
+        print_drive_publisher_stats()
+        print_prompt_stats()
+        print_rate_limit_stats()
+        print_circuit_stats()
+        print_sheet_status_stats(self.status_writer)
+    
+    def enqueue_rows(self, queue, include_tts=True, limit=None):
+        """시트에서 처리할 행을 작업 큐에 추가 (지난 실행에서 이미 넣은 URL은 건너뜀) - 추가한 수를 반환"""
+        queued = queue.active_urls("migration")
+        rows = self.get_urls_from_sheet(skip_urls=queued)
+        if limit:
+            rows = rows[:limit]
+        meta = {"include_tts": include_tts, "background_tts": False, "check_duplicates": False, "notify": False}
+        for row_number, url in rows:
+            queue.enqueue(url, "migration", dict(meta, row_number=row_number))
+        return len(rows)
+    
+    def report_rows(self, queue):
+        """마지막으로 반영한 뒤 끝나거나 미뤄진 행을 시트 상태와 집계에 반영"""
+        for job in queue.unreported("migration", limit=1000):
+            row_number = job["meta"].get("row_number")
+            status = None
+            if job["status"] == "done":
+                status = "완료"
+                self.success_count += 1
+            elif job["status"] == "failed":
+                status = "실패"
+                self.error_count += 1
+                print(f"❌ 행 {row_number} 실패: {job['url']} ({job['error']})")
+            elif job["status"] == "pending" and job["attempts"] and job["error"]:
+                # 시트에 '대기'로 남기고 재시도 시각이 되면 다음 실행 때 이어서 처리
+                status = "대기"
+                self.deferred_count += 1
+            if status and row_number:
+                self.mark_status(row_number, status)
+            queue.mark_reported(job)
+    
+    def run_parallel_migration(self, include_tts=True, dry_run=False, limit=None):
+        """
+        병렬 마이그레이션 (확인 질문 없음)
+        행마다 작업 큐에 체크포인트를 남기며 MIGRATION_CONCURRENCY개 행을 동시에 처리하고,
+        지난 실행에서 끝나지 않은 행은 마친 단계 다음부터 이어서 처리
+        """
+        queue = get_job_queue()
+        resumed = requeue_dead_workers(queue)
+        if resumed:
+            print(f"🗃️ 지난 실행에서 처리 중이던 행 {resumed}개를 이어서 처리합니다.")
+        # 지난 실행에서 시트에 반영하지 못한 결과부터 반영
+        self.report_rows(queue)
+        
+        print("🚀 병렬 마이그레이션 시작!")
+        print(f"TTS 생성: {'포함' if include_tts else '제외'}")
+        print(f"동시 처리: {MIGRATION_CONCURRENCY}행 (단계별 {MIGRATION_STAGE_CONCURRENCY})")
+        
+        if dry_run:
+            queued = queue.active_urls("migration")
+            rows = self.get_urls_from_sheet(skip_urls=queued)[:limit]
+            print(f"🔍 [테스트] 새로 추가할 행 {len(rows)}개")
+            for row_number, url in rows:
+                print(f"  행 {row_number}: {url}")
+            return
+        
+        added = self.enqueue_rows(queue, include_tts, limit)
+        status = queue.get_stats("migration")["status"]
+        remaining = status.get("pending", 0) + status.get("running", 0)
+        print(f"\n📋 새로 추가 {added}개, 이어서 처리 {remaining - added}개")
+        if not remaining:
+            print("📭 처리할 URL이 없습니다.")
+            return
+        
+        start_time = datetime.now()
+        try:
+            asyncio.run(self.process_queue(queue))
+        finally:
+            self.status_writer.flush()
+        self.print_report(datetime.now() - start_time)
+        print_job_queue_stats("migration", queue)
+    
+    async def process_queue(self, queue):
+        """큐의 마이그레이션 행을 모두 처리할 때까지 실행 (Ctrl-C: 진행 중인 행을 마치고 종료)"""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        
+        def interrupt():
+            print("\n⏹️ 중단 요청 - 진행 중인 행을 마치고 종료합니다. (한 번 더 누르면 바로 종료, 다음 실행 때 이어서 처리)")
+            stop.set()
+            loop.remove_signal_handler(signal.SIGINT)
+        
+        loop.add_signal_handler(signal.SIGINT, interrupt)
+        stage_limits = {stage: asyncio.Semaphore(max(1, limit)) for stage, limit in MIGRATION_STAGE_CONCURRENCY.items()}
+        consumer = asyncio.create_task(consume_queue(
+            queue, default_worker_id(), "migration", MIGRATION_CONCURRENCY, poll_seconds=1, stop=stop, stage_limits=stage_limits
+        ))
+        
+        started = time.monotonic()
+        last_report = started
+        finished_before = self.success_count + self.error_count + self.deferred_count
+        while not consumer.done():
+            await asyncio.wait({consumer}, timeout=2)
+            await asyncio.to_thread(self.report_rows, queue)
+            stats = await asyncio.to_thread(queue.get_stats, "migration")
+            # 지금 처리할 수 있는 행이 없으면 종료 (미뤄진 행은 다음 실행 때)
+            if not stats["ready"] and not stats["status"].get("running"):
+                stop.set()
+            now = time.monotonic()
+            if now - last_report >= MIGRATION_REPORT_SECONDS or consumer.done():
+                last_report = now
+                finished = self.success_count + self.error_count + self.deferred_count - finished_before
+                remaining = stats["status"].get("pending", 0) + stats["status"].get("running", 0)
+                print(format_progress(finished, remaining, now - started))
+        await consumer
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="구글시트 → Airtable 마이그레이션")
+    parser.add_argument("--parallel", action="store_true", help="병렬·재개 가능 모드로 바로 실행 (확인 질문 없음)")
+    parser.add_argument("--limit", type=int, default=None, help="새로 추가할 최대 행 수")
+    parser.add_argument("--no-tts", action="store_true", help="TTS 생성 제외")
+    parser.add_argument("--dry-run", action="store_true", help="처리할 행만 출력")
+    return parser.parse_args(argv)
 
 def main():
     """메인 실행 함수"""
+    args = parse_args()
     print("🌟 구글시트 → Airtable 마이그레이션 도구")
     print("=" * 50)
     
@@ -357,6 +523,11 @@ def main():
         print("MIGRATION_SHEET_NAME=migration_tooly")
         return
     
+    if args.parallel:
+        processor = MigrationProcessor()
+        processor.run_parallel_migration(include_tts=not args.no_tts, dry_run=args.dry_run, limit=args.limit)
+        return
+    
     # 처리 개수 선택
     print("\n📊 처리할 개수를 선택해주세요:")
     print("1. 3개 처리")
@@ -0,0 +1,41 @@
+# pipeline.py - 디스코드 이벤트 루프를 막지 않고 블로킹 작업을 실행하는 헬퍼
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 블로킹 작업(크롤링, Gemini, TTS, Airtable, 텔레그램)을 실행할 워커 스레드 수
+PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', '4'))
+
+_executor = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """파이프라인 전용 워커 풀 (처음 사용할 때 생성)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=PIPELINE_WORKERS,
+            thread_name_prefix="pipeline"
+        )
+        print(f"🧵 파이프라인 워커 풀 생성: {PIPELINE_WORKERS}개")
+    return _executor
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    블로킹 함수를 워커 풀에서 실행하고 결과를 기다립니다.
+    이벤트 루프는 그동안 하트비트와 다른 채널 메시지를 계속 처리합니다.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_executor(wait: bool = True):
+    """워커 풀 종료"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
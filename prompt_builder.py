@@ -0,0 +1,143 @@
+# prompt_builder.py - 토큰 예산 기반 프롬프트 구성
+# 고정 지침(접두부)은 한 번만 만들어 재사용하고, 페이지 본문은 글자 수가 아닌 토큰 예산에 맞춰 문장 단위로 자름
+# 호출마다 프롬프트 토큰 수(응답에 사용량이 있으면 실제 값, 없으면 추정치)를 집계
+
+import os
+import re
+import threading
+from typing import Dict
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 단건 요약 시 본문에 쓸 토큰 예산 / 일괄 요약 시 사이트당 토큰 예산
+GEMINI_TEXT_TOKEN_BUDGET = int(os.getenv('GEMINI_TEXT_TOKEN_BUDGET', '3000'))
+GEMINI_BATCH_TEXT_TOKENS = int(os.getenv('GEMINI_BATCH_TEXT_TOKENS', '1500'))
+
+# 토큰 수 추정 (토크나이저 없이): 영문/숫자/기호는 약 4자, 한글 등 그 외 문자는 약 1.5자당 1토큰
+ASCII_CHARS_PER_TOKEN = 4.0
+OTHER_CHARS_PER_TOKEN = 1.5
+
+# 문장 끝(마침표, 물음표, 느낌표 뒤 공백) 또는 줄바꿈에서 나눔
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。！？])\s+|\n+')
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    other_chars = len(text) - ascii_chars
+    return int(ascii_chars / ASCII_CHARS_PER_TOKEN + other_chars / OTHER_CHARS_PER_TOKEN + 0.5)
+
+def trim_to_token_budget(text: str, budget: int) -> str:
+    """토큰 예산 안에 들어가는 앞부분 문장들만 남김 (첫 문장부터 예산을 넘으면 글자 단위로 자름)"""
+    if budget <= 0 or not text:
+        return ""
+    if estimate_tokens(text) <= budget:
+        return text
+
+    kept = []
+    used = 0
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[start:match.start()]
+        cost = estimate_tokens(sentence) + 1
+        if used + cost > budget:
+            break
+        kept.append(text[start:match.end()])
+        used += cost
+        start = match.end()
+    else:
+        # 마지막 문장(뒤에 경계 없음)
+        sentence = text[start:]
+        if used + estimate_tokens(sentence) <= budget:
+            kept.append(sentence)
+            start = len(text)
+
+    if not kept:
+        # 문장 하나가 예산보다 긴 경우 - 예산에 맞는 글자 수까지만
+        end = 0
+        while end < len(text) and estimate_tokens(text[:end + 256]) <= budget:
+            end += 256
+        while end < len(text) and estimate_tokens(text[:end + 1]) <= budget:
+            end += 1
+        return text[:end]
+    return "".join(kept).rstrip()
+
+class PromptStats:
+    """호출별 프롬프트 토큰 집계"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.text_tokens = 0
+        self.trimmed = 0
+
+    def record(self, prompt_tokens: int, text_tokens: int, trimmed: bool):
+        with self.lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.text_tokens += text_tokens
+            self.trimmed += int(trimmed)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "text_tokens": self.text_tokens,
+                "trimmed": self.trimmed,
+                "avg_prompt_tokens": self.prompt_tokens / self.calls if self.calls else 0.0
+            }
+
+prompt_stats = PromptStats()
+
+class BuiltPrompt:
+    """완성된 프롬프트와 토큰 정보"""
+
+    def __init__(self, prefix: str, prefix_tokens: int, body: str, text_tokens: int, trimmed: bool):
+        self.text = f"{prefix}\n\n{body}"
+        self.body = body
+        self.prefix_tokens = prefix_tokens
+        self.text_tokens = text_tokens
+        self.prompt_tokens = prefix_tokens + estimate_tokens(body) + 1
+        self.trimmed = trimmed
+
+    def report(self, label: str, response=None):
+        """호출 후 프롬프트 토큰 출력/집계 (응답에 사용량 정보가 있으면 그 값을 사용)"""
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "prompt_token_count", None) if usage else None
+        tokens = actual or self.prompt_tokens
+        prompt_stats.record(tokens, self.text_tokens, self.trimmed)
+        source = "" if actual else "약 "
+        print(f"🧮 {label} 프롬프트 토큰: {source}{tokens:,} (지침 {self.prefix_tokens:,} + 본문 {self.text_tokens:,}"
+              f"{', 예산에 맞춰 자름' if self.trimmed else ''})")
+
+class PromptTemplate:
+    """고정 접두부(지침)를 한 번만 만들고 토큰 수도 한 번만 계산해 두는 템플릿"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix.strip()
+        self.prefix_tokens = estimate_tokens(self.prefix)
+
+    def build(self, sections: list, budget: int) -> BuiltPrompt:
+        """
+        sections: [(머리말, 본문), ...] - 본문마다 budget 토큰까지 문장 단위로 잘라 접두부 뒤에 붙임
+        """
+        parts = []
+        text_tokens = 0
+        trimmed = False
+        for header, text in sections:
+            kept = trim_to_token_budget(text or "", budget)
+            trimmed = trimmed or len(kept) < len((text or "").rstrip())
+            text_tokens += estimate_tokens(kept)
+            parts.append(f"{header}\n{kept}" if header else kept)
+        return BuiltPrompt(self.prefix, self.prefix_tokens, "\n\n".join(parts), text_tokens, trimmed)
+
+def print_prompt_stats():
+    stats = prompt_stats.get_stats()
+    if not stats["calls"]:
+        return
+    print(f"🧮 Gemini 프롬프트: {stats['calls']}회, 평균 {stats['avg_prompt_tokens']:,.0f}토큰, "
+          f"본문 합계 {stats['text_tokens']:,}토큰, 예산 초과로 자른 요청 {stats['trimmed']}회")
@@ -0,0 +1,276 @@
+# rate_limit.py - 업스트림별 요청 한도 스케줄러 (토큰 버킷)
+# Gemini / Airtable / Notion / Telegram / Google TTS / Drive / Sheets 호출 전에 해당 한도에서 허용량을 받아가고,
+# 429(또는 그에 해당하는 오류)를 받으면 Retry-After(없으면 업스트림별 기본값)만큼 그 한도를 멈춤
+# 고정 대기 대신 한도가 허용하는 만큼만 기다리므로 한도 안에서는 최대 속도로 처리
+
+import asyncio
+import email.utils
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+from http_client import async_request, get_session
+
+# 환경 변수 로드
+load_dotenv()
+
+# 업스트림별 한도
+GEMINI_RPM = float(os.getenv('GEMINI_RPM', '60'))
+GEMINI_TPM = float(os.getenv('GEMINI_TPM', '1000000'))
+AIRTABLE_RPS = float(os.getenv('AIRTABLE_RPS', '5'))
+NOTION_RPS = float(os.getenv('NOTION_RPS', '3'))
+TELEGRAM_RPS = float(os.getenv('TELEGRAM_RPS', '30'))
+TELEGRAM_CHAT_RPM = float(os.getenv('TELEGRAM_CHAT_RPM', '20'))
+TTS_RPM = float(os.getenv('TTS_RPM', '300'))
+DRIVE_RPS = float(os.getenv('DRIVE_RPS', '10'))
+SHEETS_WRITE_RPM = float(os.getenv('SHEETS_WRITE_RPM', '60'))
+# 429를 받았을 때 같은 요청을 다시 시도하는 최대 횟수
+RATE_LIMIT_MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', '3'))
+
+# shared: 업스트림 전체에 적용 / per_key: 키(베이스, 채팅, API 키)마다 적용 - (허용 횟수, 기간(초)) 목록
+# tokens: 요청 크기(토큰)에 대한 한도 / backoff: 429에 대기 시간 정보가 없을 때 기본 대기(초)
+UPSTREAM_LIMITS = {
+    "gemini": {"per_key": [(GEMINI_RPM, 60)], "tokens": (GEMINI_TPM, 60), "backoff": 10.0},
+    # Airtable은 베이스당 초당 5회, 429 후에는 30초를 기다려야 함
+    "airtable": {"per_key": [(AIRTABLE_RPS, 1)], "backoff": 30.0},
+    "notion": {"shared": [(NOTION_RPS, 1)], "backoff": 1.0},
+    # Telegram은 봇 전체 초당 30회, 같은 채팅(그룹)에는 분당 20회
+    "telegram": {"shared": [(TELEGRAM_RPS, 1)], "per_key": [(TELEGRAM_CHAT_RPM, 60)], "backoff": 5.0},
+    "tts": {"shared": [(TTS_RPM, 60)], "backoff": 5.0},
+    "drive": {"shared": [(DRIVE_RPS, 1)], "backoff": 5.0},
+    # Sheets는 사용자당 분당 쓰기 60회
+    "sheets": {"shared": [(SHEETS_WRITE_RPM, 60)], "backoff": 10.0},
+}
+
+class TokenBucket:
+    """
+    period초에 amount만큼 차는 버킷 (최대 amount까지 모아둘 수 있음)
+    허용량이 모자라도 미리 빼두고(음수) 기다릴 시간을 돌려주므로, 동시에 들어온 요청은 순서대로 간격이 벌어짐
+    """
+
+    def __init__(self, amount: float, period: float):
+        self.capacity = max(1.0, amount)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        # tokens가 기준으로 하는 시각 (멈춘 동안은 미래 시각)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """cost만큼 가져가고, 실제로 쓸 수 있을 때까지 기다려야 하는 시간(초)을 반환"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= min(cost, self.capacity)
+            return max(0.0, self.updated - now) + max(0.0, -self.tokens / self.rate)
+
+    def pause(self, seconds: float):
+        """지금부터 seconds 동안 허용량이 차지 않게 멈춤"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, now + seconds)
+
+class RateLimiter:
+    """업스트림(과 키)별 버킷을 처음 쓸 때 만들어 보관"""
+
+    def __init__(self, limits: Dict = None):
+        self.limits = limits or UPSTREAM_LIMITS
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.stats = {}
+
+    def _buckets(self, upstream: str, key: Optional[str]) -> list:
+        """(버킷, 토큰 한도 여부) 목록"""
+        limit = self.limits[upstream]
+        specs = [(("shared", index), amount, period, False) for index, (amount, period) in enumerate(limit.get("shared", []))]
+        specs += [(("key", key, index), amount, period, False) for index, (amount, period) in enumerate(limit.get("per_key", []))]
+        if limit.get("tokens"):
+            specs.append((("tokens", key), *limit["tokens"], True))
+
+        result = []
+        with self.lock:
+            for scope, amount, period, is_tokens in specs:
+                bucket = self.buckets.get((upstream, scope))
+                if bucket is None:
+                    bucket = TokenBucket(amount, period)
+                    self.buckets[(upstream, scope)] = bucket
+                result.append((bucket, is_tokens))
+        return result
+
+    def _record(self, upstream: str, name: str, value: float = 1):
+        with self.lock:
+            stat = self.stats.setdefault(upstream, {"requests": 0, "waits": 0, "wait_seconds": 0.0, "backoffs": 0})
+            stat[name] += value
+
+    def reserve(self, upstream: str, key: str = None, tokens: float = 0) -> float:
+        """호출 1회(와 tokens만큼의 크기)를 예약하고 기다려야 하는 시간(초)을 반환"""
+        wait = 0.0
+        for bucket, is_tokens in self._buckets(upstream, key):
+            if is_tokens and tokens <= 0:
+                continue
+            wait = max(wait, bucket.reserve(tokens if is_tokens else 1))
+        self._record(upstream, "requests")
+        if wait > 0:
+            self._record(upstream, "waits")
+            self._record(upstream, "wait_seconds", wait)
+        return wait
+
+    def acquire(self, upstream: str, key: str = None, tokens: float = 0):
+        """동기 코드용 - 한도가 허용할 때까지 현재 스레드에서 대기"""
+        wait = self.reserve(upstream, key, tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, upstream: str, key: str = None, tokens: float = 0):
+        """asyncio용 - 이벤트 루프를 막지 않고 대기"""
+        wait = self.reserve(upstream, key, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def backoff(self, upstream: str, key: str = None, retry_after: Optional[float] = None, attempt: int = 0) -> float:
+        """
+        429를 받았을 때 해당 업스트림(과 키)의 버킷을 멈춤
+        retry_after가 없으면 업스트림별 기본값에서 시도마다 두 배씩 (최대 5분)
+        """
+        if retry_after is None:
+            retry_after = min(300.0, self.limits[upstream].get("backoff", 5.0) * (2 ** attempt))
+        for bucket, _ in self._buckets(upstream, key):
+            bucket.pause(retry_after)
+        self._record(upstream, "backoffs")
+        print(f"⏳ {upstream} 요청 한도 초과 - {retry_after:.1f}초 동안 요청 중지")
+        return retry_after
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {upstream: dict(stat) for upstream, stat in self.stats.items()}
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 전체에서 공유하는 요청 한도 스케줄러"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+def scaled_limits(share: float, limits: Dict = None) -> Dict:
+    """한도를 share 비율만큼으로 줄인 사본 (기간과 429 기본 대기는 그대로)"""
+    scaled = {}
+    for upstream, limit in (limits or UPSTREAM_LIMITS).items():
+        scaled[upstream] = dict(limit)
+        for scope in ("shared", "per_key"):
+            if scope in limit:
+                scaled[upstream][scope] = [(amount * share, period) for amount, period in limit[scope]]
+        if limit.get("tokens"):
+            amount, period = limit["tokens"]
+            scaled[upstream]["tokens"] = (amount * share, period)
+    return scaled
+
+def share_rate_limits(processes: int):
+    """여러 프로세스가 같은 API 한도를 쓸 때 이 프로세스의 몫(1/processes)만 쓰도록 스케줄러를 교체"""
+    global _limiter
+    with _limiter_lock:
+        _limiter = RateLimiter(scaled_limits(1 / max(1, processes)))
+
+def parse_retry_after(value) -> Optional[float]:
+    """Retry-After 값(초 또는 HTTP 날짜)을 초로 변환"""
+    if value is None or value == "":
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def response_retry_after(response) -> Optional[float]:
+    """HTTP 응답의 Retry-After 헤더 (Telegram은 본문의 parameters.retry_after)"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+    if retry_after is None:
+        try:
+            retry_after = parse_retry_after(response.json().get('parameters', {}).get('retry_after'))
+        except (ValueError, AttributeError):
+            pass
+    return retry_after
+
+def rate_limit_delay(exc: Exception):
+    """
+    라이브러리 예외가 요청 한도 초과인지 판별
+    한도 초과가 아니면 False, 맞으면 Retry-After 초(없으면 None)
+    - google.api_core ResourceExhausted (Gemini, TTS): code 429
+    - googleapiclient HttpError (Drive): resp.status 429 또는 403 rateLimitExceeded
+    """
+    if getattr(exc, 'code', None) == 429:
+        return None
+    resp = getattr(exc, 'resp', None)
+    status = getattr(resp, 'status', None)
+    if status == 429 or (status == 403 and 'ateLimitExceeded' in str(exc)):
+        return parse_retry_after(resp.get('retry-after'))
+    return False
+
+def call_with_limit(upstream: str, key: Optional[str], func: Callable, tokens: float = 0):
+    """한도를 받아 func()를 호출하고, 한도 초과 예외면 멈췄다가 다시 시도 (동기)"""
+    limiter = get_rate_limiter()
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        limiter.acquire(upstream, key, tokens)
+        try:
+            return func()
+        except Exception as e:
+            retry_after = rate_limit_delay(e)
+            if retry_after is False or attempt == RATE_LIMIT_MAX_RETRIES:
+                raise
+            limiter.backoff(upstream, key, retry_after, attempt)
+
+async def call_with_limit_async(upstream: str, key: Optional[str], func: Callable, tokens: float = 0):
+    """call_with_limit의 asyncio 버전 (func는 코루틴을 돌려주는 함수)"""
+    limiter = get_rate_limiter()
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        await limiter.acquire_async(upstream, key, tokens)
+        try:
+            return await func()
+        except Exception as e:
+            retry_after = rate_limit_delay(e)
+            if retry_after is False or attempt == RATE_LIMIT_MAX_RETRIES:
+                raise
+            limiter.backoff(upstream, key, retry_after, attempt)
+
+async def limited_request(upstream: str, key: Optional[str], method: str, url: str, **kwargs):
+    """한도를 받아 async_request로 보내고, 429면 Retry-After만큼 멈췄다가 다시 보냄"""
+    limiter = get_rate_limiter()
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        await limiter.acquire_async(upstream, key)
+        response = await async_request(method, url, **kwargs)
+        if response.status_code != 429 or attempt == RATE_LIMIT_MAX_RETRIES:
+            return response
+        limiter.backoff(upstream, key, response_retry_after(response), attempt)
+
+def limited_session_request(upstream: str, key: Optional[str], method: str, url: str, **kwargs):
+    """limited_request의 동기 버전 (공용 requests 세션 사용)"""
+    limiter = get_rate_limiter()
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        limiter.acquire(upstream, key)
+        response = get_session().request(method, url, **kwargs)
+        if response.status_code != 429 or attempt == RATE_LIMIT_MAX_RETRIES:
+            return response
+        limiter.backoff(upstream, key, response_retry_after(response), attempt)
+
+def print_rate_limit_stats():
+    stats = get_rate_limiter().get_stats()
+    if not stats:
+        return
+    print("🚦 요청 한도 통계:")
+    for upstream, stat in sorted(stats.items()):
+        print(f"  {upstream}: 요청 {stat['requests']}회, 대기 {stat['waits']}회 (총 {stat['wait_seconds']:.1f}초), "
+              f"429 백오프 {stat['backoffs']}회")
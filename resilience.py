@@ -0,0 +1,285 @@
+# resilience.py - 재시도 정책(지터가 있는 지수 백오프)과 업스트림별 서킷 브레이커
+# 일시적 오류(5xx, 연결 실패, 타임아웃)는 몇 번 다시 시도하고, 같은 업스트림에서 연속으로 실패하면 서킷을 열어
+# 일정 시간 동안은 호출하지 않고 바로 CircuitOpenError를 냄 (장애 중인 서비스에 시간을 쓰지 않도록)
+# 요청 한도(429)는 rate_limit에서 처리하므로 여기서는 재시도하지 않음
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+import aiohttp
+import requests
+from dotenv import load_dotenv
+from rate_limit import call_with_limit, call_with_limit_async, limited_request, limited_session_request, rate_limit_delay
+
+# 환경 변수 로드
+load_dotenv()
+
+# 한 호출에 대한 최대 시도 횟수 / 백오프 기준·최대 대기 (초)
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '3'))
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '1'))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '20'))
+# 연속 실패가 이만큼 쌓이면 서킷을 열고, 이 시간(초)이 지나면 한 번 시험 호출
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', '60'))
+
+RETRYABLE_STATUS = {500, 502, 503, 504}
+# 다시 보내도 결과가 같은 HTTP 메서드 (POST 등은 요청이 나가지 않은 게 확실할 때만 재시도)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+class TransientError(Exception):
+    """5xx 응답처럼 다시 시도하면 성공할 수 있는 오류"""
+
+    def __init__(self, message: str, response=None):
+        super().__init__(message)
+        self.response = response
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출하지 않음"""
+
+    def __init__(self, upstream: str, retry_in: float):
+        super().__init__(f"{upstream} 서킷 열림 - {retry_in:.0f}초 후 다시 시도")
+        self.upstream = upstream
+        self.retry_in = retry_in
+
+def error_status(exc: Exception) -> Optional[int]:
+    """라이브러리 예외의 HTTP 상태 코드 (google.api_core: code, googleapiclient: resp.status)"""
+    code = getattr(exc, 'code', None)
+    if isinstance(code, int):
+        return code
+    status = getattr(getattr(exc, 'resp', None), 'status', None)
+    return int(status) if status is not None else None
+
+def is_transient(exc: Exception) -> bool:
+    if isinstance(exc, TransientError):
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError, aiohttp.ClientConnectionError,
+                        requests.ConnectionError, requests.Timeout)):
+        return True
+    return error_status(exc) in RETRYABLE_STATUS
+
+def is_unsent(exc: Exception) -> bool:
+    """요청이 서버에 도달하지 않은 게 확실한 오류 (멱등이 아닌 요청도 재시도 가능)"""
+    return isinstance(exc, (aiohttp.ClientConnectorError, requests.ConnectTimeout, ConnectionRefusedError))
+
+def is_unavailable(exc: Exception) -> bool:
+    """재시도 후에도 남은 일시적 장애 (서킷 열림, 5xx, 연결 실패, 요청 한도 초과)"""
+    return isinstance(exc, CircuitOpenError) or is_transient(exc) or rate_limit_delay(exc) is not False
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """attempt번째 실패 후 대기 시간 - 0부터 지수 상한 사이에서 무작위 (여러 요청이 한꺼번에 재시도하지 않도록)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def should_retry(self, exc: Exception, attempt: int, idempotent: bool) -> bool:
+        if attempt + 1 >= self.max_attempts:
+            return False
+        return is_transient(exc) if idempotent else is_unsent(exc)
+
+DEFAULT_RETRY = RetryPolicy()
+
+class CircuitBreaker:
+    """
+    closed: 정상 / open: 호출하지 않고 바로 CircuitOpenError / half_open: 시험 호출 하나만 통과
+    일시적 오류만 실패로 셈 (4xx 같은 응답은 서비스가 살아 있다는 뜻이므로 성공으로 봄)
+    """
+
+    def __init__(self, upstream: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.upstream = upstream
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def before_call(self):
+        with self.lock:
+            if self.state == "open":
+                retry_in = self.opened_at + self.reset_seconds - time.monotonic()
+                if retry_in > 0:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError(self.upstream, retry_in)
+                self.state = "half_open"
+                self.probing = False
+            if self.state == "half_open":
+                if self.probing:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError(self.upstream, self.reset_seconds)
+                self.probing = True
+            self.stats["calls"] += 1
+
+    def record_success(self):
+        with self.lock:
+            if self.state != "closed":
+                print(f"✅ {self.upstream} 서킷 닫힘 (복구)")
+            self.state = "closed"
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats["opened"] += 1
+                    print(f"🔌 {self.upstream} 서킷 열림 (연속 실패 {self.failures}회) - {self.reset_seconds:.0f}초 동안 호출 중지")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+    def release(self):
+        """결과 없이 끝난 호출(취소, 인터럽트) - 반쯤 열린 상태의 시험 호출이었다면 다음 호출이 다시 시험하도록"""
+        with self.lock:
+            self.probing = False
+
+    def record(self, exc: Optional[Exception]):
+        if exc is not None and is_transient(exc):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, state=self.state)
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(upstream: str) -> CircuitBreaker:
+    """업스트림별 서킷 브레이커 (프로세스 전체에서 공유)"""
+    with _breakers_lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            breaker = CircuitBreaker(upstream)
+            _breakers[upstream] = breaker
+        return breaker
+
+def call_with_retry(upstream: str, func: Callable, idempotent: bool = True, policy: RetryPolicy = None,
+                    use_breaker: bool = True):
+    """func()를 호출하고 일시적 오류면 백오프 후 재시도 (use_breaker=False면 서킷 없이 재시도만)"""
+    policy = policy or DEFAULT_RETRY
+    breaker = get_circuit_breaker(upstream) if use_breaker else None
+    attempt = 0
+    while True:
+        if breaker:
+            breaker.before_call()
+        try:
+            result = func()
+        except Exception as e:
+            if breaker:
+                breaker.record(e)
+            if not policy.should_retry(e, attempt, idempotent):
+                raise
+            delay = policy.delay(attempt)
+            print(f"🔁 {upstream} 일시적 오류({e}), {delay:.1f}초 후 재시도 ({attempt + 2}/{policy.max_attempts})")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            if breaker:
+                breaker.release()
+            raise
+        if breaker:
+            breaker.record_success()
+        return result
+
+async def call_with_retry_async(upstream: str, func: Callable, idempotent: bool = True, policy: RetryPolicy = None,
+                                use_breaker: bool = True):
+    """call_with_retry의 asyncio 버전 (func는 코루틴을 돌려주는 함수)"""
+    policy = policy or DEFAULT_RETRY
+    breaker = get_circuit_breaker(upstream) if use_breaker else None
+    attempt = 0
+    while True:
+        if breaker:
+            breaker.before_call()
+        try:
+            result = await func()
+        except Exception as e:
+            if breaker:
+                breaker.record(e)
+            if not policy.should_retry(e, attempt, idempotent):
+                raise
+            delay = policy.delay(attempt)
+            print(f"🔁 {upstream} 일시적 오류({e}), {delay:.1f}초 후 재시도 ({attempt + 2}/{policy.max_attempts})")
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            # 취소(CancelledError)나 KeyboardInterrupt는 실패로 세지 않지만 시험 호출 표시는 풀어 줌
+            if breaker:
+                breaker.release()
+            raise
+        if breaker:
+            breaker.record_success()
+        return result
+
+def call_upstream(upstream: str, key: Optional[str], func: Callable, idempotent: bool = True, tokens: float = 0):
+    """라이브러리 호출용 - 서킷 확인, 요청 한도, 일시적 오류 재시도를 모두 적용 (동기)"""
+    return call_with_retry(upstream, lambda: call_with_limit(upstream, key, func, tokens), idempotent)
+
+async def call_upstream_async(upstream: str, key: Optional[str], func: Callable, idempotent: bool = True, tokens: float = 0):
+    """call_upstream의 asyncio 버전"""
+    return await call_with_retry_async(upstream, lambda: call_with_limit_async(upstream, key, func, tokens), idempotent)
+
+async def resilient_request(upstream: str, key: Optional[str], method: str, url: str, idempotent: bool = None, **kwargs):
+    """
+    HTTP 요청용 - limited_request에 재시도와 서킷을 더함
+    재시도 후에도 5xx면 마지막 응답을 그대로 돌려주므로 호출하는 쪽의 상태 코드 처리는 그대로 동작
+    """
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    async def send():
+        response = await limited_request(upstream, key, method, url, **kwargs)
+        if response.status_code in RETRYABLE_STATUS:
+            raise TransientError(f"HTTP {response.status_code}", response)
+        return response
+
+    try:
+        return await call_with_retry_async(upstream, send, idempotent)
+    except TransientError as e:
+        if e.response is None:
+            raise
+        return e.response
+
+def resilient_session_request(upstream: str, key: Optional[str], method: str, url: str, idempotent: bool = None, **kwargs):
+    """resilient_request의 동기 버전 (공용 requests 세션 사용)"""
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    def send():
+        response = limited_session_request(upstream, key, method, url, **kwargs)
+        if response.status_code in RETRYABLE_STATUS:
+            raise TransientError(f"HTTP {response.status_code}", response)
+        return response
+
+    try:
+        return call_with_retry(upstream, send, idempotent)
+    except TransientError as e:
+        if e.response is None:
+            raise
+        return e.response
+
+def print_circuit_stats():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    if not breakers:
+        return
+    print("🔌 업스트림 서킷 상태:")
+    for breaker in sorted(breakers, key=lambda b: b.upstream):
+        stat = breaker.get_stats()
+        print(f"  {breaker.upstream}: {stat['state']}, 호출 {stat['calls']}회, 일시적 오류 {stat['failures']}회, "
+              f"서킷으로 거절 {stat['rejected']}회")
@@ -0,0 +1,90 @@
+# sheet_status.py - 구글 시트 상태 열 버퍼 쓰기
+# 행마다 update_cell을 부르는 대신 바뀐 상태를 모아 두었다가(같은 행은 마지막 값만) batch_update 한 번으로 씀
+# 모인 행이 일정 수를 넘거나 일정 시간이 지나면 쓰고, 종료할 때 남은 것을 마저 씀
+
+import atexit
+import os
+import threading
+from typing import Dict
+from dotenv import load_dotenv
+from gspread.utils import rowcol_to_a1
+from resilience import call_upstream
+
+# 환경 변수 로드
+load_dotenv()
+
+# 이만큼 모이면 바로 쓰고, 그보다 적어도 이 시간(초)이 지나면 씀
+SHEET_FLUSH_ROWS = int(os.getenv('SHEET_FLUSH_ROWS', '50'))
+SHEET_FLUSH_SECONDS = float(os.getenv('SHEET_FLUSH_SECONDS', '10'))
+
+class SheetStatusWriter:
+    """worksheet의 column열(기본 B열)에 행별 상태를 모아서 씀"""
+
+    def __init__(self, sheet, column: int = 2, flush_rows: int = SHEET_FLUSH_ROWS,
+                 flush_seconds: float = SHEET_FLUSH_SECONDS):
+        self.sheet = sheet
+        self.column = column
+        self.flush_rows = max(1, flush_rows)
+        self.flush_seconds = flush_seconds
+        self.lock = threading.Lock()
+        # 쓰기는 한 번에 하나만 (순서가 뒤바뀌어 예전 값이 덮어쓰지 않도록)
+        self.flush_lock = threading.Lock()
+        self.pending = {}
+        self.stats = {"updates": 0, "writes": 0, "rows_written": 0, "errors": 0}
+        self.closed = threading.Event()
+        self.timer = None
+        atexit.register(self.close)
+
+    def set(self, row_number: int, status: str):
+        """row_number행의 상태를 바꾸도록 예약 (이미 예약된 값은 덮어씀)"""
+        with self.lock:
+            self.pending[row_number] = status
+            self.stats["updates"] += 1
+            full = len(self.pending) >= self.flush_rows
+            if self.timer is None and not self.closed.is_set():
+                self.timer = threading.Thread(target=self._run_timer, name="sheet-status", daemon=True)
+                self.timer.start()
+        if full:
+            self.flush()
+
+    def _run_timer(self):
+        while not self.closed.wait(self.flush_seconds):
+            self.flush()
+
+    def flush(self) -> int:
+        """예약된 상태를 모두 씀 - 쓴 행 수를 반환 (실패하면 다음 쓰기 때 다시 시도)"""
+        with self.flush_lock:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            if not pending:
+                return 0
+            data = [{"range": rowcol_to_a1(row_number, self.column), "values": [[status]]}
+                    for row_number, status in sorted(pending.items())]
+            try:
+                call_upstream("sheets", None, lambda: self.sheet.batch_update(data))
+            except Exception as e:
+                print(f"❌ 시트 상태 쓰기 실패 ({len(pending)}행, 다음에 다시 시도): {str(e)}")
+                with self.lock:
+                    self.stats["errors"] += 1
+                    # 그 사이에 새로 예약된 값이 있으면 그쪽을 유지
+                    self.pending = dict(pending, **self.pending)
+                return 0
+            with self.lock:
+                self.stats["writes"] += 1
+                self.stats["rows_written"] += len(pending)
+            print(f"📝 시트 상태 {len(pending)}행 반영")
+            return len(pending)
+
+    def close(self):
+        """타이머를 멈추고 남은 상태를 씀"""
+        self.closed.set()
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, pending=len(self.pending))
+
+def print_sheet_status_stats(writer: SheetStatusWriter):
+    stat = writer.get_stats()
+    print(f"📝 시트 상태 쓰기: 변경 {stat['updates']}건 → API 호출 {stat['writes']}회 ({stat['rows_written']}행), "
+          f"실패 {stat['errors']}회, 남은 변경 {stat['pending']}건")
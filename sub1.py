@@ -1,41 +1,121 @@
-import requests
-from bs4 import BeautifulSoup
-import google.generativeai as genai
+from http_client import async_stream_text, run_sync, UnsupportedContentType
+from crawl_cache import get_crawl_cache
+import asyncio
+import os
+import re
+from text_extract import extract_main_text, VisibleTextCounter
+from gemini_client import get_gemini_model, GEMINI_MODEL
+from summary_cache import get_summary_cache
+from gemini_schema import SiteSummary, SchemaError, FIELD_NAMES, parse_site_summary, parse_site_summaries, airtable_fields, validate_fields as validate_notion_fields
+from dataclasses import asdict
+from functools import lru_cache
+from prompt_builder import PromptTemplate, BuiltPrompt, GEMINI_TEXT_TOKEN_BUDGET, GEMINI_BATCH_TEXT_TOKENS
+from resilience import TransientError, RETRYABLE_STATUS, call_with_retry_async, is_unavailable
 import time
 from typing import Optional
 import json
 from datetime import datetime
+from dotenv import load_dotenv
 
-def extract_text_from_url(url: str) -> str:
+# 환경 변수 로드
+load_dotenv()
+
+# 본문 추출 방식이 바뀌면 올려서 캐시된 텍스트를 다시 추출하게 함
+EXTRACTOR_VERSION = "3"
+
+# 페이지 다운로드 상한 (바이트) - 넘으면 앞부분만 사용
+CRAWL_MAX_BYTES = int(os.getenv('CRAWL_MAX_BYTES', str(2 * 1024 * 1024)))
+# 태그 밖 글자가 이만큼 모이면 다운로드 중단 (Gemini에는 본문 앞 8000자만 전달)
+CRAWL_TEXT_TARGET_CHARS = int(os.getenv('CRAWL_TEXT_TARGET_CHARS', '40000'))
+# 본문을 읽을 Content-Type (PDF, 동영상, 이미지 등은 다운로드하지 않음)
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+def parse_html_text(html: str) -> str:
+    """HTML에서 제목과 본문 텍스트를 추출합니다. (text_extract.extract_main_text 사용)"""
+    return extract_main_text(html)
+
+async def _text_from_cache_entry(cache, entry: dict) -> str:
+    """캐시된 텍스트 반환 (추출기 버전이 다르면 저장된 HTML로 다시 추출)"""
+    if entry["text_version"] == EXTRACTOR_VERSION and entry["text"] is not None:
+        return entry["text"]
+    text = await asyncio.to_thread(parse_html_text, entry["html"])
+    await asyncio.to_thread(cache.update_text, entry["content_hash"], text, EXTRACTOR_VERSION)
+    return text
+
+async def extract_text_from_url_async(url: str, use_cache: bool = True) -> str:
     """
     URL에서 본문 텍스트를 추출합니다.
+    다운로드는 이벤트 루프에서 기다리고, HTML 파싱은 별도 스레드에서 실행합니다.
+    크롤링 캐시가 켜져 있으면 TTL 안에서는 캐시를 쓰고, 지나면 조건부 요청으로 재검증합니다.
+    본문은 스트리밍으로 읽으며 HTML이 아니면 받지 않고, CRAWL_MAX_BYTES / CRAWL_TEXT_TARGET_CHARS에서 멈춥니다.
     """
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        cache = get_crawl_cache() if use_cache else None
+        entry = await asyncio.to_thread(cache.get, url) if cache else None
+        
+        if entry and entry["fresh"]:
+            print(f"🗂️ 크롤링 캐시 사용: {url}")
+            cache.record("hits")
+            await asyncio.to_thread(cache.touch, url)
+            return await _text_from_cache_entry(cache, entry)
+        
+        if cache:
+            headers.update(cache.conditional_headers(entry))
         
-        # 메타 태그에서 제목 추출
-        title = soup.find('title')
-        title_text = title.get_text() if title else ''
+        async def fetch():
+            counter = VisibleTextCounter()
+            response = await async_stream_text(
+                url, headers=headers, timeout=10, max_bytes=CRAWL_MAX_BYTES, allowed_types=HTML_CONTENT_TYPES,
+                should_stop=lambda chunk: counter.feed(chunk) >= CRAWL_TEXT_TARGET_CHARS
+            )
+            if response.status_code in RETRYABLE_STATUS:
+                raise TransientError(f"HTTP {response.status_code} 오류")
+            return response
         
-        # 본문 텍스트 추출
-        # 일반적인 본문 태그들
-        content_tags = soup.find_all(['p', 'article', 'div', 'section'])
-        content_text = ' '.join([tag.get_text().strip() for tag in content_tags])
+        # 사이트마다 호스트가 다르므로 서킷 없이 일시적 오류(5xx, 연결 실패, 타임아웃)만 재시도
+        response = await call_with_retry_async("crawl", fetch, use_breaker=False)
         
-        # 제목과 본문 결합
-        full_text = f"{title_text}\n\n{content_text}"
+        if response.status_code == 304 and entry:
+            print(f"🗂️ 변경 없음(304), 캐시 사용: {url}")
+            cache.record("revalidated")
+            await asyncio.to_thread(cache.touch, url, True)
+            return await _text_from_cache_entry(cache, entry)
         
-        return full_text.strip()
+        if response.status_code >= 400:
+            raise Exception(f"HTTP {response.status_code} 오류")
+        
+        if response.truncated:
+            print(f"✂️ 다운로드 조기 종료 ({response.bytes_read:,}B): {url}")
+        
+        text = await asyncio.to_thread(parse_html_text, response.text)
+        
+        if cache:
+            cache.record("misses")
+            await asyncio.to_thread(
+                cache.put, url, response.text, text, EXTRACTOR_VERSION,
+                response.headers.get('ETag'), response.headers.get('Last-Modified')
+            )
+        
+        return text
+    except UnsupportedContentType as e:
+        print(f"⏭️ HTML이 아닌 페이지라 본문 추출 생략 ({e}): {url}")
+        return ""
     except Exception as e:
+        # 재시도 후에도 남은 일시적 오류는 빈 본문으로 요약하지 않도록 호출한 쪽으로 올림 (4xx 등은 빈 본문)
+        if is_unavailable(e):
+            print(f"⏸️ 페이지를 일시적으로 가져오지 못해 보류: {url} ({str(e)})")
+            raise PageUnavailable(f"페이지 다운로드 실패: {str(e)}") from e
         print(f"Error extracting text from {url}: {str(e)}")
         return ""
 
+def extract_text_from_url(url: str, use_cache: bool = True) -> str:
+    """URL에서 본문 텍스트를 추출합니다. (extract_text_from_url_async의 동기 버전)"""
+    return run_sync(extract_text_from_url_async(url, use_cache))
+
 def parse_gemini_text_fields(text: str) -> dict:
     """Gemini 응답을 파싱하여 딕셔너리로 변환 (디버깅 강화)"""
     print(f"parse_gemini_text_fields 입력 텍스트:")
@@ -144,20 +224,28 @@ def flatten_fields_for_airtable(data: dict) -> dict:
     print(f"flatten_fields_for_airtable 최종 결과: {json.dumps(result, ensure_ascii=False, indent=2)}")
     return result
 
-def gemini_extract_notion_fields(text: str, url: str, api_key: str) -> dict:
-    """
-    Gemini API를 사용하여 Airtable용 6개 필드만 추출합니다.
-    """
-    try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        prompt = f"""
-아래 웹사이트({url})에 대해 다음 정보를 한국어로 자세히 정리해줘.
-각 항목은 반드시 한 줄에 하나씩, "키: 값" 형태로만 출력해줘.
+# 프롬프트나 응답 파싱이 바뀌면 올려서 요약 캐시를 무효화
+NOTION_PROMPT_VERSION = "3"
 
-**중요 지침:**
-1. 카테고리는 JSON 형태로 출력하지 말고, 단순히 쉼표로 구분된 텍스트로만 출력해줘.
-2. 평가/효용성은 반드시 '높음', '보통', '낮음' 중 하나만 써줘.
+# 응답 형식: json(구조화 응답, 기본값) / text(예전 "키: 값" 줄 형식)
+GEMINI_OUTPUT_MODE = os.getenv('GEMINI_OUTPUT_MODE', 'json').lower()
+# JSON 모드에서 모델에 요청할 응답 형식 (라이브러리가 지원하지 않으면 gemini_client에서 빠짐)
+GEMINI_JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# 프롬프트에 예시 응답(약 3KB)을 넣을지 여부 - 출력 형식 설명만으로 충분하므로 기본값은 넣지 않음
+GEMINI_FEW_SHOT = os.getenv('GEMINI_FEW_SHOT', 'false').lower() == 'true'
+
+# 일괄 요약 시 한 요청에 넣을 사이트 수
+GEMINI_BATCH_SIZE = int(os.getenv('GEMINI_BATCH_SIZE', '4'))
+# 여러 사이트의 스크립트가 한 응답에 들어가므로 출력 길이 상한을 최대로
+GEMINI_BATCH_GENERATION_CONFIG = {"max_output_tokens": 8192}
+
+def summary_version() -> str:
+    """요약 캐시 키에 들어가는 프롬프트 버전 (응답 형식별로 구분)"""
+    return f"{NOTION_PROMPT_VERSION}-{GEMINI_OUTPUT_MODE}"
+
+# 요약 설명 / 스크립트 작성 지침 (두 응답 형식 공통)
+NOTION_CONTENT_RULES = """
 3. 요약 설명은 최소 200자 이상으로 상세하게 작성해줘. 다음 내용을 포함해야 함:
    - 서비스/도구의 주요 기능과 특징
    - 어떤 문제를 해결하는지
@@ -169,76 +257,335 @@ def gemini_extract_notion_fields(text: str, url: str, api_key: str) -> dict:
    - 한국어 스크립트: 400-500자 분량 (60초 기준)
    - 영어 스크립트: 400-500자 분량 (60초 기준)
    - 더 자세한 설명과 예시를 포함해서 작성
+""".strip()
+
+# 필드 이름 -> 출력 형식 설명
+NOTION_FIELD_DESCRIPTIONS = {
+    "사이트 이름": "웹사이트나 서비스의 정확한 이름",
+    "URL": "제공된 URL 그대로",
+    "카테고리": "관련 카테고리들을 쉼표로 구분하여 최대 5개까지",
+    "활용 사례": "구체적인 사용 사례나 시나리오를 150자 이상으로 상세히 설명",
+    "평가/효용성": "높음/보통/낮음 중 하나만",
+    "요약 설명": "200자 이상의 상세한 설명으로, 위에서 언급한 모든 요소를 포함하여 작성",
+    "스크립트": "유튜브 60초 길이의 매력적인 스크립트 형태로 작성. 시작은 강력한 hook으로, 핵심 기능 소개, 구체적인 사용 예시, 장점 설명, 마무리는 구독 유도나 액션 콜까지 포함하여 400-500자 분량으로 작성",
+    "Script": "영어로 된 유튜브 60초 길이의 매력적인 스크립트. 영어권 시청자를 대상으로 자연스러운 영어 표현을 사용하여 작성. Hook - Feature Introduction - Detailed Use Case - Benefits - Call to Action 순서로 400-500자 분량"
+}
+
+# 프롬프트에 넣는 예시 (참고용)
+NOTION_EXAMPLE = SiteSummary(
+    site_name="ChatGPT",
+    url="https://chat.openai.com",
+    categories=["AI", "챗봇", "생산성", "업무 도구"],
+    use_cases="업무용 문서 작성 시 초안 생성, 코딩 문제 해결을 위한 코드 리뷰 및 디버깅 지원, 학습 과정에서 복잡한 개념 설명 요청, 창작 활동을 위한 아이디어 브레인스토밍, 이메일이나 보고서 작성 시 문체 교정 및 개선 제안 등 다양한 텍스트 기반 업무에서 AI 어시스턴트로 활용 가능",
+    rating="높음",
+    summary="OpenAI에서 개발한 대화형 인공지능 서비스로, 자연어 처리 기술을 바탕으로 사용자의 질문에 대화 형식으로 답변을 제공합니다. 텍스트 생성, 번역, 요약, 코딩 지원, 창작 등 매우 다양한 작업을 수행할 수 있어 개인 사용자부터 기업까지 폭넓게 활용되고 있습니다. 특히 복잡한 업무를 단순화하고 창의적 사고를 돕는 데 탁월하며, 24시간 언제든지 접근 가능한 점이 큰 장점입니다. 기존의 검색 엔진과 달리 맥락을 이해하고 개인화된 답변을 제공하여 업무 효율성을 크게 향상시킬 수 있습니다.",
+    script_ko="여러분, 업무 효율을 획기적으로 높이고 싶으신가요? 🚀 오늘 소개할 ChatGPT는 단순한 검색을 넘어선 진짜 AI 동료입니다! 복잡한 보고서 작성부터 코딩 문제 해결까지, 질문만 하면 즉시 맞춤형 답변을 받을 수 있어요. 예를 들어, '마케팅 전략 보고서 초안을 작성해줘'라고 하면 구체적인 내용까지 제안해줍니다. 24시간 언제든 접근 가능하고, 맥락을 이해하는 대화 방식이 정말 혁신적이죠! 기존 도구들과 달리 창의적 사고까지 도와주니까 업무가 완전히 달라집니다. 지금 바로 사용해보시고, 더 많은 생산성 도구가 궁금하다면 구독 버튼 눌러주세요!",
+    script_en="Want to revolutionize your productivity? 🚀 Meet ChatGPT - your AI colleague that goes way beyond simple searches! From writing complex reports to debugging code, just ask and get instant, personalized answers. For example, ask 'Help me draft a marketing strategy report' and it'll provide detailed suggestions with context. What makes it revolutionary is the 24/7 availability and conversational understanding that feels natural. Unlike traditional tools, it actually helps with creative thinking and complex problem-solving. It's like having a smart assistant who never sleeps and always understands what you need. Try ChatGPT today and transform how you work. Don't forget to subscribe for more productivity game-changers!"
+)
+
+def _example_as_text(example: SiteSummary) -> str:
+    lines = []
+    for name, value in example.to_fields().items():
+        if isinstance(value, list):
+            value = ", ".join(value)
+        elif name in ("스크립트", "Script"):
+            value = f'"{value}"'
+        lines.append(f"{name}: {value}")
+    return "\n".join(lines)
+
+# "키: 값" 줄 형식 지침 (단건 / 일괄 공통)
+NOTION_PROMPT_GUIDE = f"""
+**중요 지침:**
+1. 카테고리는 JSON 형태로 출력하지 말고, 단순히 쉼표로 구분된 텍스트로만 출력해줘.
+2. 평가/효용성은 반드시 '높음', '보통', '낮음' 중 하나만 써줘.
+{NOTION_CONTENT_RULES}
 
 **출력 형식:**
-사이트 이름: [웹사이트나 서비스의 정확한 이름]
-URL: [제공된 URL 그대로]
-카테고리: [관련 카테고리들을 쉼표로 구분하여 최대 5개까지]
-활용 사례: [구체적인 사용 사례나 시나리오를 150자 이상으로 상세히 설명]
-평가/효용성: [높음/보통/낮음 중 하나만]
-요약 설명: [200자 이상의 상세한 설명으로, 위에서 언급한 모든 요소를 포함하여 작성]
-스크립트: [유튜브 60초 길이의 매력적인 스크립트 형태로 작성. 시작은 강력한 hook으로, 핵심 기능 소개, 구체적인 사용 예시, 장점 설명, 마무리는 구독 유도나 액션 콜까지 포함하여 400-500자 분량으로 작성]
-Script: [영어로 된 유튜브 60초 길이의 매력적인 스크립트. 영어권 시청자를 대상으로 자연스러운 영어 표현을 사용하여 작성. Hook - Feature Introduction - Detailed Use Case - Benefits - Call to Action 순서로 400-500자 분량]
-
-**예시 (참고용):**
-사이트 이름: ChatGPT
-URL: https://chat.openai.com
-카테고리: AI, 챗봇, 생산성, 업무 도구
-활용 사례: 업무용 문서 작성 시 초안 생성, 코딩 문제 해결을 위한 코드 리뷰 및 디버깅 지원, 학습 과정에서 복잡한 개념 설명 요청, 창작 활동을 위한 아이디어 브레인스토밍, 이메일이나 보고서 작성 시 문체 교정 및 개선 제안 등 다양한 텍스트 기반 업무에서 AI 어시스턴트로 활용 가능
-평가/효용성: 높음
-요약 설명: OpenAI에서 개발한 대화형 인공지능 서비스로, 자연어 처리 기술을 바탕으로 사용자의 질문에 대화 형식으로 답변을 제공합니다. 텍스트 생성, 번역, 요약, 코딩 지원, 창작 등 매우 다양한 작업을 수행할 수 있어 개인 사용자부터 기업까지 폭넓게 활용되고 있습니다. 특히 복잡한 업무를 단순화하고 창의적 사고를 돕는 데 탁월하며, 24시간 언제든지 접근 가능한 점이 큰 장점입니다. 기존의 검색 엔진과 달리 맥락을 이해하고 개인화된 답변을 제공하여 업무 효율성을 크게 향상시킬 수 있습니다.
-스크립트: "여러분, 업무 효율을 획기적으로 높이고 싶으신가요? 🚀 오늘 소개할 ChatGPT는 단순한 검색을 넘어선 진짜 AI 동료입니다! 복잡한 보고서 작성부터 코딩 문제 해결까지, 질문만 하면 즉시 맞춤형 답변을 받을 수 있어요. 예를 들어, '마케팅 전략 보고서 초안을 작성해줘'라고 하면 구체적인 내용까지 제안해줍니다. 24시간 언제든 접근 가능하고, 맥락을 이해하는 대화 방식이 정말 혁신적이죠! 기존 도구들과 달리 창의적 사고까지 도와주니까 업무가 완전히 달라집니다. 지금 바로 사용해보시고, 더 많은 생산성 도구가 궁금하다면 구독 버튼 눌러주세요!"
-Script: "Want to revolutionize your productivity? 🚀 Meet ChatGPT - your AI colleague that goes way beyond simple searches! From writing complex reports to debugging code, just ask and get instant, personalized answers. For example, ask 'Help me draft a marketing strategy report' and it'll provide detailed suggestions with context. What makes it revolutionary is the 24/7 availability and conversational understanding that feels natural. Unlike traditional tools, it actually helps with creative thinking and complex problem-solving. It's like having a smart assistant who never sleeps and always understands what you need. Try ChatGPT today and transform how you work. Don't forget to subscribe for more productivity game-changers!"
-
-본문:
-{text[:8000]}
-"""
-        print("Gemini 프롬프트:")
-        print("=" * 40)
-        print(prompt)
-        print("=" * 40)
-        
-        response = model.generate_content(prompt)
-        print("Gemini 응답 원문:")
-        print("=" * 40)
-        print(response.text)
-        print("=" * 40)
-        
-        parsed_data = parse_gemini_text_fields(response.text)
-        
-        # 8개 필드만 추출 (영어 스크립트 필드 추가)
-        fields = ["사이트 이름", "URL", "카테고리", "활용 사례", "평가/효용성", "요약 설명", "스크립트", "Script"]
-        filtered_data = {}
-        
-        for field in fields:
-            if field in parsed_data:
-                filtered_data[field] = parsed_data[field]
+{chr(10).join(f"{name}: [{description}]" for name, description in NOTION_FIELD_DESCRIPTIONS.items())}
+""".strip()
+
+# JSON 형식 지침 (단건 / 일괄 공통)
+NOTION_JSON_DESCRIPTIONS = {**NOTION_FIELD_DESCRIPTIONS, "카테고리": "관련 카테고리 문자열 배열, 최대 5개까지"}
+NOTION_JSON_GUIDE = f"""
+**중요 지침:**
+1. categories는 관련 카테고리 문자열의 배열로, 최대 5개까지 써줘.
+2. rating(평가/효용성)은 반드시 '높음', '보통', '낮음' 중 하나만 써줘.
+{NOTION_CONTENT_RULES}
+5. JSON 외의 설명이나 코드 블록 표시는 출력하지 마. 여러 줄이 필요한 값은 문자열 안에서 \\n으로 줄을 바꿔줘.
+
+**출력 형식 (키: 설명):**
+{chr(10).join(f"- {key} ({name}): {NOTION_JSON_DESCRIPTIONS[name]}" for key, name in FIELD_NAMES.items())}
+""".strip()
+
+def _output_mode(mode: Optional[str]) -> str:
+    return (mode or GEMINI_OUTPUT_MODE).lower()
+
+def _generation_config(mode: Optional[str], base: dict = None) -> Optional[dict]:
+    config = dict(base or {})
+    if _output_mode(mode) == 'json':
+        config.update(GEMINI_JSON_GENERATION_CONFIG)
+    return config or None
+
+# 지침 앞에 붙는 안내 문장 (단건 / 일괄, 응답 형식별)
+NOTION_PROMPT_INTROS = {
+    ("json", False): "아래 웹사이트에 대해 다음 정보를 한국어로 자세히 정리해서 JSON 객체 하나로만 출력해줘.",
+    ("text", False): '아래 웹사이트에 대해 다음 정보를 한국어로 자세히 정리해줘.\n각 항목은 반드시 한 줄에 하나씩, "키: 값" 형태로만 출력해줘.',
+    ("json", True): "아래 웹사이트들 각각에 대해 다음 정보를 한국어로 자세히 정리해줘.\n"
+                    "사이트마다 JSON 객체 하나씩, 입력 순서대로 빠짐없이 담은 JSON 배열 하나로만 출력해줘.",
+    ("text", True): "아래 웹사이트들 각각에 대해 다음 정보를 한국어로 자세히 정리해줘.\n"
+                    '사이트마다 결과를 "=== 사이트 번호 ===" 한 줄로 시작하고(번호는 아래 입력과 같게), 그 아래에 각 항목을 한 줄에 하나씩 "키: 값" 형태로만 출력해줘.\n'
+                    "모든 사이트를 입력 순서대로 빠짐없이 출력해줘."
+}
+
+@lru_cache(maxsize=None)
+def notion_prompt_template(mode: str, batch: bool = False) -> PromptTemplate:
+    """페이지와 상관없는 고정 접두부(안내 + 지침 + 예시)는 형식별로 한 번만 만듦"""
+    json_mode = mode == 'json'
+    parts = [NOTION_PROMPT_INTROS[("json" if json_mode else "text", batch)], NOTION_JSON_GUIDE if json_mode else NOTION_PROMPT_GUIDE]
+    if GEMINI_FEW_SHOT:
+        example = json.dumps(asdict(NOTION_EXAMPLE), ensure_ascii=False) if json_mode else _example_as_text(NOTION_EXAMPLE)
+        parts.append(f"**예시 (참고용):**\n{example}")
+    return PromptTemplate("\n\n".join(parts))
+
+def build_notion_prompt(text: str, url: str, mode: str = None) -> BuiltPrompt:
+    """
+    Airtable용 필드 추출 프롬프트 (mode: json / text, 기본값 GEMINI_OUTPUT_MODE)
+    본문은 GEMINI_TEXT_TOKEN_BUDGET 토큰까지 문장 단위로 자름
+    """
+    template = notion_prompt_template(_output_mode(mode))
+    return template.build([(f"URL: {url}\n본문:", text)], GEMINI_TEXT_TOKEN_BUDGET)
+
+def _print_prompt(prompt: BuiltPrompt):
+    # 고정 지침은 매번 같으므로 페이지 부분만 출력
+    print("Gemini 프롬프트 (지침 생략):")
+    print("=" * 40)
+    print(prompt.body)
+    print("=" * 40)
+
+def _notion_fields_from_text(response_text: str, url: str) -> dict:
+    """"키: 값" 줄 형식 응답을 파싱해 8개 필드만 남김"""
+    parsed_data = parse_gemini_text_fields(response_text)
+    
+    # 8개 필드만 추출 (영어 스크립트 필드 추가)
+    fields = ["사이트 이름", "URL", "카테고리", "활용 사례", "평가/효용성", "요약 설명", "스크립트", "Script"]
+    filtered_data = {}
+    
+    for field in fields:
+        if field in parsed_data:
+            filtered_data[field] = parsed_data[field]
+        else:
+            # 기본값 설정
+            if field == "카테고리":
+                filtered_data[field] = []
+            elif field == "URL":
+                filtered_data[field] = url
             else:
-                # 기본값 설정
-                if field == "카테고리":
-                    filtered_data[field] = []
-                elif field == "URL":
-                    filtered_data[field] = url
-                else:
-                    filtered_data[field] = ""
-        
-        print(f"필터링된 6개 필드 데이터: {json.dumps(filtered_data, ensure_ascii=False, indent=2)}")
-        
-        return filtered_data
-        
+                filtered_data[field] = ""
+    
+    print(f"필터링된 6개 필드 데이터: {json.dumps(filtered_data, ensure_ascii=False, indent=2)}")
+    
+    return filtered_data
+
+def _notion_fields_from_response(response, url: str, mode: str = None) -> dict:
+    """
+    Gemini 응답을 Airtable 필드 딕셔너리로 변환
+    JSON 모드는 gemini_schema로 한 번에 파싱·정리하고, JSON이 아니면 줄 형식 파서로 대신 읽음
+    (response는 응답 원문, 또는 일괄 응답에서 꺼낸 객체)
+    """
+    if _output_mode(mode) == 'json':
+        try:
+            fields = parse_site_summary(response).to_fields()
+            fields["URL"] = fields["URL"] or url
+            return fields
+        except SchemaError as e:
+            if not isinstance(response, str):
+                raise
+            print(f"⚠️ JSON 응답이 아님({e}), 줄 형식으로 파싱")
+    
+    # 원문은 줄 형식으로 읽을 때만 출력 (JSON 모드에서는 매 호출마다 출력하지 않음)
+    print("Gemini 응답 원문:")
+    print("=" * 40)
+    print(response)
+    print("=" * 40)
+    return _notion_fields_from_text(response, url)
+
+def fields_for_airtable(fields: dict, mode: str = None) -> dict:
+    """
+    요약 필드를 Airtable에 보낼 형식으로 변환
+    JSON 모드는 검증된 SiteSummary 필드라 카테고리만 바로 연결하고, 줄 형식은 예전 flatten_fields_for_airtable 사용
+    """
+    if _output_mode(mode) == 'json':
+        return airtable_fields(fields)
+    return flatten_fields_for_airtable(fields)
+
+class SummaryUnavailable(Exception):
+    """Gemini 일시 장애(재시도 후에도 5xx·타임아웃, 서킷 열림, 한도 초과)로 요약하지 못함 - 나중에 다시 처리해야 함"""
+
+class PageUnavailable(SummaryUnavailable):
+    """페이지 다운로드가 재시도 후에도 일시적 오류(5xx, 연결 실패, 타임아웃) - 빈 본문으로 요약하지 않고 나중에 다시 처리"""
+
+def _notion_fields_on_error(e: Exception, url: str) -> dict:
+    # 일시 장애는 기본값을 저장하지 않도록 호출한 쪽으로 올림
+    if is_unavailable(e):
+        print(f"⏸️ Gemini 일시 장애로 요약 보류: {str(e)}")
+        raise SummaryUnavailable(str(e)) from e
+    print(f"Error extracting notion fields: {str(e)}")
+    import traceback
+    print(traceback.format_exc())
+    
+    # 에러 발생 시 기본 데이터 반환
+    return {
+        "사이트 이름": "제목 없음",
+        "URL": url,
+        "카테고리": [],
+        "활용 사례": "",
+        "평가/효용성": "보통",
+        "요약 설명": "요약 생성 실패",
+        "스크립트": "스크립트 생성 실패",
+        "Script": "Script generation failed"
+    }
+
+def _summary_cache_for(text: str, use_cache: bool):
+    # 본문이 비어 있으면 URL만으로 요약하므로 캐시하지 않음
+    if not use_cache or not text.strip():
+        return None
+    return get_summary_cache()
+
+def _cached_notion_fields(cache, text: str, url: str) -> Optional[dict]:
+    fields = cache.get(text, summary_version(), GEMINI_MODEL) if cache else None
+    if fields is not None:
+        print(f"🧠 요약 캐시 사용: {url}")
+        # 같은 본문의 다른 URL일 수 있으므로 URL은 현재 값으로
+        fields["URL"] = url
+    return fields
+
+def _cache_notion_fields(cache, text: str, url: str, fields: dict):
+    """검증을 통과한 요약만 캐시 (형식이 잘못된 응답을 캐시하면 다시 실행해도 계속 그 결과를 씀)"""
+    if not cache:
+        return
+    problems = validate_notion_fields(fields, url)
+    if problems:
+        print(f"⚠️ 요약 결과 불량 ({url}): {', '.join(problems)} → 캐시하지 않음")
+        return
+    cache.put(text, summary_version(), GEMINI_MODEL, fields)
+
+def _summarize_one(text: str, url: str, api_key: str, cache) -> dict:
+    try:
+        prompt = build_notion_prompt(text, url)
+        _print_prompt(prompt)
+        response = get_gemini_model(api_key).generate_content(prompt.text, generation_config=_generation_config(None))
+        prompt.report("단건 요약", response)
+        fields = _notion_fields_from_response(response.text, url)
+        _cache_notion_fields(cache, text, url, fields)
+        return fields
+    except Exception as e:
+        return _notion_fields_on_error(e, url)
+
+def gemini_extract_notion_fields(text: str, url: str, api_key: str, use_cache: bool = True) -> dict:
+    """
+    Gemini API를 사용하여 Airtable용 6개 필드만 추출합니다.
+    모델과 클라이언트는 gemini_client 레지스트리에서 재사용합니다.
+    같은 본문을 이미 요약했으면 요약 캐시의 결과를 사용합니다. (use_cache=False면 항상 새로 요약)
+    Gemini가 일시적으로 응답하지 않으면 기본값 대신 SummaryUnavailable을 냅니다.
+    """
+    try:
+        cache = _summary_cache_for(text, use_cache)
+        fields = _cached_notion_fields(cache, text, url)
+        if fields is not None:
+            return fields
     except Exception as e:
-        print(f"Error extracting notion fields: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        return _notion_fields_on_error(e, url)
+    return _summarize_one(text, url, api_key, cache)
+
+async def gemini_extract_notion_fields_async(text: str, url: str, api_key: str, use_cache: bool = True) -> dict:
+    """gemini_extract_notion_fields의 asyncio 버전 (이벤트 루프를 막지 않고 응답을 기다림)"""
+    try:
+        cache = _summary_cache_for(text, use_cache)
+        fields = await asyncio.to_thread(_cached_notion_fields, cache, text, url)
+        if fields is not None:
+            return fields
         
-        # 에러 발생 시 기본 데이터 반환
-        return {
-            "사이트 이름": "제목 없음",
-            "URL": url,
-            "카테고리": [],
-            "활용 사례": "",
-            "평가/효용성": "보통",
-            "요약 설명": "요약 생성 실패",
-            "스크립트": "스크립트 생성 실패",
-            "Script": "Script generation failed"
-        }
\ No newline at end of file
+        prompt = build_notion_prompt(text, url)
+        _print_prompt(prompt)
+        response = await get_gemini_model(api_key).generate_content_async(prompt.text, generation_config=_generation_config(None))
+        prompt.report("단건 요약", response)
+        fields = _notion_fields_from_response(response.text, url)
+        await asyncio.to_thread(_cache_notion_fields, cache, text, url, fields)
+        return fields
+    except Exception as e:
+        return _notion_fields_on_error(e, url)
+
+BATCH_MARKER = re.compile(r'^[#=\s*]*사이트\s*(\d+)\s*[=#\s*]*$', re.M)
+
+def build_notion_batch_prompt(pages: list, mode: str = None) -> BuiltPrompt:
+    """여러 사이트를 한 번에 요약하는 프롬프트 (pages: [(url, text), ...], 사이트당 GEMINI_BATCH_TEXT_TOKENS 토큰)"""
+    sections = [(f"=== 사이트 {number} ===\nURL: {url}\n본문:", text) for number, (url, text) in enumerate(pages, 1)]
+    return notion_prompt_template(_output_mode(mode), batch=True).build(sections, GEMINI_BATCH_TEXT_TOKENS)
+
+def split_batch_response(response_text: str, mode: str = None) -> dict:
+    """일괄 응답을 {사이트 번호: 해당 부분} 으로 나눔 (JSON 모드는 배열 순서, 줄 형식은 구분선 기준)"""
+    if _output_mode(mode) == 'json':
+        try:
+            return {number: item for number, item in enumerate(parse_site_summaries(response_text), 1)}
+        except SchemaError as e:
+            print(f"⚠️ 일괄 JSON 응답 파싱 실패({e}), 구분선 기준으로 나눔")
+    
+    blocks = {}
+    matches = list(BATCH_MARKER.finditer(response_text))
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(response_text)
+        blocks.setdefault(int(match.group(1)), response_text[match.end():end].strip())
+    return blocks
+
+def gemini_extract_notion_fields_batch(pages: list, api_key: str, use_cache: bool = True) -> list:
+    """
+    여러 사이트를 한 번의 Gemini 요청으로 요약합니다. (pages: [(url, text), ...], 결과는 같은 순서의 필드 목록)
+    요약 캐시에 있는 사이트는 빼고 요청하며, 결과는 사이트별로 검증해서
+    빠졌거나 형식이 잘못된 사이트만 한 건씩 다시 요약합니다.
+    """
+    results = [None] * len(pages)
+    pending = []
+    for index, (url, text) in enumerate(pages):
+        cache = _summary_cache_for(text, use_cache)
+        fields = _cached_notion_fields(cache, text, url)
+        if fields is None:
+            pending.append(index)
+        else:
+            results[index] = fields
+    
+    if not pending:
+        return results
+    
+    try:
+        prompt = build_notion_batch_prompt([pages[index] for index in pending])
+        print(f"📦 Gemini 일괄 요약: {len(pending)}개 사이트")
+        response = get_gemini_model(api_key).generate_content(prompt.text, generation_config=_generation_config(None, GEMINI_BATCH_GENERATION_CONFIG))
+        prompt.report(f"일괄 요약({len(pending)}개)", response)
+        blocks = split_batch_response(response.text)
+    except Exception as e:
+        if is_unavailable(e):
+            # 한 건씩 다시 보내도 같은 장애에 걸리므로 바로 보류
+            raise SummaryUnavailable(str(e)) from e
+        print(f"❌ Gemini 일괄 요약 실패, 한 건씩 처리: {str(e)}")
+        blocks = {}
+    
+    for number, index in enumerate(pending, 1):
+        url, text = pages[index]
+        cache = _summary_cache_for(text, use_cache)
+        block = blocks.get(number)
+        try:
+            fields = _notion_fields_from_response(block, url) if block else None
+        except SchemaError as e:
+            print(f"⚠️ 일괄 요약 항목 형식 오류 ({url}): {e}")
+            fields = None
+        problems = validate_notion_fields(fields, url) if fields else ["응답 없음"]
+        if problems:
+            print(f"⚠️ 일괄 요약 결과 불량 ({url}): {', '.join(problems)} → 단건 재요청")
+            results[index] = _summarize_one(text, url, api_key, cache)
+            continue
+        fields["URL"] = url
+        if cache:
+            cache.put(text, summary_version(), GEMINI_MODEL, fields)
+        results[index] = fields
+    
+    return results
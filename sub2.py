@@ -1,9 +1,11 @@
-import requests
+from http_client import run_sync
+from resilience import resilient_request, resilient_session_request
+import asyncio
 from typing import Optional, Dict, List
 import json
 from datetime import datetime
 import re
-import urllib.parse
+from url_utils import canonicalize_url
 
 # 프로퍼티 매핑 (코드에서 사용하는 이름 -> 실제 Notion 프로퍼티명)
 PROPERTY_MAPPING = {
@@ -22,32 +24,60 @@ PROPERTY_MAPPING = {
 }
 
 def normalize_url(url: str) -> str:
-    """URL을 정규화하여 비교 가능한 형태로 만듭니다."""
-    if not url:
-        return ""
-    
-    # 기본적인 정리
-    url = url.strip().lower()
-    
-    # http/https 통일 (https로)
-    if url.startswith('http://'):
-        url = url.replace('http://', 'https://', 1)
-    
-    # www. 제거
-    if '://www.' in url:
-        url = url.replace('://www.', '://')
+    """URL을 정규화하여 비교 가능한 형태로 만듭니다. (url_utils.canonicalize_url 사용)"""
+    return canonicalize_url(url)
+
+def fetch_all_airtable_records(api_key: str, base_id: str, table_name: str, fields: List[str] = None) -> Dict:
+    """
+    Airtable 테이블의 모든 레코드를 페이지네이션으로 가져옵니다.
     
-    # 끝의 슬래시 제거
-    if url.endswith('/'):
-        url = url.rstrip('/')
+    Returns:
+        dict: {
+            "success": bool,
+            "records": list,  # 실패 시 그때까지 받은 레코드
+            "error": str or None
+        }
+    """
+    url = f"https://api.airtable.com/v0/{base_id}/{table_name}"
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
     
-    # URL 쿼리 파라미터 제거 (선택적 - 필요에 따라 주석 처리)
-    # parsed = urllib.parse.urlparse(url)
-    # url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    all_records = []
+    offset = None
     
-    return url
+    try:
+        while True:
+            params = {"pageSize": 100}
+            if fields:
+                params["fields[]"] = fields
+            if offset:
+                params["offset"] = offset
+            
+            response = resilient_session_request("airtable", base_id, "GET", url, headers=headers, params=params)
+            
+            if response.status_code != 200:
+                print(f"⚠️ Airtable 조회 실패: {response.status_code}")
+                return {
+                    "success": False,
+                    "records": all_records,
+                    "error": f"Airtable API 오류: {response.status_code}"
+                }
+            
+            data = response.json()
+            all_records.extend(data.get('records', []))
+            offset = data.get('offset')
+            if not offset:
+                break
+        
+        return {"success": True, "records": all_records, "error": None}
+        
+    except Exception as e:
+        print(f"⚠️ Airtable 전체 조회 중 오류: {str(e)}")
+        return {"success": False, "records": all_records, "error": str(e)}
 
-def check_duplicate_url_airtable(api_key: str, base_id: str, table_name: str, url: str) -> Dict:
+async def check_duplicate_url_airtable_async(api_key: str, base_id: str, table_name: str, url: str) -> Dict:
     """
     Airtable에서 URL 중복을 확인합니다.
     
@@ -66,40 +96,48 @@ def check_duplicate_url_airtable(api_key: str, base_id: str, table_name: str, ur
         normalized_url = normalize_url(url)
         print(f"   정규화된 URL: {normalized_url}")
         
-        # Airtable API 요청 준비
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # 필터 조건 생성 - URL 필드에서 검색
-        # Airtable formula를 사용하여 정규화된 URL로 검색
-        filter_formula = f"LOWER(SUBSTITUTE(SUBSTITUTE({{URL}}, 'http://', 'https://'), 'www.', '')) = '{normalized_url}'"
+        # 로컬 URL 인덱스에서 조회 (filterByFormula로는 같은 정규화를 할 수 없음)
+        from url_index import get_url_index
+        url_index = get_url_index()
         
-        url_encoded_formula = urllib.parse.quote(filter_formula)
-        request_url = f"https://api.airtable.com/v0/{base_id}/{table_name}?filterByFormula={url_encoded_formula}"
-        
-        print(f"   검색 URL: {request_url}")
-        print(f"   필터 공식: {filter_formula}")
-        
-        response = requests.get(request_url, headers=headers)
-        
-        if response.status_code != 200:
-            print(f"❌ Airtable 검색 실패: {response.status_code}")
-            print(f"   응답: {response.text}")
+        if not await asyncio.to_thread(url_index.warm_from_airtable, api_key, base_id, table_name):
             return {
                 "is_duplicate": False,
                 "record_id": None,
                 "existing_data": None,
-                "error": f"Airtable API 오류: {response.status_code}"
+                "error": "URL 인덱스를 불러오지 못했습니다 (Airtable 조회 실패)"
             }
         
-        data = response.json()
-        records = data.get('records', [])
+        existing = url_index.lookup(base_id, table_name, url)
+        existing_record = None
         
-        if records:
+        if existing and existing.get('record_id'):
+            # 기존 레코드의 최신 필드 조회
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            }
+            request_url = f"https://api.airtable.com/v0/{base_id}/{table_name}/{existing['record_id']}"
+            response = await resilient_request("airtable", base_id, "GET", request_url, headers=headers)
+            
+            if response.status_code == 404:
+                # Airtable에서 삭제된 레코드 - 인덱스에서도 제거
+                print(f"   인덱스의 레코드가 삭제됨: {existing['record_id']}")
+                url_index.remove(base_id, table_name, url)
+            elif response.status_code != 200:
+                print(f"❌ Airtable 레코드 조회 실패: {response.status_code}")
+                print(f"   응답: {response.text}")
+                return {
+                    "is_duplicate": False,
+                    "record_id": None,
+                    "existing_data": None,
+                    "error": f"Airtable API 오류: {response.status_code}"
+                }
+            else:
+                existing_record = response.json()
+        
+        if existing_record:
             # 중복 발견
-            existing_record = records[0]  # 첫 번째 레코드 사용
             record_id = existing_record.get('id')
             existing_data = existing_record.get('fields', {})
             
@@ -135,7 +173,11 @@ def check_duplicate_url_airtable(api_key: str, base_id: str, table_name: str, ur
             "error": str(e)
         }
 
-def update_airtable_record(api_key: str, base_id: str, table_name: str, record_id: str, data: dict) -> bool:
+def check_duplicate_url_airtable(api_key: str, base_id: str, table_name: str, url: str) -> Dict:
+    """Airtable에서 URL 중복을 확인합니다. (check_duplicate_url_airtable_async의 동기 버전)"""
+    return run_sync(check_duplicate_url_airtable_async(api_key, base_id, table_name, url))
+
+async def update_airtable_record_async(api_key: str, base_id: str, table_name: str, record_id: str, data: dict) -> bool:
     """
     Airtable의 기존 레코드를 업데이트합니다.
     """
@@ -163,7 +205,7 @@ def update_airtable_record(api_key: str, base_id: str, table_name: str, record_i
         
         print(f"업데이트할 데이터: {json.dumps(payload, ensure_ascii=False, indent=2)}")
         
-        response = requests.patch(url, headers=headers, json=payload)
+        response = await resilient_request("airtable", base_id, "PATCH", url, idempotent=True, headers=headers, json=payload)
         
         print(f"Airtable 업데이트 응답: {response.status_code}")
         print(f"응답 내용: {response.text}")
@@ -181,6 +223,10 @@ def update_airtable_record(api_key: str, base_id: str, table_name: str, record_i
         print(traceback.format_exc())
         return False
 
+def update_airtable_record(api_key: str, base_id: str, table_name: str, record_id: str, data: dict) -> bool:
+    """Airtable의 기존 레코드를 업데이트합니다. (update_airtable_record_async의 동기 버전)"""
+    return run_sync(update_airtable_record_async(api_key, base_id, table_name, record_id, data))
+
 def is_valid_url(url: str) -> bool:
     """URL 유효성 검사"""
     if not url or url.lower() in ['없음', 'none', '', '-']:
@@ -223,7 +269,7 @@ def truncate_select_value(value: str, max_length: int = 100) -> str:
     """Select 필드용 값 길이 제한 (기존 함수 유지)"""
     return clean_select_value(value)
 
-def send_to_notion_flexible(notion_api_key: str, database_id: str, notion_data: dict, property_mapping: dict = None) -> bool:
+async def send_to_notion_flexible_async(notion_api_key: str, database_id: str, notion_data: dict, property_mapping: dict = None) -> bool:
     """
     유연한 프로퍼티 매핑을 사용하여 Notion에 데이터를 저장합니다.
     """
@@ -321,7 +367,8 @@ def send_to_notion_flexible(notion_api_key: str, database_id: str, notion_data:
         
         print(f"Notion에 전송할 데이터: {json.dumps(data, ensure_ascii=False, indent=2)}")
         
-        response = requests.post(
+        response = await resilient_request(
+            "notion", None, "POST",
             "https://api.notion.com/v1/pages",
             headers=headers,
             json=data
@@ -342,11 +389,15 @@ def send_to_notion_flexible(notion_api_key: str, database_id: str, notion_data:
         print(traceback.format_exc())
         return False
 
+def send_to_notion_flexible(notion_api_key: str, database_id: str, notion_data: dict, property_mapping: dict = None) -> bool:
+    """유연한 프로퍼티 매핑을 사용하여 Notion에 데이터를 저장합니다. (send_to_notion_flexible_async의 동기 버전)"""
+    return run_sync(send_to_notion_flexible_async(notion_api_key, database_id, notion_data, property_mapping))
+
 # 기존 함수는 새로운 함수를 호출하도록 수정
 def send_to_notion(notion_api_key: str, database_id: str, notion_data: dict) -> bool:
     return send_to_notion_flexible(notion_api_key, database_id, notion_data)
 
-def send_to_telegram(bot_token: str, chat_id: str, text: str) -> bool:
+async def send_to_telegram_async(bot_token: str, chat_id: str, text: str) -> bool:
     """텔레그램으로 메시지를 전송합니다."""
     try:
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
@@ -356,7 +407,7 @@ def send_to_telegram(bot_token: str, chat_id: str, text: str) -> bool:
             "parse_mode": "HTML"
         }
         
-        response = requests.post(url, data=data)
+        response = await resilient_request("telegram", str(chat_id), "POST", url, data=data)
         
         if response.status_code == 200:
             print("✅ 텔레그램 전송 성공!")
@@ -370,7 +421,11 @@ def send_to_telegram(bot_token: str, chat_id: str, text: str) -> bool:
         print(f"❌ Error sending to Telegram: {str(e)}")
         return False
 
-def send_to_airtable(api_key: str, base_id: str, table_name: str, data: dict, 
+def send_to_telegram(bot_token: str, chat_id: str, text: str) -> bool:
+    """텔레그램으로 메시지를 전송합니다. (send_to_telegram_async의 동기 버전)"""
+    return run_sync(send_to_telegram_async(bot_token, chat_id, text))
+
+async def send_to_airtable_async(api_key: str, base_id: str, table_name: str, data: dict, 
                     check_duplicates: bool = True, update_if_duplicate: bool = False) -> Dict:
     """
     Airtable에 데이터를 저장합니다. 중복 확인 기능 포함.
@@ -400,7 +455,7 @@ def send_to_airtable(api_key: str, base_id: str, table_name: str, data: dict,
         
         # 1. 중복 확인 (옵션)
         if check_duplicates and data.get('URL'):
-            duplicate_check = check_duplicate_url_airtable(api_key, base_id, table_name, data['URL'])
+            duplicate_check = await check_duplicate_url_airtable_async(api_key, base_id, table_name, data['URL'])
             
             if duplicate_check.get('error'):
                 return {
@@ -418,7 +473,7 @@ def send_to_airtable(api_key: str, base_id: str, table_name: str, data: dict,
                 if update_if_duplicate:
                     # 기존 레코드 업데이트
                     print(f"🔄 중복 레코드 업데이트 모드")
-                    success = update_airtable_record(api_key, base_id, table_name, existing_record_id, data)
+                    success = await update_airtable_record_async(api_key, base_id, table_name, existing_record_id, data)
                     
                     if success:
                         return {
@@ -480,7 +535,7 @@ def send_to_airtable(api_key: str, base_id: str, table_name: str, data: dict,
         
         print(f"최종 Airtable 페이로드: {json.dumps(payload, ensure_ascii=False, indent=2)}")
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = await resilient_request("airtable", base_id, "POST", url, headers=headers, json=payload)
         
         print(f"Airtable 응답 상태코드: {response.status_code}")
         print(f"Airtable 응답 내용: {response.text}")
@@ -490,6 +545,14 @@ def send_to_airtable(api_key: str, base_id: str, table_name: str, data: dict,
             new_record_id = response_data.get('id')
             
             print("✅ Airtable 저장 성공!")
+            
+            # 로컬 URL 인덱스에도 반영 (다음 중복 확인은 Airtable 조회 없이 처리)
+            if data.get('URL'):
+                try:
+                    from url_index import get_url_index
+                    get_url_index().add(base_id, table_name, data['URL'], new_record_id, data.get('사이트 이름', ''))
+                except Exception as e:
+                    print(f"⚠️ URL 인덱스 갱신 실패: {str(e)}")
             return {
                 "success": True,
                 "is_duplicate": False,
@@ -519,6 +582,11 @@ def send_to_airtable(api_key: str, base_id: str, table_name: str, data: dict,
             "message": f"오류 발생: {str(e)}"
         }
 
+def send_to_airtable(api_key: str, base_id: str, table_name: str, data: dict, 
+                    check_duplicates: bool = True, update_if_duplicate: bool = False) -> Dict:
+    """Airtable에 데이터를 저장합니다. 중복 확인 기능 포함. (send_to_airtable_async의 동기 버전)"""
+    return run_sync(send_to_airtable_async(api_key, base_id, table_name, data, check_duplicates, update_if_duplicate))
+
 # 하위 호환성을 위한 래퍼 함수 (기존 코드가 동작하도록)
 def send_to_airtable_legacy(api_key: str, base_id: str, table_name: str, data: dict) -> bool:
     """기존 함수와 호환되는 래퍼 함수"""
@@ -1,9 +1,18 @@
 # sub3.py 파일의 수정된 부분
 
 import re
-import os
 from datetime import datetime
 import uuid
+from resilience import call_upstream
+from google_clients import get_google_clients
+from audio_cache import get_audio_cache
+from tts_synth import synthesize_script
+from drive_publisher import publish_audio
+
+# 음성 언어 / 인코딩 (바꾸면 음성 캐시 키도 달라져 새로 합성)
+TTS_LANGUAGE_CODE = "en-US"
+TTS_AUDIO_ENCODING = "MP3"
+AUDIO_CONFIG_KEY = f"{TTS_LANGUAGE_CODE}/{TTS_AUDIO_ENCODING}"
 
 def sanitize_filename(text, max_length=50):
     """파일명으로 사용할 수 없는 문자 제거 및 길이 제한"""
@@ -32,35 +41,43 @@ def process_script_to_tts_google_drive(english_script, voice_name="en-US-Journey
     
     try:
         from google.cloud import texttospeech
-        from googleapiclient.discovery import build
-        from googleapiclient.http import MediaIoBaseUpload
-        from google.oauth2.service_account import Credentials
-        import io
         
         print(f"🎵 TTS 변환 시작: {voice_name}")
         print(f"📝 스크립트 길이: {len(english_script)}자")
         print(f"🏢 사이트 이름: {site_name}")
         
-        # Google Cloud TTS 클라이언트 생성
-        client = texttospeech.TextToSpeechClient()
+        # 같은 스크립트·음성으로 이미 올려 둔 파일이 있으면 그대로 사용
+        audio_cache = get_audio_cache()
+        if audio_cache is not None:
+            cached = audio_cache.get(english_script, voice_name, AUDIO_CONFIG_KEY)
+            if cached:
+                print(f"♻️ 음성 캐시 적중 - TTS/업로드 건너뜀: {cached['audio_url']}")
+                return {"success": True, "error": "", **cached}
+        
+        # Google Cloud TTS 클라이언트 (프로세스에서 한 번만 생성)
+        clients = get_google_clients()
+        client = clients.tts()
         
         # TTS 요청 설정
-        synthesis_input = texttospeech.SynthesisInput(text=english_script)
         voice = texttospeech.VoiceSelectionParams(
-            language_code="en-US",
+            language_code=TTS_LANGUAGE_CODE,
             name=voice_name
         )
         audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3
+            audio_encoding=getattr(texttospeech.AudioEncoding, TTS_AUDIO_ENCODING)
         )
         
-        # TTS 실행
+        def synthesize(text):
+            response = call_upstream("tts", None, lambda: client.synthesize_speech(
+                input=texttospeech.SynthesisInput(text=text),
+                voice=voice,
+                audio_config=audio_config
+            ))
+            return response.audio_content
+        
+        # TTS 실행 (긴 스크립트는 문장 단위 조각으로 나눠 동시에 합성 후 이어 붙임)
         print("🔄 Google Cloud TTS 변환 중...")
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
+        audio_content = synthesize_script(english_script, synthesize)
         
         # 파일명 생성 - 새로운 형식
         today = datetime.now().strftime("%Y-%m-%d")
@@ -75,9 +92,9 @@ def process_script_to_tts_google_drive(english_script, voice_name="en-US-Journey
         # Google Drive에 업로드
         print("☁️ Google Drive 업로드 중...")
         
-        # Drive API 클라이언트 생성
-        credentials_file = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-        if not credentials_file:
+        # Drive API 클라이언트 (인증 정보와 discovery 문서는 한 번만 읽음)
+        drive_service = clients.drive()
+        if drive_service is None:
             print("❌ Google 인증 파일이 설정되지 않았습니다")
             return {
                 "success": False,
@@ -87,40 +104,15 @@ def process_script_to_tts_google_drive(english_script, voice_name="en-US-Journey
                 "file_id": ""
             }
         
-        scope = ['https://www.googleapis.com/auth/drive.file']
-        creds = Credentials.from_service_account_file(credentials_file, scopes=scope)
-        drive_service = build('drive', 'v3', credentials=creds)
-        
-        # 파일 메타데이터
-        file_metadata = {
-            'name': filename,
-            'parents': [os.getenv('GOOGLE_DRIVE_FOLDER_ID', 'root')]  # 폴더 ID 설정 가능
-        }
-        
-        # 파일 업로드
-        media = MediaIoBaseUpload(
-            io.BytesIO(response.audio_content),
-            mimetype='audio/mpeg',
-            resumable=True
-        )
-        
-        file = drive_service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id'
-        ).execute()
-        
-        file_id = file.get('id')
-        
-        # 공유 링크 생성
-        drive_service.permissions().create(
-            fileId=file_id,
-            body={'role': 'reader', 'type': 'anyone'}
-        ).execute()
+        # 업로드 + 공개 권한 (작은 파일은 multipart 한 번, 권한은 동시에 올린 파일끼리 배치로)
+        file_id = publish_audio(drive_service, audio_content, filename)
         
         # 다운로드 가능한 URL 생성
         audio_url = f"https://drive.google.com/uc?id={file_id}"
         
+        if audio_cache is not None:
+            audio_cache.put(english_script, voice_name, AUDIO_CONFIG_KEY, file_id, audio_url, filename)
+        
         print(f"✅ Google Drive 업로드 성공!")
         print(f"🔗 파일 ID: {file_id}")
         print(f"🔗 다운로드 URL: {audio_url}")
@@ -0,0 +1,51 @@
+# summary_cache.py - Gemini 요약 결과 캐시 (SQLite)
+# 추출된 본문 + 프롬프트 버전 + 모델 이름의 해시 -> 파싱된 필드(JSON)
+# 미러 URL, 추적 파라미터만 다른 URL, 마이그레이션 재실행처럼 본문이 같으면 Gemini를 다시 부르지 않음
+
+import json
+import os
+from typing import Optional, Dict
+from dotenv import load_dotenv
+from lru_store import LRUStore, hash_key, shared_instance
+
+# 환경 변수 로드
+load_dotenv()
+
+SUMMARY_CACHE_ENABLED = os.getenv('SUMMARY_CACHE_ENABLED', 'true').lower() == 'true'
+SUMMARY_CACHE_PATH = os.getenv('SUMMARY_CACHE_PATH', 'summary_cache.db')
+# 이 기간 동안 사용되지 않은 항목은 삭제
+SUMMARY_CACHE_MAX_AGE_DAYS = float(os.getenv('SUMMARY_CACHE_MAX_AGE_DAYS', '90'))
+# 최대 항목 수 (넘으면 오래 안 쓴 항목부터 삭제)
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', '20000'))
+
+def summary_key(text: str, prompt_version: str, model_name: str) -> str:
+    return hash_key(prompt_version, model_name, text)
+
+class SummaryCache(LRUStore):
+    def __init__(self, path: str = SUMMARY_CACHE_PATH, max_age_days: float = SUMMARY_CACHE_MAX_AGE_DAYS,
+                 max_entries: int = SUMMARY_CACHE_MAX_ENTRIES):
+        super().__init__(path, "summaries", {
+            "model": "TEXT NOT NULL",
+            "prompt_version": "TEXT NOT NULL",
+            "fields": "TEXT NOT NULL"
+        }, max_age_days, max_entries)
+
+    def get(self, text: str, prompt_version: str, model_name: str) -> Optional[Dict]:
+        """저장된 필드 반환 (없으면 None), 적중/미스 집계"""
+        row = self.lookup(summary_key(text, prompt_version, model_name))
+        return json.loads(row["fields"]) if row else None
+
+    def put(self, text: str, prompt_version: str, model_name: str, fields: Dict):
+        self.store(summary_key(text, prompt_version, model_name), model=model_name, prompt_version=prompt_version,
+                   fields=json.dumps(fields, ensure_ascii=False))
+
+_shared_summary_cache = shared_instance(SummaryCache)
+
+def get_summary_cache() -> Optional[SummaryCache]:
+    """프로세스 전체에서 공유하는 요약 캐시 (SUMMARY_CACHE_ENABLED=false면 None)"""
+    return _shared_summary_cache() if SUMMARY_CACHE_ENABLED else None
+
+def print_summary_cache_stats():
+    cache = get_summary_cache()
+    if cache is not None:
+        cache.print_stats("🧠 요약 캐시")
@@ -0,0 +1,78 @@
+# test_async_http.py - asyncio 백엔드(aiohttp) 테스트
+# 느린 로컬 스텁 서버에 여러 요청을 동시에 보내도 스레드를 하나씩 점유하지 않고 함께 기다리는지 확인
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http_client import get_http_stats, close_async_session
+from sub1 import extract_text_from_url, extract_text_from_url_async
+
+PAGE = "<html><head><title>Stub Tool</title></head><body><p>Hello from the stub page.</p></body></html>".encode()
+
+class SlowPageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(0.3)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def test_many_inflight_requests_share_one_loop():
+    print("=" * 50)
+    print("asyncio 동시 크롤링 테스트")
+    print("=" * 50)
+
+    server, base = start_server()
+    try:
+        async def scenario():
+            start = time.monotonic()
+            texts = await asyncio.gather(*(extract_text_from_url_async(f"{base}/page{i}", use_cache=False) for i in range(20)))
+            elapsed = time.monotonic() - start
+            await close_async_session()
+            return texts, elapsed
+
+        texts, elapsed = asyncio.run(scenario())
+        print(f"20개 요청 소요 시간: {elapsed:.2f}초")
+
+        assert all(text.startswith("Stub Tool") for text in texts)
+        assert "Hello from the stub page." in texts[0]
+        # 순차 처리라면 6초 - 동시에 기다려야 함
+        assert elapsed < 2.0
+    finally:
+        server.shutdown()
+
+def test_sync_wrapper_reuses_connections():
+    print("=" * 50)
+    print("동기 래퍼 테스트")
+    print("=" * 50)
+
+    server, base = start_server()
+    try:
+        host = base.split("://", 1)[1]
+        for i in range(3):
+            assert extract_text_from_url(f"{base}/page{i}", use_cache=False).startswith("Stub Tool")
+
+        stats = get_http_stats()[host]
+        print(f"통계: {stats}")
+        assert stats["requests"] == 3
+        assert stats["new_connections"] == 1
+        assert stats["reused"] == 2
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_many_inflight_requests_share_one_loop()
+    test_sync_wrapper_reuses_connections()
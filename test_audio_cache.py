@@ -0,0 +1,120 @@
+# test_audio_cache.py - TTS 음성 파일 캐시 테스트
+# 스크립트와 음성이 같으면 TTS 합성과 Drive 업로드 없이 기존 파일을 돌려주고,
+# 스크립트나 음성이 바뀌면 새로 만드는지 확인
+
+import os
+import tempfile
+import sub3
+from audio_cache import AudioCache
+
+class StubClients:
+    """TTS 합성과 Drive 업로드 횟수를 세는 스텁 클라이언트"""
+
+    def __init__(self):
+        self.synthesized = 0
+        self.uploaded = 0
+
+    def tts(self):
+        stub = self
+
+        class TTS:
+            def synthesize_speech(self, input, voice, audio_config):
+                stub.synthesized += 1
+                return type("Response", (), {"audio_content": b"mp3"})()
+        return TTS()
+
+    def drive(self):
+        stub = self
+
+        class Request:
+            def __init__(self, result):
+                self.result = result
+
+            def execute(self):
+                return self.result
+
+        class Batch:
+            def __init__(self, callback):
+                self.callback = callback
+                self.requests = []
+
+            def add(self, request, request_id):
+                self.requests.append(request_id)
+
+            def execute(self):
+                for request_id in self.requests:
+                    self.callback(request_id, {}, None)
+
+        class Drive:
+            def new_batch_http_request(self, callback):
+                return Batch(callback)
+
+            def files(self):
+                return self
+
+            def permissions(self):
+                return self
+
+            def create(self, **kwargs):
+                if "media_body" in kwargs:
+                    stub.uploaded += 1
+                    return Request({"id": f"file-{stub.uploaded}"})
+                return Request({})
+        return Drive()
+
+def test_audio_cache_skips_repeat_synthesis():
+    print("=" * 50)
+    print("음성 캐시 테스트")
+    print("=" * 50)
+
+    clients = StubClients()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AudioCache(os.path.join(tmp, "audio.db"))
+        original = (sub3.get_google_clients, sub3.get_audio_cache)
+        sub3.get_google_clients = lambda: clients
+        sub3.get_audio_cache = lambda: cache
+        try:
+            script = "Stub Tool helps you test things."
+            first = sub3.process_script_to_tts_google_drive(script, voice_name="en-US-Journey-F", site_name="Stub Tool")
+            again = sub3.process_script_to_tts_google_drive(script, voice_name="en-US-Journey-F", site_name="Stub Tool")
+            assert first["success"] and again["success"]
+            assert again["file_id"] == first["file_id"] == "file-1"
+            assert again["audio_url"] == first["audio_url"] and again["filename"] == first["filename"]
+            assert clients.synthesized == 1 and clients.uploaded == 1
+
+            # 음성이나 스크립트가 바뀌면 새로 합성
+            other_voice = sub3.process_script_to_tts_google_drive(script, voice_name="en-US-Journey-D", site_name="Stub Tool")
+            changed = sub3.process_script_to_tts_google_drive(script + " Now updated.", voice_name="en-US-Journey-F")
+            assert other_voice["file_id"] == "file-2" and changed["file_id"] == "file-3"
+            assert clients.synthesized == 3
+
+            stats = cache.get_stats()
+            print(f"통계: {stats}")
+            assert stats["hits"] == 1 and stats["misses"] == 3 and stats["entries"] == 3
+        finally:
+            sub3.get_google_clients, sub3.get_audio_cache = original
+            cache.close()
+
+def test_audio_cache_reopen_and_evict():
+    print("=" * 50)
+    print("음성 캐시 유지/정리 테스트")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "audio.db")
+        cache = AudioCache(path, max_entries=2)
+        for index in range(3):
+            cache.put(f"script {index}", "voice", sub3.AUDIO_CONFIG_KEY, f"id{index}", f"https://drive/{index}", f"{index}.mp3")
+        cache.close()
+
+        # 다시 열어도 남아 있고, 가장 오래 안 쓴 항목부터 정리됨
+        cache = AudioCache(path, max_entries=2)
+        assert cache.get("script 0", "voice", sub3.AUDIO_CONFIG_KEY) is None
+        assert cache.get("script 2", "voice", sub3.AUDIO_CONFIG_KEY)["file_id"] == "id2"
+        # 오디오 설정이 다르면 다른 항목
+        assert cache.get("script 2", "voice", "en-US/LINEAR16") is None
+        cache.close()
+
+if __name__ == "__main__":
+    test_audio_cache_skips_repeat_synthesis()
+    test_audio_cache_reopen_and_evict()
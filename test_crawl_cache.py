@@ -0,0 +1,98 @@
+# test_crawl_cache.py - 크롤링 캐시 / 조건부 재검증 테스트
+
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sub1
+from crawl_cache import CrawlCache
+
+PAGE = "<html><head><title>Cached Tool</title></head><body><p>Body text.</p></body></html>".encode()
+ETAG = '"v1"'
+
+class EtagHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    counts = {"200": 0, "304": 0}
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            EtagHandler.counts["304"] += 1
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        EtagHandler.counts["200"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", "Wed, 01 Jan 2025 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+def with_cache(cache, func):
+    original = sub1.get_crawl_cache
+    sub1.get_crawl_cache = lambda: cache
+    try:
+        return func()
+    finally:
+        sub1.get_crawl_cache = original
+
+def test_revalidation_and_fresh_hits():
+    print("=" * 50)
+    print("크롤링 캐시 재검증 테스트")
+    print("=" * 50)
+
+    EtagHandler.counts = {"200": 0, "304": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EtagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/tool?utm_source=discord"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # TTL 0: 매번 조건부 요청으로 재검증
+            cache = CrawlCache(os.path.join(tmp, "cache.db"), ttl_hours=0)
+            first = with_cache(cache, lambda: sub1.extract_text_from_url(url))
+            second = with_cache(cache, lambda: sub1.extract_text_from_url(url.split("?")[0]))
+            stats = cache.get_stats()
+            print(f"서버 응답: {EtagHandler.counts}, 캐시 통계: {stats}")
+
+            assert first == second and first.startswith("Cached Tool")
+            assert EtagHandler.counts == {"200": 1, "304": 1}
+            assert stats["misses"] == 1 and stats["revalidated"] == 1
+            cache.close()
+
+            # TTL 안에서는 서버에 요청하지 않음
+            cache = CrawlCache(os.path.join(tmp, "cache.db"), ttl_hours=24)
+            third = with_cache(cache, lambda: sub1.extract_text_from_url(url))
+            assert third == first
+            assert EtagHandler.counts == {"200": 1, "304": 1}
+            assert cache.get_stats()["hits"] == 1
+            cache.close()
+    finally:
+        server.shutdown()
+
+def test_size_based_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CrawlCache(os.path.join(tmp, "cache.db"), max_mb=0.01)
+        html = "x" * 4000
+        for i in range(5):
+            cache.put(f"https://site{i}.com", html + str(i), "text", sub1.EXTRACTOR_VERSION)
+        stats = cache.get_stats()
+        print(f"캐시 통계: {stats}")
+
+        assert stats["bytes"] <= 0.01 * 1024 * 1024
+        assert stats["evicted"] >= 3
+        # 가장 최근 항목은 남아 있어야 함
+        assert cache.get("https://site4.com") is not None
+        assert cache.get("https://site0.com") is None
+        cache.close()
+
+if __name__ == "__main__":
+    test_revalidation_and_fresh_hits()
+    test_size_based_eviction()
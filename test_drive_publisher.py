@@ -0,0 +1,127 @@
+# test_drive_publisher.py - Drive 업로드 / 공개 권한 배치 테스트
+# 작은 파일은 multipart 업로드, 큰 파일만 재개 가능 업로드를 쓰고,
+# 동시에 올린 파일의 공개 권한은 배치 요청 하나로 묶으며, 공유 폴더면 권한 요청을 하지 않는지 확인
+
+import threading
+import time
+import drive_publisher
+from drive_publisher import PermissionBatcher, publish_audio
+
+class StubRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+class StubBatch:
+    def __init__(self, drive, callback):
+        self.drive = drive
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        with self.drive.lock:
+            self.drive.batches.append([request.result for _, request in self.requests])
+        for request_id, request in self.requests:
+            error = Exception("권한 없음") if request.result in self.drive.fail else None
+            self.callback(request_id, {}, error)
+
+class StubDrive:
+    """업로드 방식과 권한 요청(개별/배치)을 기록하는 Drive 서비스"""
+
+    def __init__(self, upload_seconds=0.0, fail=()):
+        self.upload_seconds = upload_seconds
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+        self.uploads = []
+        self.batches = []
+        self.next_id = 0
+
+    def files(self):
+        return self
+
+    def permissions(self):
+        return self
+
+    def new_batch_http_request(self, callback):
+        return StubBatch(self, callback)
+
+    def create(self, **kwargs):
+        if "media_body" in kwargs:
+            time.sleep(self.upload_seconds)
+            with self.lock:
+                self.next_id += 1
+                self.uploads.append((kwargs["body"]["name"], kwargs["media_body"].resumable()))
+                return StubRequest({"id": f"file-{self.next_id}"})
+        # 권한 요청은 배치에 넣을 때만 만들어지고, 개별로 실행되지 않음
+        return StubRequest(kwargs["fileId"])
+
+def with_batcher(batcher):
+    original = drive_publisher._batcher
+    drive_publisher._batcher = batcher
+    return original
+
+def test_upload_mode_and_shared_folder():
+    print("=" * 50)
+    print("업로드 방식 / 공유 폴더 테스트")
+    print("=" * 50)
+
+    drive = StubDrive()
+    original = with_batcher(PermissionBatcher(batch_seconds=0.5))
+    try:
+        small = publish_audio(drive, b"\xff" * 1000, "small.mp3")
+        large = publish_audio(drive, b"\xff" * (drive_publisher.DRIVE_SIMPLE_UPLOAD_MAX_BYTES + 1), "large.mp3")
+        assert drive.uploads == [("small.mp3", False), ("large.mp3", True)]
+        # 다른 업로드가 없으면 기다리지 않고 한 건씩 바로 보냄
+        assert drive.batches == [[small], [large]]
+
+        # 공유 폴더는 권한 요청 없이 업로드만
+        publish_audio(drive, b"\xff" * 1000, "shared.mp3", folder_id="shared-folder", folder_shared=True)
+        assert len(drive.uploads) == 3 and len(drive.batches) == 2
+    finally:
+        drive_publisher._batcher = original
+
+def test_concurrent_grants_batched():
+    print("=" * 50)
+    print("공개 권한 배치 테스트")
+    print("=" * 50)
+
+    drive = StubDrive(upload_seconds=0.05, fail={"file-3"})
+    batcher = PermissionBatcher(batch_seconds=2.0)
+    original = with_batcher(batcher)
+    results = {}
+
+    def publish(index):
+        try:
+            results[index] = publish_audio(drive, b"\xff" * 1000, f"{index}.mp3")
+        except Exception as e:
+            results[index] = e
+
+    try:
+        threads = [threading.Thread(target=publish, args=(index,)) for index in range(8)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        drive_publisher._batcher = original
+
+    print(f"배치 {len(drive.batches)}회 {[len(batch) for batch in drive.batches]}, 소요 {elapsed:.2f}초, 통계 {batcher.get_stats()}")
+    assert len(drive.uploads) == 8
+    # 8개가 동시에 올라가므로 권한은 배치 하나, 마지막 업로드가 끝나면 바로 보냄 (최대 대기 시간까지 기다리지 않음)
+    assert len(drive.batches) == 1 and sorted(drive.batches[0]) == sorted(f"file-{index}" for index in range(1, 9))
+    assert elapsed < 1.0
+    # 실패한 요청만 그 호출에서 예외
+    failed = [result for result in results.values() if isinstance(result, Exception)]
+    assert len(failed) == 1
+    assert batcher.get_stats() == {"grants": 8, "batches": 1, "errors": 1}
+
+if __name__ == "__main__":
+    test_upload_mode_and_shared_folder()
+    test_concurrent_grants_batched()
@@ -0,0 +1,124 @@
+# test_gemini_batch.py - Gemini 일괄 요약 테스트
+# 여러 사이트를 한 요청으로 요약한 뒤 사이트별로 나누고, 빠지거나 잘못된 사이트만 한 건씩 다시 요약하는지 확인
+# (JSON 응답 형식과 "키: 값" 줄 형식 모두)
+
+import json
+import os
+import re
+import tempfile
+import google.ai.generativelanguage as glm
+import gemini_client
+import sub1
+from summary_cache import SummaryCache
+
+PAGES = [
+    ("https://alpha.example", "Alpha는 문서 작성 도구입니다. " * 10),
+    ("https://beta.example", "Beta는 일정 관리 도구입니다. " * 10),
+    ("https://gamma.example", "Gamma는 번역 도구입니다. " * 10),
+    ("https://delta.example", "Delta는 디자인 도구입니다. " * 10),
+]
+
+def site_object(url, name, rating="높음"):
+    return {"site_name": name, "url": url, "categories": ["AI", "도구"], "rating": rating,
+            "summary": f"{name} 요약\n두 번째 줄", "script_en": f"{name} script"}
+
+def site_block(number, url, name, rating="높음"):
+    return f"=== 사이트 {number} ===\n사이트 이름: {name}\nURL: {url}\n카테고리: AI, 도구\n평가/효용성: {rating}\n요약 설명: {name} 요약\nScript: {name} script"
+
+class BatchStubClient:
+    requests = []
+
+    def __init__(self, api_key):
+        pass
+
+    def generate_content(self, request, timeout=None):
+        prompt = request.contents[0].parts[0].text
+        BatchStubClient.requests.append(prompt)
+        urls = re.findall(r'^URL: (https://\w+\.example)$', prompt, re.M)
+        json_mode = "JSON" in prompt.split("**중요 지침:**")[0]
+        if len(urls) > 1 and json_mode:
+            # 일괄 응답: 2번은 평가 값이 잘못되고 3번은 빠져서 4번이 3번 자리에 옴
+            text = "```json\n" + json.dumps([
+                site_object(urls[0], "Alpha"),
+                site_object(urls[1], "Beta", rating="매우 좋음"),
+                site_object(urls[3], "Delta"),
+            ], ensure_ascii=False) + "\n```"
+        elif len(urls) > 1:
+            # 일괄 응답: 2번은 평가 값이 잘못되고 3번은 빠짐
+            text = "\n\n".join([
+                site_block(1, urls[0], "Alpha"),
+                site_block(2, urls[1], "Beta", rating="매우 좋음"),
+                site_block(4, urls[3], "Delta"),
+            ])
+        else:
+            url = urls[0]
+            name = url.split("//")[1].split(".")[0].title()
+            if json_mode:
+                text = json.dumps(site_object(url, name), ensure_ascii=False)
+            else:
+                text = site_block(1, url, name).split("\n", 1)[1]
+        return glm.GenerateContentResponse(candidates=[{"content": {"parts": [{"text": text}]}}])
+
+def run_batch_scenario(mode, expected_retries):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SummaryCache(os.path.join(tmp, "summary.db"))
+        original = (gemini_client._make_client, gemini_client._registry, sub1.get_summary_cache, sub1.GEMINI_OUTPUT_MODE)
+        gemini_client._make_client = BatchStubClient
+        gemini_client._registry = None
+        sub1.get_summary_cache = lambda: cache
+        sub1.GEMINI_OUTPUT_MODE = mode
+        BatchStubClient.requests = []
+        try:
+            results = sub1.gemini_extract_notion_fields_batch(PAGES, "key")
+            names = [fields["사이트 이름"] for fields in results]
+            print(f"결과({mode}): {names}")
+
+            assert names == ["Alpha", "Beta", "Gamma", "Delta"]
+            assert [fields["URL"] for fields in results] == [url for url, _ in PAGES]
+            assert all(fields["평가/효용성"] == "높음" for fields in results)
+            assert results[0]["카테고리"] == ["AI", "도구"]
+            assert len(BatchStubClient.requests) == 1 + expected_retries
+            assert "=== 사이트 4 ===" in BatchStubClient.requests[0]
+
+            # 다시 요청하면 모두 요약 캐시에서 가져옴
+            again = sub1.gemini_extract_notion_fields_batch(PAGES, "key")
+            assert [fields["사이트 이름"] for fields in again] == names
+            assert len(BatchStubClient.requests) == 1 + expected_retries
+            return results
+        finally:
+            gemini_client._make_client, gemini_client._registry, sub1.get_summary_cache, sub1.GEMINI_OUTPUT_MODE = original
+            cache.close()
+
+def test_batch_splits_and_retries_bad_records():
+    print("=" * 50)
+    print("Gemini 일괄 요약 테스트 (줄 형식)")
+    print("=" * 50)
+
+    # 일괄 1회 + 불량(Beta) / 누락(Gamma) 재요청 2회
+    run_batch_scenario("text", expected_retries=2)
+
+def test_batch_json_keeps_multiline_values():
+    print("=" * 50)
+    print("Gemini 일괄 요약 테스트 (JSON)")
+    print("=" * 50)
+
+    # 일괄 1회 + 불량(Beta) / 3번 자리에 온 Delta(URL 불일치) / 빠진 4번 재요청 3회
+    results = run_batch_scenario("json", expected_retries=3)
+    assert results[0]["요약 설명"] == "Alpha 요약\n두 번째 줄"
+
+def test_validate_detects_mismatched_site():
+    print("=" * 50)
+    print("일괄 요약 검증 테스트")
+    print("=" * 50)
+
+    blocks = sub1.split_batch_response(site_block(1, "https://alpha.example", "Alpha") + "\n\n**=== 사이트 2 ===**\n사이트 이름: Beta", mode="text")
+    assert sorted(blocks) == [1, 2]
+    fields = {"사이트 이름": "Alpha", "URL": "https://alpha.example", "평가/효용성": "보통", "요약 설명": "요약"}
+    assert sub1.validate_notion_fields(fields, "https://www.alpha.example/?utm_source=x") == []
+    problems = sub1.validate_notion_fields(fields, "https://beta.example")
+    assert problems and problems[0].startswith("URL 불일치")
+
+if __name__ == "__main__":
+    test_batch_splits_and_retries_bad_records()
+    test_batch_json_keeps_multiline_values()
+    test_validate_detects_mismatched_site()
@@ -0,0 +1,118 @@
+# test_gemini_client.py - Gemini 모델 레지스트리 테스트
+# 스텁 클라이언트로 클라이언트/모델 생성 횟수를 세어 호출마다 다시 만들지 않는지, 타임아웃이 전달되는지 확인
+
+import asyncio
+import google.ai.generativelanguage as glm
+import gemini_client
+import sub1
+
+RESPONSE_TEXT = "사이트 이름: Stub Tool\nURL: https://stub.example\n평가/효용성: 높음\n요약 설명: 스텁 응답"
+
+def make_response():
+    return glm.GenerateContentResponse(candidates=[{"content": {"parts": [{"text": RESPONSE_TEXT}]}}])
+
+class StubClient:
+    constructed = 0
+
+    def __init__(self, api_key):
+        StubClient.constructed += 1
+        self.api_key = api_key
+        self.calls = []
+
+    def generate_content(self, request, timeout=None):
+        self.calls.append((request.model, timeout))
+        return make_response()
+
+class StubAsyncClient(StubClient):
+    async def generate_content(self, request, timeout=None):
+        self.calls.append((request.model, timeout))
+        await asyncio.sleep(0)
+        return make_response()
+
+def with_stub_clients(func):
+    def wrapper():
+        original = (gemini_client._make_client, gemini_client._make_async_client, gemini_client._registry)
+        gemini_client._make_client = StubClient
+        gemini_client._make_async_client = StubAsyncClient
+        gemini_client._registry = None
+        StubClient.constructed = 0
+        try:
+            func()
+        finally:
+            gemini_client._make_client, gemini_client._make_async_client, gemini_client._registry = original
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+@with_stub_clients
+def test_clients_are_built_once_per_key():
+    print("=" * 50)
+    print("Gemini 레지스트리 재사용 테스트")
+    print("=" * 50)
+
+    for i in range(10):
+        fields = sub1.gemini_extract_notion_fields(f"본문 {i}", "https://stub.example", "key-a", use_cache=False)
+        assert fields["사이트 이름"] == "Stub Tool"
+    sub1.gemini_extract_notion_fields("본문", "https://stub.example", "key-b", use_cache=False)
+
+    registry = gemini_client.get_gemini_registry()
+    stats = registry.get_stats()
+    print(f"생성 횟수: {stats}")
+
+    # 키마다 클라이언트 1개, (키, 모델)마다 모델 1개
+    assert StubClient.constructed == 2
+    assert stats == {"clients": 2, "async_clients": 0, "models": 2}
+    assert registry.get_model("key-a") is registry.get_model("key-a")
+    calls = registry.client("key-a").calls
+    assert len(calls) == 10
+    assert calls[0] == (f"models/{gemini_client.GEMINI_MODEL}", gemini_client.GEMINI_TIMEOUT)
+
+@with_stub_clients
+def test_async_calls_share_client_per_loop():
+    print("=" * 50)
+    print("Gemini 비동기 호출 테스트")
+    print("=" * 50)
+
+    async def scenario():
+        results = await asyncio.gather(*(
+            sub1.gemini_extract_notion_fields_async(f"본문 {i}", "https://stub.example", "key-a", use_cache=False) for i in range(5)
+        ))
+        model = gemini_client.get_gemini_model("key-a", "gemini-1.5-flash")
+        response = await model.generate_content_async("ping", timeout=3)
+        return results, response
+
+    results, response = asyncio.run(scenario())
+    assert all(result["평가/효용성"] == "높음" for result in results)
+    assert response.text == RESPONSE_TEXT
+
+    # 이벤트 루프가 새로 생기면 그 루프용 클라이언트를 한 번 더 만듦
+    asyncio.run(scenario())
+
+    stats = gemini_client.get_gemini_registry().get_stats()
+    print(f"생성 횟수: {stats}")
+    assert stats["async_clients"] == 2
+    assert stats["models"] == 2
+    assert StubClient.constructed == 2
+
+@with_stub_clients
+def test_errors_fall_back_to_default_fields():
+    print("=" * 50)
+    print("Gemini 오류 시 기본값 테스트")
+    print("=" * 50)
+
+    # 일시적 오류가 아닌 경우만 기본값 (타임아웃 등은 test_resilience.py에서 확인)
+    def failing_client(api_key):
+        client = StubClient(api_key)
+        def fail(request, timeout=None):
+            raise ValueError("invalid argument")
+        client.generate_content = fail
+        return client
+
+    gemini_client._make_client = failing_client
+    fields = sub1.gemini_extract_notion_fields("본문", "https://stub.example", "key-a", use_cache=False)
+    assert fields["요약 설명"] == "요약 생성 실패"
+    assert fields["URL"] == "https://stub.example"
+
+if __name__ == "__main__":
+    test_clients_are_built_once_per_key()
+    test_async_calls_share_client_per_loop()
+    test_errors_fall_back_to_default_fields()
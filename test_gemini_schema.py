@@ -0,0 +1,96 @@
+# test_gemini_schema.py - Gemini JSON 응답 파서 테스트
+# 여러 줄 값이 잘리지 않고, 코드 블록/앞 문장/한국어 키가 섞여도 같은 레코드로 읽히며, 잘못된 값은 검증에서 걸리는지 확인
+# JSON 모드의 Airtable 변환은 예전 줄 형식 변환기를 거치지 않고 카테고리만 연결하는지 확인
+
+import contextlib
+import glob
+import io
+import json
+import os
+import sub1
+from gemini_schema import SiteSummary, SchemaError, parse_site_summary, parse_site_summaries, parse_and_validate
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_corpus', 'gemini_responses')
+
+def test_recorded_json_responses_parse_without_loss():
+    print("=" * 50)
+    print("기록된 JSON 응답 파싱 테스트")
+    print("=" * 50)
+
+    paths = sorted(glob.glob(os.path.join(CORPUS_DIR, '*.json')))
+    assert paths
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            sample = json.load(f)
+        summary, problems = parse_and_validate(sample["json_response"], sample["url"])
+        print(f"{os.path.basename(path)}: {summary.site_name} {problems}")
+        assert summary == SiteSummary(**sample["expected"])
+        assert problems == []
+
+def test_values_are_normalized():
+    print("=" * 50)
+    print("JSON 값 정리 테스트")
+    print("=" * 50)
+
+    summary = parse_site_summary(json.dumps({
+        "사이트 이름": " Tool ",
+        "url": "https://tool.example",
+        "categories": "AI, 도구, AI, " + "x" * 200,
+        "rating": "보통 (무난함)",
+        "summary": ["첫 줄", "둘째 줄"],
+        "unknown": 1
+    }, ensure_ascii=False))
+
+    assert summary.site_name == "Tool"
+    assert summary.categories == ["AI", "도구"]
+    assert summary.rating == "보통"
+    assert summary.summary == "첫 줄\n둘째 줄"
+    assert summary.script_en == ""
+    assert summary.to_fields()["카테고리"] == ["AI", "도구"]
+
+def test_invalid_responses():
+    print("=" * 50)
+    print("잘못된 응답 테스트")
+    print("=" * 50)
+
+    for text in ("사이트 이름: Tool\nURL: https://tool.example", '{"site_name": "Tool"', '"just a string"'):
+        try:
+            parse_site_summary(text)
+            assert False, text
+        except SchemaError as e:
+            print(f"거부: {e}")
+
+    _, problems = parse_and_validate({"site_name": "", "url": "https://other.example", "rating": "최고"}, "https://tool.example")
+    assert len(problems) == 4
+
+    items = parse_site_summaries('{"sites": [{"site_name": "A"}, {"site_name": "B"}]}')
+    assert [item["site_name"] for item in items] == ["A", "B"]
+
+def test_airtable_conversion():
+    print("=" * 50)
+    print("Airtable 필드 변환 테스트")
+    print("=" * 50)
+
+    summary = parse_site_summary('{"site_name": "Stub", "categories": ["AI", "생산성"], "rating": "높음", "summary": "요약"}')
+    fields = summary.to_airtable_fields()
+    assert fields["카테고리"] == "AI, 생산성" and fields["사이트 이름"] == "Stub"
+    # 원래 필드는 그대로 (캐시에 넣는 값이 바뀌지 않도록)
+    cached = summary.to_fields()
+    assert sub1.fields_for_airtable(cached, mode="json") == fields
+    assert cached["카테고리"] == ["AI", "생산성"]
+
+    # JSON 모드는 디버그 출력 없이 변환
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        sub1.fields_for_airtable(cached, mode="json")
+        sub1._notion_fields_from_response(json.dumps({"site_name": "Stub", "rating": "높음"}), "https://stub.example", mode="json")
+    assert output.getvalue() == ""
+
+    # 줄 형식은 예전 변환기 (JSON 배열 문자열도 연결)
+    assert sub1.fields_for_airtable({"카테고리": '["AI", "도구"]'}, mode="text")["카테고리"] == "AI, 도구"
+
+if __name__ == "__main__":
+    test_recorded_json_responses_parse_without_loss()
+    test_values_are_normalized()
+    test_invalid_responses()
+    test_airtable_conversion()
@@ -0,0 +1,139 @@
+# test_google_clients.py - Google TTS/Drive 클라이언트 홀더 테스트
+# TTS 클라이언트와 인증 정보, discovery 문서는 한 번만 만들고 Drive 서비스는 스레드마다 하나씩 재사용하며,
+# 인증 파일이 없으면 Drive 업로드 없이 실패 결과를 돌려주는지 확인
+
+import os
+import threading
+import google_clients
+import sub3
+from google_clients import GoogleClients
+
+class CountingFactories:
+    """google_clients의 생성 함수를 횟수만 세는 스텁으로 교체"""
+    names = ["_make_tts_client", "_load_credentials", "_load_drive_document", "_build_drive"]
+
+    def __init__(self):
+        self.calls = {name: 0 for name in self.names}
+
+    def _make_tts_client(self):
+        self.calls["_make_tts_client"] += 1
+        return object()
+
+    def _load_credentials(self, credentials_file, scopes):
+        self.calls["_load_credentials"] += 1
+        return ("creds", credentials_file, scopes)
+
+    def _load_drive_document(self):
+        self.calls["_load_drive_document"] += 1
+        return {"name": "drive"}
+
+    def _build_drive(self, document, credentials):
+        self.calls["_build_drive"] += 1
+        return object()
+
+    def install(self):
+        original = {name: getattr(google_clients, name) for name in self.names}
+        for name in self.names:
+            setattr(google_clients, name, getattr(self, name))
+        return original
+
+def test_clients_built_once():
+    print("=" * 50)
+    print("Google 클라이언트 재사용 테스트")
+    print("=" * 50)
+
+    factories = CountingFactories()
+    original = factories.install()
+    original_env = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = "service_account.json"
+    try:
+        clients = GoogleClients()
+        assert clients.tts() is clients.tts()
+        drive = clients.drive()
+        assert clients.drive() is drive
+
+        # 다른 스레드는 자기 Drive 서비스를 만들지만 인증 정보와 discovery 문서는 공유
+        other = []
+        thread = threading.Thread(target=lambda: other.append(clients.drive()))
+        thread.start()
+        thread.join()
+        assert other[0] is not drive
+
+        print(f"생성 횟수: {factories.calls}")
+        assert factories.calls == {"_make_tts_client": 1, "_load_credentials": 1, "_load_drive_document": 1, "_build_drive": 2}
+        assert clients.get_stats()["drive_services"] == 2
+
+        # 인증 파일이 설정되지 않았으면 Drive 없음
+        del os.environ['GOOGLE_APPLICATION_CREDENTIALS']
+        assert clients.drive() is None
+    finally:
+        for name, func in original.items():
+            setattr(google_clients, name, func)
+        if original_env is None:
+            os.environ.pop('GOOGLE_APPLICATION_CREDENTIALS', None)
+        else:
+            os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = original_env
+
+def test_tts_upload_uses_shared_clients():
+    print("=" * 50)
+    print("TTS → Drive 업로드 경로 테스트")
+    print("=" * 50)
+
+    class StubTTS:
+        calls = 0
+        def synthesize_speech(self, input, voice, audio_config):
+            StubTTS.calls += 1
+            return type("Response", (), {"audio_content": b"mp3"})()
+
+    class StubRequest:
+        def __init__(self, result):
+            self.result = result
+        def execute(self):
+            return self.result
+
+    class StubBatch:
+        def __init__(self, callback):
+            self.callback = callback
+            self.requests = []
+        def add(self, request, request_id):
+            self.requests.append(request_id)
+        def execute(self):
+            StubDrive.batches += 1
+            for request_id in self.requests:
+                self.callback(request_id, {}, None)
+
+    class StubDrive:
+        uploads = []
+        batches = 0
+        def new_batch_http_request(self, callback):
+            return StubBatch(callback)
+        def files(self):
+            return self
+        def permissions(self):
+            return self
+        def create(self, **kwargs):
+            if "media_body" in kwargs:
+                StubDrive.uploads.append(kwargs["body"]["name"])
+            return StubRequest({"id": "file-1"})
+
+    class StubClients:
+        def tts(self):
+            return StubTTS()
+        def drive(self):
+            return StubDrive()
+
+    original = (sub3.get_google_clients, sub3.get_audio_cache)
+    sub3.get_google_clients = lambda: StubClients()
+    sub3.get_audio_cache = lambda: None
+    try:
+        result = sub3.process_script_to_tts_google_drive("Hello there.", site_name="Stub Tool")
+        assert result["success"] and result["file_id"] == "file-1"
+        assert result["audio_url"] == "https://drive.google.com/uc?id=file-1"
+        assert StubTTS.calls == 1 and StubDrive.uploads[0].endswith("Stub Tool.mp3")
+        assert StubDrive.batches == 1
+    finally:
+        sub3.get_google_clients, sub3.get_audio_cache = original
+
+if __name__ == "__main__":
+    test_clients_built_once()
+    test_tts_upload_uses_shared_clients()
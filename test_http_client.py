@@ -0,0 +1,58 @@
+# test_http_client.py - 공용 HTTP 세션의 커넥션 재사용 / 기본 타임아웃 테스트
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http_client import PooledSession
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_connections_are_reused_per_host():
+    print("=" * 50)
+    print("커넥션 재사용 테스트")
+    print("=" * 50)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        session = PooledSession(timeout=(1, 2))
+        seen_timeouts = []
+        original_send = session.adapter.send
+
+        def recording_send(request, **kwargs):
+            seen_timeouts.append(kwargs.get("timeout"))
+            return original_send(request, **kwargs)
+
+        session.adapter.send = recording_send
+
+        base = f"http://127.0.0.1:{server.server_port}"
+        for _ in range(5):
+            assert session.get(f"{base}/ping").json() == {"ok": True}
+        session.get(f"{base}/ping", timeout=7)
+
+        stats = session.get_stats()[f"127.0.0.1:{server.server_port}"]
+        print(f"통계: {stats}")
+
+        assert stats["requests"] == 6
+        assert stats["new_connections"] == 1
+        assert stats["reused"] == 5
+        # 타임아웃을 주지 않은 요청에는 기본값이 적용됨
+        assert seen_timeouts[:5] == [(1, 2)] * 5
+        assert seen_timeouts[5] == 7
+        session.close()
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_connections_are_reused_per_host()
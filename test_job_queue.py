@@ -0,0 +1,244 @@
+# test_job_queue.py - URL 작업 큐 테스트
+# 작업과 단계별 결과가 디스크에 남아 재시작 후 마지막으로 끝난 단계부터 이어서 처리되고
+# (Gemini 요약과 TTS는 다시 하지 않음), Gemini 장애 시에는 끝난 단계를 유지한 채 나중으로 미뤄지는지 확인
+
+import asyncio
+import os
+import tempfile
+import time
+import sub1
+import url_jobs
+from job_queue import JobQueue
+
+class Crash(Exception):
+    """저장 단계 도중 프로세스가 죽은 상황"""
+
+class StubStages:
+    """url_jobs가 부르는 외부 호출을 횟수만 세는 스텁으로 교체"""
+    names = ["extract_text_from_url_async", "gemini_extract_notion_fields_async", "process_script_to_tts_google_drive",
+             "send_to_airtable_async", "send_to_telegram_async", "update_airtable_record_async"]
+
+    def __init__(self):
+        self.calls = {name: 0 for name in self.names}
+        self.crash_on_store = False
+        self.summary_down = False
+        self.check_duplicates = []
+        self.record_updates = []
+
+    async def extract_text_from_url_async(self, url):
+        self.calls["extract_text_from_url_async"] += 1
+        return "Stub Tool은 테스트용 도구입니다."
+
+    async def gemini_extract_notion_fields_async(self, text, url, api_key):
+        self.calls["gemini_extract_notion_fields_async"] += 1
+        if self.summary_down:
+            raise sub1.SummaryUnavailable("gemini 서킷 열림")
+        return {"사이트 이름": "Stub Tool", "URL": url, "요약 설명": "요약", "Script": "Stub script"}
+
+    def process_script_to_tts_google_drive(self, script, voice_name, site_name=""):
+        self.calls["process_script_to_tts_google_drive"] += 1
+        return {"success": True, "audio_url": "https://drive.example/audio", "filename": "a.mp3", "file_id": "f1"}
+
+    async def send_to_airtable_async(self, api_key, base_id, table_name, data, check_duplicates=True, update_if_duplicate=False):
+        self.calls["send_to_airtable_async"] += 1
+        self.check_duplicates.append(check_duplicates)
+        if self.crash_on_store:
+            self.crash_on_store = False
+            raise Crash()
+        return {"success": True, "is_duplicate": False, "action": "created", "record_id": "rec1", "message": ""}
+
+    async def send_to_telegram_async(self, bot_token, chat_id, text):
+        self.calls["send_to_telegram_async"] += 1
+        return True
+
+    async def update_airtable_record_async(self, api_key, base_id, table_name, record_id, data):
+        self.calls["update_airtable_record_async"] += 1
+        self.record_updates.append((record_id, data))
+        return True
+
+    def install(self):
+        original = {name: getattr(url_jobs, name) for name in self.names}
+        for name in self.names:
+            setattr(url_jobs, name, getattr(self, name))
+        return original
+
+def test_queue_order_lease_and_reopen():
+    print("=" * 50)
+    print("작업 큐 기본 동작 테스트")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.db")
+        queue = JobQueue(path)
+        first = queue.enqueue("https://a.example", meta={"message_id": 1})
+        queue.enqueue("https://b.example")
+        queue.enqueue("https://c.example", source="migration")
+
+        job = queue.claim("worker-1", source="discord")
+        assert job["id"] == first and job["meta"] == {"message_id": 1}
+        queue.checkpoint(job, "fetched", text="본문")
+        # 기한이 남은 작업은 다른 워커가 가져가지 않음
+        assert queue.claim("worker-2", source="discord")["url"] == "https://b.example"
+        assert queue.claim("worker-2", source="discord") is None
+        queue.close()
+
+        # 다시 열어도 단계와 결과가 남아 있음
+        queue = JobQueue(path)
+        assert queue.get(first)["stage"] == "fetched"
+        assert queue.get(first)["data"]["text"] == "본문"
+        assert queue.requeue_running(["worker-1"]) == 1
+        again = queue.claim("worker-3", source="discord")
+        assert again["id"] == first and again["claims"] == 2
+
+        # 기한이 지난 작업은 다른 워커가 가져감
+        queue.enqueue("https://d.example")
+        stale = queue.claim("worker-4", lease_seconds=-1)
+        assert stale["url"] == "https://c.example"
+        assert queue.claim("worker-5", source="migration")["id"] == stale["id"]
+
+        stats = queue.get_stats()
+        print(f"통계: {stats}")
+        assert stats["status"] == {"pending": 1, "running": 3}
+
+        # 봇 재시작은 자기 출처의 작업만 되돌림 (마이그레이션이 처리 중인 작업은 그대로)
+        assert queue.requeue_running(source="discord") == 2
+        assert queue.get(stale["id"])["status"] == "running"
+        queue.close()
+
+def test_resume_skips_finished_stages():
+    print("=" * 50)
+    print("단계 체크포인트 재개 테스트")
+    print("=" * 50)
+
+    stubs = StubStages()
+    original = stubs.install()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.db")
+        queue = JobQueue(path)
+        try:
+            queue.enqueue("https://stub.example")
+            stubs.crash_on_store = True
+            job = queue.claim("bot")
+            try:
+                asyncio.run(url_jobs.run_url_job(queue, job))
+                assert False
+            except Crash:
+                pass
+            queue.close()
+
+            # 재시작: 처리 중이던 작업을 다시 가져오면 TTS까지는 끝난 상태
+            queue = JobQueue(path)
+            queue.requeue_running()
+            job = queue.claim("bot")
+            assert job["stage"] == "tts_done"
+            assert job["data"]["fields"]["TTS_URL"] == "https://drive.example/audio"
+            result = asyncio.run(url_jobs.process_job(queue, job))
+            assert result["status"] == "done"
+
+            print(f"호출 횟수: {stubs.calls}")
+            assert stubs.calls["extract_text_from_url_async"] == 1
+            assert stubs.calls["gemini_extract_notion_fields_async"] == 1
+            assert stubs.calls["process_script_to_tts_google_drive"] == 1
+            assert stubs.calls["send_to_airtable_async"] == 2
+            assert stubs.calls["send_to_telegram_async"] == 1
+            # 다시 가져간 작업은 저장 전에 중복 확인 (이미 저장됐을 수 있으므로)
+            assert stubs.check_duplicates[-1] is True
+            assert queue.get(job["id"])["status"] == "done"
+            assert queue.get(job["id"])["stage"] == "notified"
+        finally:
+            for name, func in original.items():
+                setattr(url_jobs, name, func)
+            queue.close()
+
+def test_summary_outage_defers_job():
+    print("=" * 50)
+    print("Gemini 장애 시 작업 미루기 테스트")
+    print("=" * 50)
+
+    stubs = StubStages()
+    stubs.summary_down = True
+    original = stubs.install()
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"))
+        try:
+            job_id = queue.enqueue("https://stub.example")
+            result = asyncio.run(url_jobs.process_job(queue, queue.claim("bot")))
+            assert result["status"] == "deferred"
+            assert result["retry_in"] > 0
+
+            job = queue.get(job_id)
+            assert job["status"] == "pending" and job["stage"] == "fetched" and job["attempts"] == 1
+            # 재시도 시각 전에는 가져가지 않음
+            assert queue.claim("bot") is None
+            assert stubs.calls["send_to_airtable_async"] == 0
+
+            # 재시도 시각이 지나면 요약부터 다시 (크롤링은 하지 않음)
+            queue.conn.execute("UPDATE jobs SET next_attempt_at = ? WHERE id = ?", (time.time() - 1, job_id))
+            queue.conn.commit()
+            stubs.summary_down = False
+            result = asyncio.run(url_jobs.process_job(queue, queue.claim("bot")))
+            assert result["status"] == "done"
+            assert stubs.calls["extract_text_from_url_async"] == 1
+            assert stubs.calls["gemini_extract_notion_fields_async"] == 2
+        finally:
+            for name, func in original.items():
+                setattr(url_jobs, name, func)
+            queue.close()
+
+def test_background_tts_job():
+    print("=" * 50)
+    print("TTS 후속 작업 테스트")
+    print("=" * 50)
+
+    stubs = StubStages()
+    original = stubs.install()
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"))
+        try:
+            job_id = queue.enqueue("https://stub.example", meta={"message_id": 7, "background_tts": True})
+            # TTS 작업을 추가한 직후 완료 처리 전에 죽음
+            complete = queue.complete
+            def crash_once(job):
+                queue.complete = complete
+                raise Crash()
+            queue.complete = crash_once
+            try:
+                asyncio.run(url_jobs.run_url_job(queue, queue.claim("bot")))
+                assert False
+            except Crash:
+                pass
+
+            # 다시 처리해도 TTS 작업은 하나만
+            queue.requeue_running()
+            result = asyncio.run(url_jobs.process_job(queue, queue.claim("bot")))
+            assert result["status"] == "done"
+            assert queue.get_stats()["status"] == {"done": 1, "pending": 1}
+
+            # 음성 없이 먼저 저장·전송하고, TTS는 후속 작업으로
+            assert stubs.calls["process_script_to_tts_google_drive"] == 0
+            assert stubs.calls["send_to_telegram_async"] == 1
+            job = queue.get(job_id)
+            assert url_jobs.tts_pending(job["data"]["fields"])
+            tts_job = queue.get(job["data"]["tts_job"])
+            assert tts_job["meta"]["kind"] == "tts" and tts_job["meta"]["record_id"] == "rec1"
+            assert tts_job["meta"]["message_id"] == 7
+
+            result = asyncio.run(url_jobs.process_job(queue, queue.claim("bot")))
+            assert result["status"] == "done"
+            assert stubs.calls["process_script_to_tts_google_drive"] == 1
+            assert stubs.calls["send_to_airtable_async"] == 1
+            print(f"레코드 수정: {stubs.record_updates}")
+            assert stubs.record_updates == [("rec1", {"TTS_URL": "https://drive.example/audio", "TTS_파일명": "a.mp3", "Drive_파일ID": "f1"})]
+            tts_job = queue.get(tts_job["id"])
+            assert tts_job["stage"] == "notified" and tts_job["data"]["fields"]["TTS_URL"] == "https://drive.example/audio"
+            assert queue.claim("bot") is None
+        finally:
+            for name, func in original.items():
+                setattr(url_jobs, name, func)
+            queue.close()
+
+if __name__ == "__main__":
+    test_queue_order_lease_and_reopen()
+    test_resume_skips_finished_stages()
+    test_summary_outage_defers_job()
+    test_background_tts_job()
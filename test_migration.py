@@ -8,7 +8,7 @@ from datetime import datetime
 from dotenv import load_dotenv
 import os
 import json
-from urllib.parse import urlparse
+from url_utils import canonicalize_url
 from sub1 import extract_text_from_url, gemini_extract_notion_fields, flatten_fields_for_airtable
 from sub2 import send_to_airtable
 from sub3 import process_script_to_tts_google_drive
@@ -97,16 +97,8 @@ class TestMigrationProcessor:
             print(f"⚠️ 기존 URL 확인 중 오류: {str(e)}")
     
     def normalize_url(self, url):
-        """URL 정규화 (중복 체크용)"""
-        try:
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            parsed = urlparse(url.lower())
-            normalized = f"{parsed.netloc}{parsed.path}".rstrip('/')
-            return normalized
-        except:
-            return url.lower().strip()
+        """URL 정규화 (중복 체크용, url_utils.canonicalize_url 사용)"""
+        return canonicalize_url(url)
     
     def get_urls_from_sheet(self, limit=5):
         """구글 시트에서 제한된 수의 URL 목록 가져오기"""
@@ -0,0 +1,95 @@
+# test_migration_parallel.py - 병렬 마이그레이션 테스트
+# 시트의 행을 작업 큐에 넣어 여러 행을 동시에 처리하고(텔레그램 전송 없음), 중단된 실행에서 처리 중이던 행은
+# 마친 단계 다음부터 이어서 처리하며, 결과가 시트 상태에 반영되는지 확인
+
+import os
+import socket
+import tempfile
+import migration_script
+import url_jobs
+from job_queue import JobQueue
+from gspread.utils import a1_to_rowcol
+from migration_script import MigrationProcessor, format_progress
+from sheet_status import SheetStatusWriter
+from test_job_queue import StubStages
+
+class FakeSheet:
+    def __init__(self, rows):
+        self.rows = [["URL", "상태"]] + [list(row) for row in rows]
+
+    def get_all_values(self):
+        return [list(row) for row in self.rows]
+
+    def batch_update(self, data):
+        for update in data:
+            row, col = a1_to_rowcol(update["range"])
+            self.rows[row - 1][col - 1] = update["values"][0][0]
+
+def make_processor(sheet):
+    """시트/Airtable 연결 없이 만든 MigrationProcessor"""
+    processor = object.__new__(MigrationProcessor)
+    processor.sheet = sheet
+    processor.status_writer = SheetStatusWriter(sheet, flush_seconds=60)
+    processor.processed_urls = set()
+    processor.success_count = processor.error_count = processor.duplicate_count = processor.deferred_count = 0
+    return processor
+
+def test_format_progress():
+    print("=" * 50)
+    print("진행률 표시 테스트")
+    print("=" * 50)
+
+    line = format_progress(30, 90, 60)
+    print(line)
+    assert "30.0 URL/분" in line and "0:03:00" in line
+    assert "계산 중" in format_progress(0, 10, 5)
+    assert "0:00:00" in format_progress(10, 0, 60)
+
+def test_parallel_migration_resumes():
+    print("=" * 50)
+    print("병렬 마이그레이션 재개 테스트")
+    print("=" * 50)
+
+    stubs = StubStages()
+    original = stubs.install()
+    original_queue = migration_script.get_job_queue
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"))
+        migration_script.get_job_queue = lambda: queue
+        try:
+            sheet = FakeSheet([(f"https://site{i}.example", "") for i in range(6)] + [("https://done.example", "완료")])
+            processor = make_processor(sheet)
+
+            # 지난 실행: 행을 큐에 넣고 하나는 요약까지 마친 채 종료됨
+            assert processor.enqueue_rows(queue, include_tts=False) == 6
+            interrupted = queue.claim(f"{socket.gethostname()}:999999999", source="migration")
+            queue.checkpoint(interrupted, "fetched", text="본문")
+            queue.checkpoint(interrupted, "summarized", fields={"사이트 이름": "Resumed", "URL": interrupted["url"]}, text=None)
+
+            processor.run_parallel_migration(include_tts=False)
+
+            assert [row[1] for row in sheet.rows[1:]] == ["완료"] * 7
+            assert processor.success_count == 6 and processor.duplicate_count == 0
+            print(f"호출 횟수: {stubs.calls}")
+            # 이어서 처리한 행은 크롤링/요약을 다시 하지 않음
+            assert stubs.calls["extract_text_from_url_async"] == 5
+            assert stubs.calls["gemini_extract_notion_fields_async"] == 5
+            assert stubs.calls["send_to_airtable_async"] == 6
+            assert stubs.calls["process_script_to_tts_google_drive"] == 0
+            assert stubs.calls["send_to_telegram_async"] == 0
+            assert queue.get_stats("migration")["status"] == {"done": 6}
+
+            # 다시 실행해도 이미 넣은 행은 추가하지 않음
+            sheet.rows[1][1] = ""
+            assert processor.enqueue_rows(queue) == 0
+            processor.status_writer.flush()
+            assert sheet.rows[1][1] == ""
+        finally:
+            for name, func in original.items():
+                setattr(url_jobs, name, func)
+            migration_script.get_job_queue = original_queue
+            queue.close()
+
+if __name__ == "__main__":
+    test_format_progress()
+    test_parallel_migration_resumes()
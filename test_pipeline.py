@@ -0,0 +1,51 @@
+# test_pipeline.py - 블로킹 단계가 실행되는 동안 이벤트 루프가 멈추지 않는지 확인
+
+import asyncio
+import threading
+import time
+from pipeline import run_blocking
+
+def test_event_loop_stays_responsive():
+    print("=" * 50)
+    print("이벤트 루프 응답성 테스트")
+    print("=" * 50)
+
+    release = threading.Event()
+
+    def slow_stage():
+        # 30초짜리 크롤링/Gemini 호출을 흉내 (테스트 종료 시 바로 풀어줌)
+        release.wait(30)
+        return "done"
+
+    async def scenario():
+        ticks = []
+
+        async def heartbeat():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.05)
+
+        heartbeat_task = asyncio.create_task(heartbeat())
+        stage_task = asyncio.create_task(run_blocking(slow_stage))
+
+        await asyncio.sleep(1.0)
+        stage_running = not stage_task.done()
+
+        release.set()
+        result = await stage_task
+        heartbeat_task.cancel()
+        return ticks, stage_running, result
+
+    ticks, stage_running, result = asyncio.run(scenario())
+    max_gap = max(b - a for a, b in zip(ticks, ticks[1:]))
+
+    print(f"하트비트 횟수: {len(ticks)}")
+    print(f"최대 간격: {max_gap:.3f}초")
+
+    assert stage_running, "느린 단계가 1초 안에 끝나면 안 됩니다"
+    assert result == "done"
+    assert len(ticks) >= 10
+    assert max_gap < 0.5
+
+if __name__ == "__main__":
+    test_event_loop_stays_responsive()
@@ -0,0 +1,75 @@
+# test_prompt_builder.py - 토큰 예산 기반 프롬프트 구성 테스트
+# 본문이 문장 단위로 예산 안에서 잘리고, 고정 지침은 한 번만 만들어지며, 예시 응답 없이도 필요한 지침이 들어가는지 확인
+
+import prompt_builder
+import sub1
+from prompt_builder import PromptTemplate, estimate_tokens, trim_to_token_budget
+
+def test_trim_to_token_budget():
+    print("=" * 50)
+    print("토큰 예산 자르기 테스트")
+    print("=" * 50)
+
+    text = "첫 번째 문장입니다. 두 번째 문장입니다!\n세 번째 문장입니다? " * 40
+    trimmed = trim_to_token_budget(text, 100)
+    print(f"원문 {estimate_tokens(text)}토큰 → {estimate_tokens(trimmed)}토큰")
+    assert estimate_tokens(trimmed) <= 100
+    assert text.startswith(trimmed)
+    # 문장 끝에서 잘림
+    assert trimmed[-1] in ".!?"
+
+    # 짧은 본문은 그대로
+    assert trim_to_token_budget("짧은 본문.", 100) == "짧은 본문."
+    assert trim_to_token_budget("본문", 0) == ""
+
+    # 문장 하나가 예산보다 길면 글자 단위로 자름
+    long_sentence = "가" * 1000
+    cut = trim_to_token_budget(long_sentence, 50)
+    assert 0 < len(cut) < 1000
+    assert estimate_tokens(cut) <= 50
+
+def test_template_builds_sections_with_budget():
+    print("=" * 50)
+    print("프롬프트 템플릿 테스트")
+    print("=" * 50)
+
+    template = PromptTemplate("지침입니다.\n")
+    before = prompt_builder.prompt_stats.get_stats()
+    prompt = template.build([("URL: https://a.example\n본문:", "짧은 본문."), ("URL: https://b.example\n본문:", "긴 문장입니다. " * 200)], 30)
+    assert prompt.text.startswith("지침입니다.\n\nURL: https://a.example\n본문:\n짧은 본문.")
+    assert prompt.trimmed
+    assert prompt.text_tokens <= 60
+    assert prompt.prompt_tokens > prompt.prefix_tokens
+
+    prompt.report("테스트")
+    after = prompt_builder.prompt_stats.get_stats()
+    assert after["calls"] == before["calls"] + 1
+    assert after["trimmed"] == before["trimmed"] + 1
+
+def test_notion_prompt_prefix_is_shared():
+    print("=" * 50)
+    print("Notion 프롬프트 고정 지침 테스트")
+    print("=" * 50)
+
+    assert sub1.notion_prompt_template("json") is sub1.notion_prompt_template("json")
+    assert sub1.notion_prompt_template("json", batch=True) is not sub1.notion_prompt_template("json")
+
+    for mode in ("json", "text"):
+        text = "이 도구는 문서를 요약합니다. " * 2000
+        single = sub1.build_notion_prompt(text, "https://tool.example", mode=mode)
+        batch = sub1.build_notion_batch_prompt([("https://tool.example", text)] * 3, mode=mode)
+        print(f"{mode}: 단건 약 {single.prompt_tokens}토큰, 일괄(3개) 약 {batch.prompt_tokens}토큰")
+
+        # 페이지와 상관없는 부분은 모두 같은 접두부
+        prefix = sub1.notion_prompt_template(mode).prefix
+        assert single.text.startswith(prefix)
+        assert "https://tool.example" not in prefix
+        assert "예시 (참고용)" not in prefix
+        assert single.text_tokens <= sub1.GEMINI_TEXT_TOKEN_BUDGET
+        assert batch.text_tokens <= sub1.GEMINI_BATCH_TEXT_TOKENS * 3
+        assert "=== 사이트 3 ===" in batch.text
+
+if __name__ == "__main__":
+    test_trim_to_token_budget()
+    test_template_builds_sections_with_budget()
+    test_notion_prompt_prefix_is_shared()
@@ -0,0 +1,125 @@
+# test_rate_limit.py - 업스트림별 요청 한도 스케줄러 테스트
+# 한도를 넘는 요청은 순서대로 간격이 벌어지고, 키별 한도는 서로 독립이며, 429를 받으면 Retry-After만큼 멈췄다가 다시 보내는지 확인
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import rate_limit
+from http_client import run_sync
+from rate_limit import RateLimiter, parse_retry_after
+
+class RateLimitedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    requests = []
+
+    def do_GET(self):
+        RateLimitedHandler.requests.append(time.monotonic())
+        body = b'{"ok": true}'
+        if len(RateLimitedHandler.requests) == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0.3")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class QuotaError(Exception):
+    code = 429
+
+def test_bucket_spaces_out_bursts():
+    print("=" * 50)
+    print("토큰 버킷 테스트")
+    print("=" * 50)
+
+    limiter = RateLimiter({
+        "api": {"per_key": [(5, 1)], "backoff": 1.0},
+        "llm": {"per_key": [(100, 60)], "tokens": (1000, 60)},
+    })
+    waits = [limiter.reserve("api", "base1") for _ in range(10)]
+    print(f"대기 시간: {[round(wait, 2) for wait in waits]}")
+    # 처음 5개는 바로, 그다음부터는 0.2초 간격
+    assert waits[:5] == [0.0] * 5
+    assert 0.15 < waits[5] < 0.25
+    assert 0.95 < waits[9] < 1.05
+    # 다른 키(베이스)는 따로 계산
+    assert limiter.reserve("api", "base2") == 0.0
+
+    # 요청 수는 여유가 있어도 토큰 한도를 넘으면 기다림
+    assert limiter.reserve("llm", "key", tokens=900) == 0.0
+    assert limiter.reserve("llm", "key", tokens=600) > 25
+
+    # 429 백오프: Retry-After가 없으면 기본값에서 두 배씩
+    assert limiter.backoff("api", "base2", attempt=1) == 2.0
+    assert limiter.reserve("api", "base2") >= 1.9
+
+    stats = limiter.get_stats()
+    assert stats["api"]["requests"] == 12
+    assert stats["api"]["waits"] == 6
+    assert stats["api"]["backoffs"] == 1
+
+def test_limited_request_retries_after_429():
+    print("=" * 50)
+    print("429 재시도 테스트")
+    print("=" * 50)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RateLimitedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    original = rate_limit._limiter
+    rate_limit._limiter = RateLimiter()
+    RateLimitedHandler.requests = []
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/v0/base/table"
+        response = run_sync(rate_limit.limited_request("airtable", "base", "GET", url))
+        assert response.status_code == 200
+        assert len(RateLimitedHandler.requests) == 2
+        assert RateLimitedHandler.requests[1] - RateLimitedHandler.requests[0] >= 0.3
+
+        stats = rate_limit.get_rate_limiter().get_stats()["airtable"]
+        print(f"통계: {stats}")
+        assert stats["requests"] == 2
+        assert stats["backoffs"] == 1
+    finally:
+        rate_limit._limiter = original
+        server.shutdown()
+
+def test_call_with_limit_retries_quota_errors():
+    print("=" * 50)
+    print("라이브러리 한도 초과 예외 테스트")
+    print("=" * 50)
+
+    original = rate_limit._limiter
+    rate_limit._limiter = RateLimiter({"tts": {"shared": [(100, 1)], "backoff": 0.05}})
+    calls = []
+
+    def synthesize():
+        calls.append(1)
+        if len(calls) < 3:
+            raise QuotaError("quota exceeded")
+        return "audio"
+
+    try:
+        assert rate_limit.call_with_limit("tts", None, synthesize) == "audio"
+        assert len(calls) == 3
+        # 한도 초과가 아닌 예외는 바로 올림
+        try:
+            rate_limit.call_with_limit("tts", None, lambda: 1 / 0)
+            assert False
+        except ZeroDivisionError:
+            pass
+    finally:
+        rate_limit._limiter = original
+
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+if __name__ == "__main__":
+    test_bucket_spaces_out_bursts()
+    test_limited_request_retries_after_429()
+    test_call_with_limit_retries_quota_errors()
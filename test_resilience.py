@@ -0,0 +1,183 @@
+# test_resilience.py - 재시도 정책과 서킷 브레이커 테스트
+# 일시적 오류는 백오프 후 재시도하고, 멱등이 아닌 호출은 요청이 나가지 않았을 때만 재시도하며,
+# Gemini가 계속 실패하면 기본값을 저장하지 않고 SummaryUnavailable을 내고 서킷이 열린 뒤에는 바로 실패하는지 확인
+
+import asyncio
+import time
+import aiohttp
+import google.ai.generativelanguage as glm
+from google.api_core import exceptions as google_exceptions
+import gemini_client
+import resilience
+import sub1
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, call_with_retry
+
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+
+class FlakyClient:
+    """처음 failures번은 503, 그다음부터 정상 응답"""
+    failures = 0
+    calls = 0
+
+    def __init__(self, api_key):
+        pass
+
+    def generate_content(self, request, timeout=None):
+        FlakyClient.calls += 1
+        if FlakyClient.calls <= FlakyClient.failures:
+            raise google_exceptions.ServiceUnavailable("backend unavailable")
+        text = "사이트 이름: Stub Tool\nURL: https://stub.example\n평가/효용성: 높음\n요약 설명: 스텁 응답"
+        return glm.GenerateContentResponse(candidates=[{"content": {"parts": [{"text": text}]}}])
+
+def test_retry_policy():
+    print("=" * 50)
+    print("재시도 정책 테스트")
+    print("=" * 50)
+
+    policy = RetryPolicy(max_attempts=5, base_delay=1, max_delay=4)
+    delays = [policy.delay(attempt) for attempt in range(5) for _ in range(20)]
+    assert all(0 <= delay <= 4 for delay in delays)
+    # 지터 - 같은 시도 횟수라도 대기 시간이 다름
+    assert len(set(delays[40:60])) > 1
+
+    calls = []
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionResetError("reset by peer")
+        return "ok"
+    assert call_with_retry("test-flaky", flaky, policy=FAST_RETRY, use_breaker=False) == "ok"
+    assert len(calls) == 3
+
+    # 일시적 오류가 아니면 바로 올림
+    calls.clear()
+    try:
+        call_with_retry("test-flaky", lambda: calls.append(1) or 1 / 0, policy=FAST_RETRY, use_breaker=False)
+        assert False
+    except ZeroDivisionError:
+        assert len(calls) == 1
+
+    # 멱등이 아닌 호출: 5xx는 재시도하지 않고, 연결 자체가 실패했을 때만 재시도
+    calls.clear()
+    def server_error():
+        calls.append(1)
+        raise google_exceptions.InternalServerError("boom")
+    try:
+        call_with_retry("test-create", server_error, idempotent=False, policy=FAST_RETRY, use_breaker=False)
+        assert False
+    except google_exceptions.InternalServerError:
+        assert len(calls) == 1
+    assert resilience.is_unsent(aiohttp.ClientConnectorError(None, OSError("refused")))
+
+def test_circuit_breaker_opens_and_recovers():
+    print("=" * 50)
+    print("서킷 브레이커 테스트")
+    print("=" * 50)
+
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.1)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record(TimeoutError())
+    assert breaker.state == "open"
+    try:
+        breaker.before_call()
+        assert False
+    except CircuitOpenError as e:
+        print(f"거절: {e}")
+
+    # 시간이 지나면 시험 호출 하나만 통과
+    time.sleep(0.12)
+    breaker.before_call()
+    try:
+        breaker.before_call()
+        assert False
+    except CircuitOpenError:
+        pass
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+    # 4xx 같은 오류는 실패로 세지 않음
+    breaker.before_call()
+    breaker.record(ValueError("bad request"))
+    assert breaker.failures == 0
+    print(f"통계: {breaker.get_stats()}")
+
+def test_gemini_outage_defers_instead_of_placeholder():
+    print("=" * 50)
+    print("Gemini 장애 처리 테스트")
+    print("=" * 50)
+
+    original = (gemini_client._make_client, gemini_client._registry, resilience.DEFAULT_RETRY, resilience._breakers)
+    gemini_client._make_client = FlakyClient
+    gemini_client._registry = None
+    resilience.DEFAULT_RETRY = FAST_RETRY
+    resilience._breakers = {}
+    try:
+        # 일시적 오류 두 번 후 성공
+        FlakyClient.failures, FlakyClient.calls = 2, 0
+        fields = sub1.gemini_extract_notion_fields("본문", "https://stub.example", "key", use_cache=False)
+        assert fields["사이트 이름"] == "Stub Tool"
+        assert FlakyClient.calls == 3
+
+        # 계속 실패하면 기본값 대신 SummaryUnavailable
+        FlakyClient.failures, FlakyClient.calls = 100, 0
+        for _ in range(2):
+            try:
+                sub1.gemini_extract_notion_fields("본문", "https://stub.example", "key", use_cache=False)
+                assert False
+            except sub1.SummaryUnavailable as e:
+                print(f"보류: {e}")
+        # 연속 실패 5회에서 서킷이 열려 두 번째 요청은 3회를 다 쓰지 못함
+        assert FlakyClient.calls == 5
+        assert resilience.get_circuit_breaker("gemini").state == "open"
+
+        # 서킷이 열린 동안에는 Gemini를 부르지 않고 바로 실패
+        start = time.monotonic()
+        try:
+            sub1.gemini_extract_notion_fields_batch([("https://a.example", "본문 A"), ("https://b.example", "본문 B")], "key", use_cache=False)
+            assert False
+        except sub1.SummaryUnavailable:
+            pass
+        assert FlakyClient.calls == 5
+        assert time.monotonic() - start < 0.5
+    finally:
+        gemini_client._make_client, gemini_client._registry, resilience.DEFAULT_RETRY, resilience._breakers = original
+
+def test_cancelled_probe_releases_circuit():
+    print("=" * 50)
+    print("시험 호출 취소 테스트")
+    print("=" * 50)
+
+    breaker = CircuitBreaker("test-cancel", failure_threshold=1, reset_seconds=0.05)
+    original = resilience._breakers
+    resilience._breakers = {"test-cancel": breaker}
+    try:
+        breaker.before_call()
+        breaker.record(TimeoutError())
+        time.sleep(0.06)
+
+        async def scenario():
+            # 반쯤 열린 상태의 시험 호출이 도중에 취소됨
+            probe = asyncio.create_task(resilience.call_with_retry_async("test-cancel", lambda: asyncio.sleep(10)))
+            await asyncio.sleep(0.01)
+            probe.cancel()
+            try:
+                await probe
+            except asyncio.CancelledError:
+                pass
+
+            async def ok():
+                return "ok"
+            return await resilience.call_with_retry_async("test-cancel", ok)
+
+        # 취소된 시험 호출 때문에 계속 거절하지 않고 다음 호출이 시험 호출이 됨
+        assert asyncio.run(scenario()) == "ok"
+        assert breaker.state == "closed" and not breaker.probing
+    finally:
+        resilience._breakers = original
+
+if __name__ == "__main__":
+    test_retry_policy()
+    test_circuit_breaker_opens_and_recovers()
+    test_cancelled_probe_releases_circuit()
+    test_gemini_outage_defers_instead_of_placeholder()
@@ -0,0 +1,67 @@
+# test_sheet_status.py - 시트 상태 버퍼 쓰기 테스트
+# 같은 행의 여러 변경은 마지막 값 하나로 합쳐지고, 행 수·시간 기준으로 batch_update 한 번에 쓰며,
+# 쓰기가 실패하면 변경을 잃지 않고 다음에 다시 쓰는지 확인
+
+import time
+from sheet_status import SheetStatusWriter
+
+class RecordingSheet:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def batch_update(self, data):
+        if self.fail:
+            raise ValueError("sheet unavailable")
+        self.calls.append(data)
+
+def test_coalesce_and_thresholds():
+    print("=" * 50)
+    print("시트 상태 모아 쓰기 테스트")
+    print("=" * 50)
+
+    sheet = RecordingSheet()
+    writer = SheetStatusWriter(sheet, flush_rows=3, flush_seconds=60)
+    writer.set(5, "처리중")
+    writer.set(5, "완료")
+    writer.set(2, "중복")
+    assert sheet.calls == []
+
+    # 세 번째 행이 예약되면 바로 한 번에 씀 (같은 행은 마지막 값만, 행 순서대로)
+    writer.set(9, "실패")
+    assert sheet.calls == [[
+        {"range": "B2", "values": [["중복"]]},
+        {"range": "B5", "values": [["완료"]]},
+        {"range": "B9", "values": [["실패"]]},
+    ]]
+
+    # 실패하면 남겨 두었다가 다음에 (그 사이 바뀐 값이 우선)
+    sheet.fail = True
+    writer.set(3, "처리중")
+    assert writer.flush() == 0
+    writer.set(3, "완료")
+    sheet.fail = False
+    writer.close()
+    assert sheet.calls[-1] == [{"range": "B3", "values": [["완료"]]}]
+
+    stats = writer.get_stats()
+    print(f"통계: {stats}")
+    assert stats["updates"] == 6 and stats["writes"] == 2 and stats["errors"] == 1 and stats["pending"] == 0
+
+def test_timer_flush():
+    print("=" * 50)
+    print("시트 상태 시간 기준 쓰기 테스트")
+    print("=" * 50)
+
+    sheet = RecordingSheet()
+    writer = SheetStatusWriter(sheet, flush_rows=100, flush_seconds=0.05)
+    writer.set(4, "완료")
+    deadline = time.monotonic() + 2
+    while not sheet.calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sheet.calls == [[{"range": "B4", "values": [["완료"]]}]]
+    writer.close()
+
+if __name__ == "__main__":
+    test_coalesce_and_thresholds()
+    test_timer_flush()
@@ -0,0 +1,210 @@
+# test_streaming_fetch.py - 스트리밍 다운로드 테스트
+# 거대한 페이지는 상한에서 멈추고, HTML이 아닌 응답은 본문을 읽지 않으며, 본문이 충분히 모이면 조기 종료하는지 확인
+# 재시도 후에도 5xx인 페이지는 빈 본문 대신 PageUnavailable로 미루는지 확인
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import resilience
+import sub1
+from http_client import async_stream_text, close_async_session, UnsupportedContentType
+from text_extract import VisibleTextCounter
+
+HUGE_SIZE = 20 * 1024 * 1024
+PARAGRAPH = "<p>" + "본문 문장입니다. " * 20 + "</p>\n"
+KOREAN_PAGE = '<html><head><meta charset="euc-kr"><title>한글 도구</title></head><body><p>인코딩 테스트 페이지의 본문입니다.</p></body></html>'
+
+class StreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _stream(self, content_type, total, piece):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(total))
+        self.end_headers()
+        sent = 0
+        try:
+            while sent < total:
+                data = piece[:total - sent]
+                self.wfile.write(data)
+                sent += len(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        if self.path == "/huge":
+            # 본문 텍스트가 없는 거대한 HTML (스크립트 덩어리)
+            head = b"<html><head><title>Huge</title></head><body><script>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(HUGE_SIZE))
+            self.end_headers()
+            try:
+                self.wfile.write(head)
+                filler = b"x" * 65536
+                sent = len(head)
+                while sent < HUGE_SIZE:
+                    data = filler[:HUGE_SIZE - sent]
+                    self.wfile.write(data)
+                    sent += len(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        elif self.path == "/report.pdf":
+            self._stream("application/pdf", HUGE_SIZE, b"%PDF" * 16384)
+        elif self.path == "/long":
+            body = ("<html><head><title>Long</title></head><body>" + PARAGRAPH * 5000 + "</body></html>").encode()
+            self._stream("text/html; charset=utf-8", len(body), body)
+        elif self.path == "/euckr":
+            body = KOREAN_PAGE.encode("euc-kr")
+            self._stream("text/html", len(body), body)
+        elif self.path in ("/down", "/missing"):
+            self.send_response(503 if self.path == "/down" else 404)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def test_visible_text_counter_skips_tags_and_scripts():
+    print("=" * 50)
+    print("본문 글자 수 카운터 테스트")
+    print("=" * 50)
+
+    counter = VisibleTextCounter()
+    for piece in ['<html><scr', 'ipt>var x = "<p>aaaa</p>";</scr', 'ipt><p>hello wo', 'rld</p><sty', 'le>p {}</style>ok']:
+        counter.feed(piece)
+    # hello + world + ok
+    assert counter.chars == 12
+
+def test_huge_page_is_capped():
+    print("=" * 50)
+    print("다운로드 상한 테스트")
+    print("=" * 50)
+
+    server, base = start_server()
+    try:
+        async def scenario():
+            response = await async_stream_text(f"{base}/huge", max_bytes=256 * 1024, allowed_types=sub1.HTML_CONTENT_TYPES)
+            await close_async_session()
+            return response
+
+        response = asyncio.run(scenario())
+        print(f"읽은 바이트: {response.bytes_read:,}")
+        assert response.truncated
+        assert response.bytes_read == 256 * 1024
+        assert len(response.text) == 256 * 1024
+    finally:
+        server.shutdown()
+
+def test_non_html_is_rejected_before_body():
+    print("=" * 50)
+    print("HTML이 아닌 응답 테스트")
+    print("=" * 50)
+
+    server, base = start_server()
+    try:
+        async def scenario():
+            try:
+                await async_stream_text(f"{base}/report.pdf", allowed_types=sub1.HTML_CONTENT_TYPES)
+                rejected = None
+            except UnsupportedContentType as e:
+                rejected = str(e)
+            text = await sub1.extract_text_from_url_async(f"{base}/report.pdf", use_cache=False)
+            await close_async_session()
+            return rejected, text
+
+        rejected, text = asyncio.run(scenario())
+        assert rejected == "application/pdf"
+        assert text == ""
+    finally:
+        server.shutdown()
+
+def test_download_stops_when_enough_text():
+    print("=" * 50)
+    print("본문 충분 시 조기 종료 테스트")
+    print("=" * 50)
+
+    server, base = start_server()
+    original_target = sub1.CRAWL_TEXT_TARGET_CHARS
+    sub1.CRAWL_TEXT_TARGET_CHARS = 10000
+    try:
+        async def scenario():
+            counter = VisibleTextCounter()
+            response = await async_stream_text(
+                f"{base}/long", chunk_size=16 * 1024,
+                should_stop=lambda chunk: counter.feed(chunk) >= sub1.CRAWL_TEXT_TARGET_CHARS
+            )
+            text = await sub1.extract_text_from_url_async(f"{base}/long", use_cache=False)
+            await close_async_session()
+            return response, text
+
+        response, text = asyncio.run(scenario())
+        full_size = len(("<html><head><title>Long</title></head><body>" + PARAGRAPH * 5000 + "</body></html>").encode())
+        print(f"읽은 바이트: {response.bytes_read:,} / {full_size:,}")
+        assert response.truncated
+        assert response.bytes_read < full_size // 10
+        assert text.startswith("Long")
+        assert len(text) >= 8000
+    finally:
+        sub1.CRAWL_TEXT_TARGET_CHARS = original_target
+        server.shutdown()
+
+def test_meta_charset_is_used():
+    print("=" * 50)
+    print("<meta charset> 디코딩 테스트")
+    print("=" * 50)
+
+    server, base = start_server()
+    try:
+        async def scenario():
+            text = await sub1.extract_text_from_url_async(f"{base}/euckr", use_cache=False)
+            await close_async_session()
+            return text
+
+        text = asyncio.run(scenario())
+        assert text.startswith("한글 도구")
+        assert "인코딩 테스트 페이지의 본문입니다." in text
+    finally:
+        server.shutdown()
+
+def test_server_error_defers_instead_of_empty_text():
+    print("=" * 50)
+    print("다운로드 일시 장애 테스트")
+    print("=" * 50)
+
+    server, base = start_server()
+    original = resilience.DEFAULT_RETRY
+    resilience.DEFAULT_RETRY = resilience.RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.02)
+    try:
+        async def scenario():
+            try:
+                await sub1.extract_text_from_url_async(f"{base}/down", use_cache=False)
+                deferred = None
+            except sub1.SummaryUnavailable as e:
+                deferred = e
+            missing = await sub1.extract_text_from_url_async(f"{base}/missing", use_cache=False)
+            await close_async_session()
+            return deferred, missing
+
+        deferred, missing = asyncio.run(scenario())
+        # 5xx는 나중에 다시 처리, 404는 빈 본문
+        assert isinstance(deferred, sub1.PageUnavailable)
+        assert missing == ""
+    finally:
+        resilience.DEFAULT_RETRY = original
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_visible_text_counter_skips_tags_and_scripts()
+    test_huge_page_is_capped()
+    test_non_html_is_rejected_before_body()
+    test_download_stops_when_enough_text()
+    test_meta_charset_is_used()
+    test_server_error_defers_instead_of_empty_text()
@@ -0,0 +1,101 @@
+# test_summary_cache.py - Gemini 요약 캐시 테스트
+# 같은 본문은 URL이 달라도 Gemini를 다시 부르지 않고, 프롬프트 버전/모델이 바뀌면 새로 요약하며,
+# 검증을 통과하지 못한 응답은 캐시하지 않는지 확인
+
+import os
+import tempfile
+import google.ai.generativelanguage as glm
+import gemini_client
+import sub1
+from summary_cache import SummaryCache
+
+RESPONSE_TEXT = "사이트 이름: Stub Tool\nURL: https://stub.example\n평가/효용성: 높음\n요약 설명: 스텁 응답"
+
+class CountingClient:
+    calls = 0
+    response_text = RESPONSE_TEXT
+
+    def __init__(self, api_key):
+        pass
+
+    def generate_content(self, request, timeout=None):
+        CountingClient.calls += 1
+        return glm.GenerateContentResponse(candidates=[{"content": {"parts": [{"text": CountingClient.response_text}]}}])
+
+def test_summary_cache_skips_repeat_calls():
+    print("=" * 50)
+    print("요약 캐시 테스트")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SummaryCache(os.path.join(tmp, "summary.db"))
+        original = (gemini_client._make_client, gemini_client._registry, sub1.get_summary_cache)
+        gemini_client._make_client = CountingClient
+        gemini_client._registry = None
+        sub1.get_summary_cache = lambda: cache
+        CountingClient.calls = 0
+        try:
+            text = "Stub Tool은 테스트용 도구입니다. " * 20
+            first = sub1.gemini_extract_notion_fields(text, "https://stub.example", "key")
+            mirror = sub1.gemini_extract_notion_fields(text, "https://mirror.stub.example/?utm_source=x", "key")
+            assert CountingClient.calls == 1
+            assert mirror["사이트 이름"] == first["사이트 이름"] == "Stub Tool"
+            assert mirror["URL"] == "https://mirror.stub.example/?utm_source=x"
+
+            # 본문이 다르거나, 캐시를 끄거나, 본문이 비어 있으면 새로 요약
+            sub1.gemini_extract_notion_fields(text + " 추가", "https://stub.example", "key")
+            sub1.gemini_extract_notion_fields(text, "https://stub.example", "key", use_cache=False)
+            sub1.gemini_extract_notion_fields("", "https://stub.example", "key")
+            sub1.gemini_extract_notion_fields("", "https://stub.example", "key")
+            assert CountingClient.calls == 5
+
+            # 프롬프트 버전이 바뀌면 이전 결과를 쓰지 않음
+            assert cache.get(text, sub1.summary_version(), gemini_client.GEMINI_MODEL) is not None
+            assert cache.get(text, sub1.summary_version() + "-next", gemini_client.GEMINI_MODEL) is None
+            assert cache.get(text, sub1.summary_version(), "gemini-1.5-flash") is None
+
+            stats = cache.get_stats()
+            print(f"통계: {stats}")
+            assert stats["hits"] == 2
+            assert stats["misses"] == 4
+            assert stats["entries"] == 2
+
+            # 형식이 잘못된 응답(사이트 이름 없음)은 캐시하지 않고 다음에 다시 요약
+            CountingClient.response_text = "사이트 이름: \n평가/효용성: 최고"
+            broken = "깨진 응답을 받는 본문입니다. " * 20
+            sub1.gemini_extract_notion_fields(broken, "https://stub.example", "key")
+            sub1.gemini_extract_notion_fields(broken, "https://stub.example", "key")
+            assert CountingClient.calls == 7
+            assert cache.get_stats()["entries"] == 2
+        finally:
+            CountingClient.response_text = RESPONSE_TEXT
+            gemini_client._make_client, gemini_client._registry, sub1.get_summary_cache = original
+            cache.close()
+
+def test_summary_cache_eviction():
+    print("=" * 50)
+    print("요약 캐시 정리 테스트")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SummaryCache(os.path.join(tmp, "summary.db"), max_entries=3)
+        try:
+            for i in range(5):
+                cache.put(f"본문 {i}", "1", "model", {"사이트 이름": f"사이트 {i}"})
+            stats = cache.get_stats()
+            assert stats["entries"] == 3
+            assert stats["evicted"] == 2
+            # 먼저 넣은 항목부터 삭제됨
+            assert cache.get("본문 0", "1", "model") is None
+            assert cache.get("본문 4", "1", "model") == {"사이트 이름": "사이트 4"}
+
+            expired = SummaryCache(os.path.join(tmp, "summary.db"), max_age_days=0)
+            expired.evict()
+            assert expired.get_stats()["entries"] == 0
+            expired.close()
+        finally:
+            cache.close()
+
+if __name__ == "__main__":
+    test_summary_cache_skips_repeat_calls()
+    test_summary_cache_eviction()
@@ -0,0 +1,74 @@
+# test_text_extract.py - 본문 추출 테스트
+
+from text_extract import extract_main_text
+
+PAGE = """
+<html>
+<head><title>Glasp</title><meta name="description" content="Social web highlighter"></head>
+<body>
+  <header><nav><a href="/">Home</a><a href="/pricing">Pricing</a></nav></header>
+  <div class="wrapper"><div class="inner"><div class="content">
+    <h1>Highlight the web</h1>
+    <p>Glasp lets you highlight and take notes on any web page while you browse.</p>
+    <div><div><p>Your highlights are organized and can be exported to Notion or Obsidian.</p></div></div>
+  </div></div></div>
+  <div class="related"><a href="/a">Related article one</a> <a href="/b">Related article two</a> <a href="/c">Related three</a></div>
+  <div class="cookie-banner">We use cookies to improve your experience on this website.</div>
+  <script>var tracking = "should never appear in the output text";</script>
+  <style>.x { color: red; }</style>
+  <footer>Copyright 2025 Glasp Inc. All rights reserved worldwide.</footer>
+</body>
+</html>
+"""
+
+def test_nested_text_is_emitted_once():
+    print("=" * 50)
+    print("본문 추출 테스트")
+    print("=" * 50)
+
+    text = extract_main_text(PAGE)
+    print(text)
+
+    assert text.startswith("Glasp\nSocial web highlighter\n\n")
+    assert "Highlight the web" in text
+    # 중첩 div 안의 문장도 한 번만 나와야 함
+    assert text.count("Your highlights are organized") == 1
+    assert text.count("Glasp lets you highlight") == 1
+
+def test_boilerplate_is_dropped():
+    text = extract_main_text(PAGE)
+    for noise in ["Pricing", "should never appear", "color: red", "Copyright", "cookies", "Related article"]:
+        assert noise not in text, noise
+
+HERO_PAGE = """
+<html><body>
+  <header class="site-header"><a href="/">Acme</a> <a href="/docs">Docs</a> <a href="/login">Sign in</a></header>
+  <header><h1>Hero Product Tagline</h1><p>We build the fastest database for teams that ship every day.</p></header>
+  <main><p>Queries run in milliseconds even on billions of rows, with no tuning required.</p></main>
+  <footer>Copyright 2025 Acme Inc. All rights reserved worldwide.</footer>
+</body></html>
+"""
+
+def test_hero_header_is_kept():
+    text = extract_main_text(HERO_PAGE)
+    # 히어로 <header>의 제목과 소개 문구는 본문
+    assert "Hero Product Tagline" in text
+    assert "We build the fastest database" in text
+    assert "Queries run in milliseconds" in text
+    # 사이트 상단 바와 footer는 여전히 버림
+    for noise in ["Sign in", "Docs", "Copyright"]:
+        assert noise not in text, noise
+
+def test_html_parser_and_default_parser_agree():
+    assert extract_main_text(PAGE, 'html.parser') == extract_main_text(PAGE)
+
+def test_falls_back_to_short_text_when_nothing_scores():
+    text = extract_main_text("<html><body><div>Tiny page</div></body></html>")
+    assert text == "Tiny page"
+
+if __name__ == "__main__":
+    test_nested_text_is_emitted_once()
+    test_boilerplate_is_dropped()
+    test_hero_header_is_kept()
+    test_html_parser_and_default_parser_agree()
+    test_falls_back_to_short_text_when_nothing_scores()
@@ -0,0 +1,83 @@
+# test_tts_synth.py - 분할 병렬 TTS 합성 테스트
+# 스크립트를 문장 경계에서 한도 이하 조각으로 나누고, 가짜 TTS 백엔드로
+# 조각이 동시에 합성되면서도 스크립트 순서대로 이어 붙는지 확인
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import tts_synth
+
+SENTENCES = [f"Sentence number {index} explains one more feature of the tool." for index in range(40)]
+SCRIPT = " ".join(SENTENCES)
+
+class FakeTTS:
+    """조각마다 delay초 걸리고, 조각 텍스트를 그대로 오디오 바이트로 돌려주는 백엔드"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    def synthesize(self, text):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            return f"[{text}]".encode('utf-8')
+        finally:
+            with self.lock:
+                self.active -= 1
+
+def test_split_at_sentence_boundaries():
+    print("=" * 50)
+    print("스크립트 분할 테스트")
+    print("=" * 50)
+
+    chunks = tts_synth.split_script(SCRIPT, max_bytes=300)
+    print(f"조각 {len(chunks)}개, 최대 {max(len(chunk.encode('utf-8')) for chunk in chunks)}바이트")
+    assert len(chunks) > 1
+    assert all(len(chunk.encode('utf-8')) <= 300 for chunk in chunks)
+    # 문장이 잘리지 않고 순서대로 모두 들어 있음
+    assert " ".join(chunks) == SCRIPT
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+    # 한도보다 긴 문장은 단어 경계에서, 한도보다 긴 단어는 글자 단위로
+    long_sentence = "word " * 30 + "x" * 50 + "."
+    pieces = tts_synth.split_script(long_sentence, max_bytes=40)
+    assert all(len(piece.encode('utf-8')) <= 40 for piece in pieces)
+    assert "".join(pieces).replace(" ", "") == long_sentence.replace(" ", "")
+
+    # 짧은 스크립트는 한 조각
+    assert tts_synth.split_script("Hello there.") == ["Hello there."]
+
+def test_chunks_synthesized_concurrently_in_order():
+    print("=" * 50)
+    print("조각 동시 합성 테스트")
+    print("=" * 50)
+
+    fake = FakeTTS(delay=0.1)
+    executor = ThreadPoolExecutor(max_workers=4)
+    try:
+        chunks = tts_synth.split_script(SCRIPT, max_bytes=300)
+        start = time.perf_counter()
+        audio = tts_synth.synthesize_script(SCRIPT, fake.synthesize, max_bytes=300, executor=executor)
+        elapsed = time.perf_counter() - start
+    finally:
+        executor.shutdown()
+
+    print(f"조각 {len(chunks)}개, 소요 {elapsed:.2f}초 (순차 {len(chunks) * 0.1:.2f}초), 동시 {fake.max_active}개")
+    assert audio == b"".join(f"[{chunk}]".encode('utf-8') for chunk in chunks)
+    assert fake.calls == len(chunks) and fake.max_active == 4
+    # 4개씩 동시에 처리하므로 순차 합성 시간보다 훨씬 짧음
+    assert elapsed < len(chunks) * 0.1 / 2
+
+    # 한 조각짜리 스크립트는 스레드 풀 없이 바로 합성
+    assert tts_synth.synthesize_script("Hello there.", fake.synthesize) == b"[Hello there.]"
+
+if __name__ == "__main__":
+    test_split_at_sentence_boundaries()
+    test_chunks_synthesized_concurrently_in_order()
@@ -0,0 +1,102 @@
+# test_url_index.py - 로컬 URL 인덱스 테스트 (Airtable 호출은 가짜 함수로 대체)
+
+import os
+import sqlite3
+import tempfile
+import time
+import url_index
+from url_index import UrlIndex
+
+BASE_ID = "appTEST"
+TABLE_NAME = "tools"
+
+def fake_records(count):
+    return [
+        {"id": f"rec{i}", "fields": {"URL": f"https://www.site{i}.com/", "사이트 이름": f"Site {i}"}}
+        for i in range(count)
+    ]
+
+def test_warm_once_and_lookup():
+    print("=" * 50)
+    print("URL 인덱스 워밍 / 조회 테스트")
+    print("=" * 50)
+
+    calls = []
+
+    def fake_fetch(api_key, base_id, table_name, fields=None):
+        calls.append((base_id, table_name))
+        return {"success": True, "records": fake_records(250), "error": None}
+
+    original_fetch = url_index.fetch_all_airtable_records
+    url_index.fetch_all_airtable_records = fake_fetch
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.db")
+            index = UrlIndex(path)
+
+            assert index.warm_from_airtable("key", BASE_ID, TABLE_NAME)
+            assert index.warm_from_airtable("key", BASE_ID, TABLE_NAME)
+            print(f"Airtable 전체 조회 횟수: {len(calls)}")
+            assert len(calls) == 1
+            assert index.count(BASE_ID, TABLE_NAME) == 250
+
+            # 100개 이후 레코드도 (페이지네이션) 중복으로 잡혀야 함
+            found = index.lookup(BASE_ID, TABLE_NAME, "http://site200.com")
+            assert found["record_id"] == "rec200"
+            assert index.lookup(BASE_ID, TABLE_NAME, "https://new-site.com") is None
+
+            # 새 레코드 추가 후 다른 인스턴스(재시작)에서도 유지되는지
+            index.add(BASE_ID, TABLE_NAME, "https://new-site.com", "recNEW", "New Site")
+            index.close()
+
+            reopened = UrlIndex(path)
+            assert reopened.is_warm(BASE_ID, TABLE_NAME)
+            assert reopened.lookup(BASE_ID, TABLE_NAME, "https://www.new-site.com/")["site_name"] == "New Site"
+            reopened.close()
+    finally:
+        url_index.fetch_all_airtable_records = original_fetch
+
+def test_failed_warm_is_retried():
+    print("=" * 50)
+    print("URL 인덱스 워밍 실패 테스트")
+    print("=" * 50)
+
+    def failing_fetch(api_key, base_id, table_name, fields=None):
+        return {"success": False, "records": fake_records(100), "error": "Airtable API 오류: 500"}
+
+    original_fetch = url_index.fetch_all_airtable_records
+    url_index.fetch_all_airtable_records = failing_fetch
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            index = UrlIndex(os.path.join(tmp, "index.db"))
+            assert not index.warm_from_airtable("key", BASE_ID, TABLE_NAME)
+            # 일부만 받은 결과로 인덱스를 채우지 않아야 함
+            assert not index.is_warm(BASE_ID, TABLE_NAME)
+            assert index.count(BASE_ID, TABLE_NAME) == 0
+            index.close()
+    finally:
+        url_index.fetch_all_airtable_records = original_fetch
+
+def test_old_index_file_is_upgraded():
+    print("=" * 50)
+    print("예전 URL 인덱스 파일 테스트")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.db")
+        # 정규화 버전 컬럼이 없던 예전 형식
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE warm_state (scope TEXT PRIMARY KEY, warmed_at REAL NOT NULL, record_count INTEGER NOT NULL)")
+        conn.execute("INSERT INTO warm_state VALUES (?, ?, ?)", (UrlIndex.scope(BASE_ID, TABLE_NAME), time.time(), 10))
+        conn.commit()
+        conn.close()
+
+        index = UrlIndex(path)
+        # 예전 규칙으로 만든 인덱스는 다시 워밍해야 함
+        assert not index.is_warm(BASE_ID, TABLE_NAME)
+        index.close()
+
+if __name__ == "__main__":
+    test_warm_once_and_lookup()
+    test_failed_warm_is_retried()
+    test_old_index_file_is_upgraded()
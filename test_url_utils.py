@@ -0,0 +1,45 @@
+# test_url_utils.py - URL 정규화 테스트
+
+from url_utils import canonicalize_url, canonicalize_urls, canonical_url_set
+from sub2 import normalize_url
+
+def test_equivalent_urls_share_one_key():
+    print("=" * 50)
+    print("URL 정규화 테스트")
+    print("=" * 50)
+
+    cases = [
+        ("https://glasp.co/", "glasp.co"),
+        ("http://www.glasp.co", "https://glasp.co"),
+        ("HTTPS://WWW.Glasp.CO:443/", "https://glasp.co"),
+        ("http://glasp.co:80", "https://glasp.co"),
+        ("https://glasp.co/?utm_source=x&utm_medium=y", "https://glasp.co"),
+        ("https://glasp.co/?fbclid=abc#pricing", "https://glasp.co"),
+        ("https://glasp.co/?ref=producthunt", "https://glasp.co"),
+        ("https://glasp.co//blog//", "https://glasp.co/blog"),
+        ("https://glasp.co/?b=2&a=1", "https://glasp.co/?a=1&b=2"),
+        ("https://한글.com/", "https://xn--bj0bj06e.com"),
+    ]
+
+    for left, right in cases:
+        print(f"{left}  ==  {right}")
+        print(f"  -> {canonicalize_url(left)}")
+        assert canonicalize_url(left) == canonicalize_url(right)
+
+def test_distinct_urls_stay_distinct():
+    assert canonicalize_url("https://glasp.co:8080") != canonicalize_url("https://glasp.co")
+    assert canonicalize_url("https://glasp.co/?id=1") != canonicalize_url("https://glasp.co/?id=2")
+    assert canonicalize_url("https://app.glasp.co") != canonicalize_url("https://glasp.co")
+
+def test_batch_and_legacy_helpers():
+    urls = ["https://www.a.com/", "http://a.com", "https://b.com/?utm_campaign=z", ""]
+    assert canonicalize_urls(urls) == ["https://a.com", "https://a.com", "https://b.com", ""]
+    assert canonical_url_set(urls) == {"https://a.com", "https://b.com"}
+    # 기존 sub2.normalize_url도 같은 규칙을 사용
+    assert normalize_url("http://www.a.com/") == canonicalize_url("a.com")
+    assert normalize_url("") == ""
+
+if __name__ == "__main__":
+    test_equivalent_urls_share_one_key()
+    test_distinct_urls_stay_distinct()
+    test_batch_and_legacy_helpers()
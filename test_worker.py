@@ -0,0 +1,140 @@
+# test_worker.py - 워커 프로세스와 진행 상황 보고 테스트
+# 봇이 아닌 워커가 작업을 처리해도 시작한 단계와 결과가 큐에 남아 봇이 읽어갈 수 있고(한 번 읽은 변경은 다시 나오지 않음),
+# 한 작업이 예외를 내도 같이 처리 중인 다른 작업은 끝까지 진행되고,
+# 종료된 워커가 가져간 작업은 다시 대기열로 돌아가는지 확인
+
+import asyncio
+import os
+import socket
+import tempfile
+import url_jobs
+import worker
+from job_queue import JobQueue
+from rate_limit import scaled_limits
+from test_job_queue import StubStages
+
+def test_worker_reports_progress():
+    print("=" * 50)
+    print("워커 진행 상황 보고 테스트")
+    print("=" * 50)
+
+    stubs = StubStages()
+    original = stubs.install()
+    original_check = url_jobs.simple_duplicate_check
+    url_jobs.simple_duplicate_check = lambda api_key, base_id, table_name, url: url == "https://dup.example"
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"))
+        try:
+            first = queue.enqueue("https://a.example", meta={"skip_duplicates": True})
+            duplicate = queue.enqueue("https://dup.example", meta={"skip_duplicates": True})
+            queue.enqueue("https://c.example", source="migration")
+            assert [job["id"] for job in queue.unreported("discord")] == [first, duplicate]
+            for job in queue.unreported("discord"):
+                queue.mark_reported(job)
+
+            seen = []
+            async def run():
+                stop = asyncio.Event()
+                def finished(job):
+                    seen.append(job["id"])
+                    if len(seen) == 2:
+                        stop.set()
+                await url_jobs.consume_queue(queue, "worker-1", "discord", concurrency=2, poll_seconds=0.05,
+                                             stop=stop, on_finish=finished)
+            asyncio.run(run())
+
+            assert sorted(seen) == [first, duplicate]
+            changed = {job["id"]: job for job in queue.unreported("discord")}
+            assert set(changed) == {first, duplicate}
+            assert changed[first]["status"] == "done" and changed[first]["progress"] == "notified"
+            assert changed[first]["data"]["airtable_result"]["record_id"] == "rec1"
+            assert changed[duplicate]["data"] == {"duplicate": True}
+            # 중복이면 아무 단계도 하지 않음
+            assert stubs.calls["extract_text_from_url_async"] == 1
+
+            for job in changed.values():
+                queue.mark_reported(job)
+            assert queue.unreported("discord") == []
+            assert queue.get_stats("migration")["status"] == {"pending": 1}
+        finally:
+            for name, func in original.items():
+                setattr(url_jobs, name, func)
+            url_jobs.simple_duplicate_check = original_check
+            queue.close()
+
+class FailingStages(StubStages):
+    """broken.example 페이지 추출만 예외를 내고, 나머지는 잠깐 기다렸다가 성공하는 스텁"""
+
+    async def extract_text_from_url_async(self, url):
+        if url == "https://broken.example":
+            raise RuntimeError("연결이 끊어짐")
+        await asyncio.sleep(0.05)
+        return await super().extract_text_from_url_async(url)
+
+def test_failed_job_does_not_stop_siblings():
+    print("=" * 50)
+    print("작업별 실패 격리 테스트")
+    print("=" * 50)
+
+    stubs = FailingStages()
+    original = stubs.install()
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"))
+        try:
+            broken = queue.enqueue("https://broken.example")
+            healthy = queue.enqueue("https://a.example")
+
+            seen = []
+            async def run():
+                stop = asyncio.Event()
+                def finished(job):
+                    seen.append(job["id"])
+                    if len(seen) == 2:
+                        stop.set()
+                await url_jobs.consume_queue(queue, "worker-1", concurrency=2, poll_seconds=0.05,
+                                             stop=stop, on_finish=finished)
+            asyncio.run(run())
+
+            # 실패한 작업이 먼저 끝나도 옆 작업은 취소되지 않고 알림까지 마침
+            assert seen == [broken, healthy]
+            assert queue.get(broken)["status"] == "failed"
+            assert "연결이 끊어짐" in queue.get(broken)["error"]
+            assert queue.get(healthy)["status"] == "done"
+            assert stubs.calls["send_to_telegram_async"] == 1
+            assert queue.get_stats()["status"] == {"done": 1, "failed": 1}
+        finally:
+            for name, func in original.items():
+                setattr(url_jobs, name, func)
+            queue.close()
+
+def test_requeue_dead_workers():
+    print("=" * 50)
+    print("종료된 워커 작업 회수 테스트")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"))
+        host = socket.gethostname()
+        queue.enqueue("https://a.example")
+        queue.enqueue("https://b.example")
+        queue.enqueue("https://c.example")
+        # 살아 있는 프로세스(자기 자신의 부모), 없는 프로세스, 다른 컴퓨터의 워커
+        queue.claim(f"{host}:{os.getppid()}")
+        dead = queue.claim(f"{host}:999999999")
+        queue.claim("other-host:1")
+
+        assert worker.requeue_dead_workers(queue) == 1
+        job = queue.get(dead["id"])
+        assert job["status"] == "pending" and job["worker"] is None
+        assert queue.get_stats()["status"] == {"pending": 1, "running": 2}
+        queue.close()
+
+    # 프로세스마다 전체 한도를 나눠 씀
+    limits = scaled_limits(0.5)
+    assert limits["airtable"]["per_key"][0][0] == float(os.getenv('AIRTABLE_RPS', '5')) / 2
+    assert limits["gemini"]["tokens"][1] == 60
+
+if __name__ == "__main__":
+    test_worker_reports_progress()
+    test_failed_job_does_not_stop_siblings()
+    test_requeue_dead_workers()
@@ -0,0 +1,159 @@
+# text_extract.py - 웹페이지 본문 추출
+# DOM을 한 번만 순회하면서 블록 단위로 텍스트를 모으고(중첩 div 중복 없음),
+# script/style/nav 같은 상용구를 버린 뒤 링크 비율·길이로 본문 블록만 남김
+# <header>는 히어로 영역(제목, 소개 문구)일 때가 많아 태그로는 버리지 않고, 사이트 상단 바는 class/id와 링크 비율로 거름
+
+import re
+from bs4 import BeautifulSoup, NavigableString, Comment, Doctype, Declaration, ProcessingInstruction, CData
+
+# lxml이 설치되어 있으면 더 빠른 파서 사용
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# 내용째로 버리는 태그
+BOILERPLATE_TAGS = {
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe',
+    'nav', 'footer', 'aside', 'form', 'button', 'select', 'head'
+}
+
+# 텍스트를 모으는 단위가 되는 태그
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'li', 'dd', 'dt', 'td', 'th',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'figcaption', 'body'
+}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# class / id에 이런 단어가 있으면 상용구로 간주
+BOILERPLATE_PATTERN = re.compile(r'(^|[\s_-])(nav|navbar|menu|masthead|site-header|topbar|footer|sidebar|cookie|banner|breadcrumb|share|social|popup|modal|advert|ads)($|[\s_-])', re.I)
+
+SKIPPED_STRINGS = (Comment, Doctype, Declaration, ProcessingInstruction, CData)
+
+# 본문 블록 판정 기준
+MIN_BLOCK_CHARS = 25
+MAX_LINK_DENSITY = 0.5
+
+WHITESPACE = re.compile(r'\s+')
+
+def _is_boilerplate(tag) -> bool:
+    if tag.name in BOILERPLATE_TAGS:
+        return True
+    attrs = tag.attrs
+    if not attrs:
+        return False
+    if attrs.get('aria-hidden') == 'true' or attrs.get('role') in ('navigation', 'banner', 'contentinfo'):
+        return True
+    classes = attrs.get('class')
+    if classes and BOILERPLATE_PATTERN.search(' '.join(classes)):
+        return True
+    tag_id = attrs.get('id')
+    return bool(tag_id and BOILERPLATE_PATTERN.search(tag_id))
+
+def _collect_blocks(root) -> list:
+    """DOM을 한 번 순회하며 블록별 [태그명, 텍스트 조각들, 링크 글자 수] 수집"""
+    blocks = []
+    root_block = [root.name, [], 0]
+    blocks.append(root_block)
+    stack = [(root, root_block, False)]
+
+    while stack:
+        node, block, in_link = stack.pop()
+
+        if isinstance(node, NavigableString):
+            if isinstance(node, SKIPPED_STRINGS):
+                continue
+            text = WHITESPACE.sub(' ', str(node))
+            if text.strip():
+                block[1].append(text)
+                if in_link:
+                    block[2] += len(text.strip())
+            continue
+
+        if node is not root:
+            if _is_boilerplate(node):
+                continue
+            if node.name in BLOCK_TAGS:
+                block = [node.name, [], 0]
+                blocks.append(block)
+            elif node.name == 'br':
+                block[1].append(' ')
+            if node.name == 'a':
+                in_link = True
+
+        # 자식은 역순으로 넣어야 문서 순서대로 꺼냄
+        for child in reversed(node.contents):
+            stack.append((child, block, in_link))
+
+    return blocks
+
+def extract_main_text(html: str, parser: str = None) -> str:
+    """HTML에서 제목, 설명, 본문 텍스트를 추출합니다."""
+    soup = BeautifulSoup(html, parser or HTML_PARSER)
+
+    # 메타 태그에서 제목 / 설명 추출
+    title = soup.find('title')
+    title_text = WHITESPACE.sub(' ', title.get_text()).strip() if title else ''
+    description = soup.find('meta', attrs={'name': 'description'}) or soup.find('meta', attrs={'property': 'og:description'})
+    description_text = (description.get('content') or '').strip() if description else ''
+
+    root = soup.body or soup
+    blocks = []
+    for name, parts, link_chars in _collect_blocks(root):
+        text = ''.join(parts).strip()
+        if not text:
+            continue
+        text = WHITESPACE.sub(' ', text)
+        link_density = link_chars / len(text)
+        blocks.append((name, text, link_density))
+
+    # 텍스트 밀도 기준: 충분히 길고 링크 비율이 낮은 블록(또는 제목 태그)만 본문으로 사용
+    content = [
+        text for name, text, link_density in blocks
+        if link_density <= MAX_LINK_DENSITY and (len(text) >= MIN_BLOCK_CHARS or name in HEADING_TAGS)
+    ]
+    if not content:
+        content = [text for name, text, link_density in blocks]
+
+    header = '\n'.join(part for part in (title_text, description_text) if part)
+    body = '\n'.join(content)
+    return f"{header}\n\n{body}".strip()
+
+# 스트리밍 중 대략적인 본문 글자 수 세기 (script/style 등은 제외)
+SKIPPED_RAW_TAGS = ('script', 'style', 'noscript', 'template', 'svg')
+_TAG_OR_TEXT = re.compile(r'<(/?)([a-zA-Z][\w-]*)[^>]*>|<![^>]*>|[^<]+|<', re.S)
+
+class VisibleTextCounter:
+    """
+    조각난 HTML을 순서대로 받아 태그 밖의 (공백 제외) 글자 수를 셉니다.
+    파싱 없이 정규식으로만 세는 근사치로, 다운로드를 언제 멈출지 정하는 데만 사용
+    """
+
+    def __init__(self):
+        self.pending = ''
+        self.skip_until = None
+        self.chars = 0
+
+    def feed(self, chunk: str) -> int:
+        data = self.pending + chunk
+        # 닫히지 않은 태그는 다음 조각과 합쳐서 처리
+        cut = data.rfind('<')
+        if cut != -1 and data.find('>', cut) == -1:
+            data, self.pending = data[:cut], data[cut:]
+        else:
+            self.pending = ''
+
+        for match in _TAG_OR_TEXT.finditer(data):
+            name = match.group(2)
+            if name is not None:
+                name = name.lower()
+                closing = match.group(1) == '/'
+                if self.skip_until:
+                    if closing and name == self.skip_until:
+                        self.skip_until = None
+                elif not closing and name in SKIPPED_RAW_TAGS and not match.group(0).endswith('/>'):
+                    self.skip_until = name
+            elif not self.skip_until and not match.group(0).startswith('<'):
+                self.chars += len(WHITESPACE.sub('', match.group(0)))
+        return self.chars
@@ -0,0 +1,87 @@
+# tts_synth.py - 긴 스크립트 분할 병렬 TTS 합성
+# Google TTS는 요청당 입력이 5000바이트로 제한되고, 한 번에 보내면 스크립트가 길수록 느려짐
+# 스크립트를 문장 경계에서 TTS_CHUNK_BYTES 이하 조각으로 나눠 동시에 합성한 뒤, 순서대로 메모리에서 이어 붙임 (임시 파일 없음)
+# MP3는 프레임 단위라 조각을 그대로 이어 붙여도 하나의 파일로 재생됨
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 조각당 최대 바이트 (API 한도 5000바이트보다 여유 있게)
+TTS_CHUNK_BYTES = int(os.getenv('TTS_CHUNK_BYTES', '4500'))
+# 프로세스 전체에서 동시에 합성할 조각 수 (요청 한도는 rate_limit의 tts 버킷이 따로 지킴)
+TTS_CHUNK_CONCURRENCY = int(os.getenv('TTS_CHUNK_CONCURRENCY', '4'))
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def _byte_len(text: str) -> int:
+    return len(text.encode('utf-8'))
+
+def _split_long(sentence: str, max_bytes: int) -> List[str]:
+    """한 문장이 한도를 넘으면 단어 경계에서, 단어 하나가 넘으면 글자 단위로 나눔"""
+    pieces, current = [], ""
+    for word in sentence.split():
+        while _byte_len(word) > max_bytes:
+            cut = max_bytes
+            while _byte_len(word[:cut]) > max_bytes:
+                cut -= 1
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:cut])
+            word = word[cut:]
+        candidate = f"{current} {word}" if current else word
+        if _byte_len(candidate) > max_bytes:
+            pieces.append(current)
+            candidate = word
+        current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_script(script: str, max_bytes: int = TTS_CHUNK_BYTES) -> List[str]:
+    """스크립트를 문장 경계에서 max_bytes 이하 조각으로 나눔 (문장은 가능한 한 이어서 한 조각에)"""
+    chunks, current = [], ""
+    for sentence in _SENTENCE_END.split(script.strip()):
+        if not sentence:
+            continue
+        pieces = [sentence] if _byte_len(sentence) <= max_bytes else _split_long(sentence, max_bytes)
+        for piece in pieces:
+            candidate = f"{current} {piece}" if current else piece
+            if _byte_len(candidate) > max_bytes:
+                chunks.append(current)
+                candidate = piece
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_synthesis_executor() -> ThreadPoolExecutor:
+    """조각 합성용 공용 스레드 풀 (동시에 처리하는 작업들이 TTS_CHUNK_CONCURRENCY를 나눠 씀)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=TTS_CHUNK_CONCURRENCY, thread_name_prefix="tts-chunk")
+        return _executor
+
+def synthesize_script(script: str, synthesize: Callable[[str], bytes], max_bytes: int = TTS_CHUNK_BYTES,
+                      executor: ThreadPoolExecutor = None) -> bytes:
+    """
+    조각별로 synthesize(text) -> 오디오 바이트를 동시에 호출하고 스크립트 순서대로 이어 붙인 오디오 반환
+    조각 하나라도 실패하면 그 예외가 그대로 올라감 (부분 음성은 만들지 않음)
+    """
+    chunks = split_script(script, max_bytes)
+    if len(chunks) <= 1:
+        return synthesize(chunks[0] if chunks else script)
+    print(f"🧩 스크립트를 {len(chunks)}개 조각으로 나눠 동시 합성")
+    executor = executor or get_synthesis_executor()
+    return b"".join(executor.map(synthesize, chunks))
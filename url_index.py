@@ -0,0 +1,154 @@
+# url_index.py - 중복 확인용 로컬 URL 인덱스 (SQLite)
+# Airtable 전체 레코드를 한 번만 읽어와 저장해두고, 이후 중복 확인은 로컬에서 처리
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict
+from dotenv import load_dotenv
+from sub2 import fetch_all_airtable_records
+from url_utils import canonicalize_url, canonicalize_urls, CANON_VERSION
+
+# 환경 변수 로드
+load_dotenv()
+
+URL_INDEX_PATH = os.getenv('URL_INDEX_PATH', 'url_index.db')
+# 마지막 워밍 후 이 시간이 지나면 Airtable에서 다시 읽어옴 (Airtable에서 직접 추가한 레코드 반영용)
+URL_INDEX_MAX_AGE_HOURS = float(os.getenv('URL_INDEX_MAX_AGE_HOURS', '24'))
+
+class UrlIndex:
+    def __init__(self, path: str = URL_INDEX_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                scope TEXT NOT NULL,
+                normalized_url TEXT NOT NULL,
+                url TEXT,
+                record_id TEXT,
+                site_name TEXT,
+                PRIMARY KEY (scope, normalized_url)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS warm_state (
+                scope TEXT PRIMARY KEY,
+                warmed_at REAL NOT NULL,
+                record_count INTEGER NOT NULL,
+                canon_version TEXT
+            )
+        """)
+        # 정규화 버전 컬럼이 없던 예전 파일 (NULL이면 버전이 다르므로 다시 워밍됨)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(warm_state)")}
+        if "canon_version" not in columns:
+            self.conn.execute("ALTER TABLE warm_state ADD COLUMN canon_version TEXT")
+        self.conn.commit()
+
+    @staticmethod
+    def scope(base_id: str, table_name: str) -> str:
+        return f"{base_id}/{table_name}"
+
+    def lookup(self, base_id: str, table_name: str, url: str) -> Optional[Dict]:
+        """정규화된 URL로 기존 레코드 조회 (없으면 None)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, record_id, site_name FROM urls WHERE scope = ? AND normalized_url = ?",
+                (self.scope(base_id, table_name), canonicalize_url(url))
+            ).fetchone()
+        if row is None:
+            return None
+        return {"url": row[0], "record_id": row[1], "site_name": row[2]}
+
+    def add(self, base_id: str, table_name: str, url: str, record_id: str = None, site_name: str = ""):
+        """새로 저장된 레코드를 인덱스에 추가"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO urls (scope, normalized_url, url, record_id, site_name) VALUES (?, ?, ?, ?, ?)",
+                (self.scope(base_id, table_name), canonicalize_url(url), url, record_id, site_name)
+            )
+            self.conn.commit()
+
+    def remove(self, base_id: str, table_name: str, url: str):
+        """Airtable에서 삭제된 레코드를 인덱스에서 제거"""
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM urls WHERE scope = ? AND normalized_url = ?",
+                (self.scope(base_id, table_name), canonicalize_url(url))
+            )
+            self.conn.commit()
+
+    def count(self, base_id: str, table_name: str) -> int:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM urls WHERE scope = ?",
+                (self.scope(base_id, table_name),)
+            ).fetchone()[0]
+
+    def is_warm(self, base_id: str, table_name: str) -> bool:
+        """워밍된 적이 있고 아직 만료되지 않았는지 확인"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT warmed_at, canon_version FROM warm_state WHERE scope = ?",
+                (self.scope(base_id, table_name),)
+            ).fetchone()
+        if row is None:
+            return False
+        # URL 정규화 규칙이 바뀌었으면 다시 만들어야 함
+        if row[1] != CANON_VERSION:
+            return False
+        return time.time() - row[0] < URL_INDEX_MAX_AGE_HOURS * 3600
+
+    def warm_from_airtable(self, api_key: str, base_id: str, table_name: str, force: bool = False) -> bool:
+        """
+        Airtable 전체 레코드(페이지네이션)로 인덱스를 채웁니다.
+        이미 워밍되어 있으면 force=True가 아닌 이상 아무것도 하지 않습니다.
+        """
+        if not force and self.is_warm(base_id, table_name):
+            return True
+
+        print(f"🔍 URL 인덱스 워밍 중: {base_id}/{table_name}")
+        result = fetch_all_airtable_records(api_key, base_id, table_name, fields=["URL", "사이트 이름"])
+        if not result["success"]:
+            print(f"❌ URL 인덱스 워밍 실패: {result['error']}")
+            return False
+
+        scope = self.scope(base_id, table_name)
+        records = [record for record in result["records"] if record.get('fields', {}).get('URL')]
+        urls = [record['fields']['URL'] for record in records]
+        rows = [
+            (scope, canonical, url, record.get('id'), record['fields'].get('사이트 이름', ''))
+            for record, url, canonical in zip(records, urls, canonicalize_urls(urls))
+        ]
+
+        with self.lock:
+            self.conn.execute("DELETE FROM urls WHERE scope = ?", (scope,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO urls (scope, normalized_url, url, record_id, site_name) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO warm_state (scope, warmed_at, record_count, canon_version) VALUES (?, ?, ?, ?)",
+                (scope, time.time(), len(result["records"]), CANON_VERSION)
+            )
+            self.conn.commit()
+
+        print(f"📋 URL 인덱스 워밍 완료: 레코드 {len(result['records'])}개, URL {len(rows)}개")
+        return True
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_url_index = None
+_url_index_lock = threading.Lock()
+
+def get_url_index() -> UrlIndex:
+    """프로세스 전체에서 공유하는 URL 인덱스"""
+    global _url_index
+    with _url_index_lock:
+        if _url_index is None:
+            _url_index = UrlIndex()
+        return _url_index
@@ -0,0 +1,313 @@
+# url_jobs.py - 작업 큐의 URL 하나를 단계별로 처리 (크롤링 → Gemini 요약 → TTS → Airtable 저장 → 텔레그램)
+# 단계를 마칠 때마다 job_queue에 결과를 기록하므로, 재시작 후 다시 가져간 작업은 끝난 단계를 건너뜀
+# 디스코드 봇(main.py)과 별도 워커 프로세스(worker.py)가 같은 함수로 작업을 처리
+# TTS_BACKGROUND=true면 TTS 없이 먼저 저장·전송하고, 음성은 별도 작업(meta["kind"]="tts")으로 만들어 나중에 레코드에 채움
+
+import asyncio
+import contextlib
+import os
+from typing import Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+from job_queue import JobQueue, stage_done
+from pipeline import run_blocking
+from sub1 import extract_text_from_url_async, gemini_extract_notion_fields_async, fields_for_airtable, SummaryUnavailable
+from sub2 import send_to_airtable_async, send_to_telegram_async, update_airtable_record_async
+from sub3 import process_script_to_tts_google_drive
+from url_index import get_url_index
+
+# 환경 변수 로드
+load_dotenv()
+
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+AIRTABLE_API_KEY = os.getenv('AIRTABLE_API_KEY')
+AIRTABLE_BASE_ID = os.getenv('AIRTABLE_BASE_ID')
+AIRTABLE_TABLE_NAME = os.getenv('AIRTABLE_TABLE_NAME')
+CHECK_DUPLICATES = os.getenv('CHECK_DUPLICATES', 'true').lower() == 'true'
+UPDATE_IF_DUPLICATE = os.getenv('UPDATE_IF_DUPLICATE', 'false').lower() == 'true'
+# TTS를 결과 저장·전송 뒤의 별도 작업으로 미룸 (첫 결과가 TTS/업로드 시간만큼 빨라짐)
+TTS_BACKGROUND = os.getenv('TTS_BACKGROUND', 'false').lower() == 'true'
+
+TTS_VOICE = "en-US-Journey-F"  # 여성, 따뜻하고 자연스러운
+# 음성을 나중에 만들 때 먼저 저장해 두는 TTS_URL 값 / 나중에 채우는 필드
+TTS_PENDING = "생성 중"
+TTS_FIELDS = ("TTS_URL", "TTS_파일명", "Drive_파일ID")
+
+# 각 단계를 시작할 때 상태 메시지에 표시할 문구
+STAGE_LABELS = {
+    "fetched": "📄 **웹사이트 내용 추출 중...**",
+    "summarized": "🤖 **AI 분석 중...**",
+    "tts_done": "🎙️ **TTS 음성 생성 중...**",
+    "stored": "💾 **데이터 저장 중...**",
+    "notified": "📨 **텔레그램 전송 중...**",
+}
+
+ACTION_TEXT = {
+    "created": "새로 추가",
+    "updated": "업데이트됨",
+    "skipped": "중복으로 건너뜀"
+}
+
+class JobFailed(Exception):
+    """다시 시도해도 소용없는 실패 (Airtable 저장 거부 등)"""
+
+def has_tts_url(fields: Dict) -> bool:
+    return bool(fields.get("TTS_URL")) and "http" in fields.get("TTS_URL", "")
+
+def tts_pending(fields: Dict) -> bool:
+    return fields.get("TTS_URL") == TTS_PENDING
+
+def simple_duplicate_check(api_key: str, base_id: str, table_name: str, url: str) -> bool:
+    """간단한 중복 확인 - True면 중복 있음, False면 중복 없음 (로컬 URL 인덱스 사용)"""
+    try:
+        print(f"🔍 간단 중복 확인: {url}")
+        
+        url_index = get_url_index()
+        
+        # 처음 한 번(또는 만료 시)만 Airtable 전체를 읽어와 인덱스를 채움
+        if not url_index.warm_from_airtable(api_key, base_id, table_name):
+            print(f"❌ Airtable 조회 실패")
+            return False
+        
+        existing = url_index.lookup(base_id, table_name, url)
+        if existing:
+            print(f"⚠️ 중복 발견! 기존: {existing.get('site_name') or 'N/A'}")
+            return True
+        
+        print(f"✅ 중복 없음")
+        return False
+        
+    except Exception as e:
+        print(f"❌ 중복 확인 오류: {str(e)}")
+        return False
+
+def add_tts_fields(fields: Dict) -> Dict:
+    """영어 스크립트를 TTS로 변환해 결과 필드를 채움 (블로킹 - 워커 스레드에서 호출)"""
+    english_script = fields.get('Script', '')
+    if not (english_script and english_script.strip()):
+        print("⚠️ 영어 스크립트가 없어서 TTS 건너뜀")
+        fields.update({"TTS_URL": "스크립트 없음", "TTS_파일명": "", "Drive_파일ID": ""})
+        return fields
+
+    tts_result = process_script_to_tts_google_drive(english_script, voice_name=TTS_VOICE, site_name=fields.get('사이트 이름', ''))
+    if tts_result["success"]:
+        print(f"✅ TTS 변환 성공: {tts_result['audio_url']}")
+        fields.update({"TTS_URL": tts_result["audio_url"], "TTS_파일명": tts_result["filename"], "Drive_파일ID": tts_result.get("file_id", "")})
+    else:
+        print("❌ TTS 변환 실패")
+        fields.update({"TTS_URL": "TTS 생성 실패", "TTS_파일명": "", "Drive_파일ID": ""})
+    return fields
+
+def telegram_message(fields: Dict, airtable_result: Dict, url: str) -> str:
+    action_text = ACTION_TEXT.get(airtable_result["action"], "처리됨")
+    message = f"📝 웹사이트 정보 ({action_text})\n\n{fields.get('요약 설명', '')}\n\n{fields.get('URL', url)}"
+    # TTS URL이 있으면 텔레그램 메시지에 추가
+    if has_tts_url(fields):
+        message += f"\n\n🎙️ 영어 음성: {fields['TTS_URL']}"
+    return message
+
+async def run_url_job(queue: JobQueue, job: Dict, on_stage: Optional[Callable[[Dict, str], Awaitable]] = None,
+                      stage_limits: Optional[Dict[str, asyncio.Semaphore]] = None) -> Dict:
+    """
+    끝나지 않은 단계를 순서대로 실행하고 단계마다 체크포인트를 남김, 끝나면 작업을 완료 처리하고 job["data"] 반환
+    on_stage(job, stage): 단계를 시작할 때 호출 (시작한 단계는 큐에도 기록되므로 다른 프로세스에서도 볼 수 있음)
+    stage_limits: 단계 이름 → 세마포어 (여러 작업을 동시에 처리할 때 단계별 동시 실행 수 제한)
+    meta["skip_duplicates"]가 있으면 시작 전에 이미 저장된 URL인지 확인하고, 중복이면 data["duplicate"]만 남기고 완료
+    meta["include_tts"] / meta["notify"]가 False면 TTS / 텔레그램 단계는 하지 않고 넘어감
+    meta["background_tts"](기본 TTS_BACKGROUND)면 TTS 필드를 TTS_PENDING으로 저장하고, 마지막에 TTS 작업을 큐에 추가
+    SummaryUnavailable / JobFailed / 그 밖의 예외는 그대로 올리므로 호출한 쪽에서 defer / fail 처리
+    """
+    url = job["url"]
+    data = job["data"]
+    meta = job["meta"]
+    stage_limits = stage_limits or {}
+
+    def slot(stage):
+        return stage_limits.get(stage) or contextlib.nullcontext()
+
+    async def start(stage):
+        print(f"▶️ [작업 {job['id']}] {stage} 단계: {url}")
+        await asyncio.to_thread(queue.report_progress, job, stage)
+        if on_stage:
+            await on_stage(job, stage)
+
+    if job["stage"] == "queued" and job["meta"].get("skip_duplicates"):
+        if await run_blocking(simple_duplicate_check, AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME, url):
+            await asyncio.to_thread(queue.checkpoint, job, "queued", duplicate=True)
+            await asyncio.to_thread(queue.complete, job)
+            print(f"⏭️ [작업 {job['id']}] 이미 저장된 URL이라 건너뜀: {url}")
+            return data
+
+    if not stage_done(job, "fetched"):
+        async with slot("fetched"):
+            await start("fetched")
+            text = await extract_text_from_url_async(url)
+            print(f"추출된 텍스트 길이: {len(text)}")
+            await asyncio.to_thread(queue.checkpoint, job, "fetched", text=text)
+
+    if not stage_done(job, "summarized"):
+        async with slot("summarized"):
+            await start("summarized")
+            notion_data = await gemini_extract_notion_fields_async(data.get("text", ""), url, GEMINI_API_KEY)
+            fields = fields_for_airtable(notion_data)
+            # 요약이 끝나면 본문은 더 필요 없음
+            await asyncio.to_thread(queue.checkpoint, job, "summarized", fields=fields, text=None)
+
+    if not stage_done(job, "tts_done"):
+        script = data["fields"].get("Script", "")
+        if meta.get("include_tts", True) and meta.get("background_tts", TTS_BACKGROUND) and script.strip():
+            fields = dict(data["fields"], **{"TTS_URL": TTS_PENDING, "TTS_파일명": "", "Drive_파일ID": ""})
+            await asyncio.to_thread(queue.checkpoint, job, "tts_done", fields=fields)
+        elif meta.get("include_tts", True):
+            async with slot("tts_done"):
+                await start("tts_done")
+                fields = await run_blocking(add_tts_fields, dict(data["fields"]))
+                await asyncio.to_thread(queue.checkpoint, job, "tts_done", fields=fields)
+        else:
+            await asyncio.to_thread(queue.checkpoint, job, "tts_done")
+
+    if not stage_done(job, "stored"):
+        async with slot("stored"):
+            await start("stored")
+            # 이전 시도가 저장 직후 종료됐을 수 있으므로 다시 가져간 작업은 항상 중복 확인
+            resumed = job["claims"] > 1
+            airtable_result = await send_to_airtable_async(
+                AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME, data["fields"],
+                check_duplicates=meta.get("check_duplicates", CHECK_DUPLICATES) or resumed,
+                update_if_duplicate=UPDATE_IF_DUPLICATE
+            )
+            if not airtable_result["success"]:
+                raise JobFailed(airtable_result.get("message", "Airtable 저장 실패"))
+            await asyncio.to_thread(queue.checkpoint, job, "stored", airtable_result=airtable_result)
+
+    if not stage_done(job, "notified"):
+        if meta.get("notify", True):
+            async with slot("notified"):
+                await start("notified")
+                telegram_success = await send_to_telegram_async(
+                    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, telegram_message(data["fields"], data["airtable_result"], url)
+                )
+                await asyncio.to_thread(queue.checkpoint, job, "notified", telegram_success=telegram_success)
+        else:
+            await asyncio.to_thread(queue.checkpoint, job, "notified")
+
+    if tts_pending(data["fields"]) and "tts_job" not in data:
+        await asyncio.to_thread(enqueue_tts_job, queue, job)
+
+    await asyncio.to_thread(queue.complete, job)
+    print(f"✅ [작업 {job['id']}] 모든 단계 완료: {url}")
+    return data
+
+def enqueue_tts_job(queue: JobQueue, job: Dict):
+    """저장한 레코드의 음성을 만드는 작업을 추가 (레코드를 새로 쓰지 않았으면 TTS 필드만 비움)"""
+    data = job["data"]
+    airtable_result = data["airtable_result"]
+    if airtable_result.get("action") not in ("created", "updated") or not airtable_result.get("record_id"):
+        queue.checkpoint(job, job["stage"], fields=dict(data["fields"], TTS_URL=""), tts_job=None)
+        return
+    meta = {key: value for key, value in job["meta"].items() if key != "skip_duplicates"}
+    meta.update(kind="tts", parent=job["id"], record_id=airtable_result["record_id"])
+    # 작업 추가와 tts_job 기록을 한 번에 (그 사이에 죽어도 다시 처리할 때 TTS 작업이 두 개 생기지 않음)
+    tts_job = queue.enqueue_followup(job, "tts_job", meta, {
+        "fields": data["fields"], "airtable_result": airtable_result, "telegram_success": data.get("telegram_success")
+    })
+    print(f"🎙️ [작업 {job['id']}] 음성은 작업 {tts_job}에서 생성")
+
+async def run_tts_job(queue: JobQueue, job: Dict, on_stage=None, stage_limits=None) -> Dict:
+    """
+    TTS 작업 - 음성을 만들고(tts_done) Airtable 레코드의 TTS 필드를 채움(stored)
+    job["data"]에는 원래 작업의 fields / airtable_result / telegram_success가 있어 결과 메시지를 다시 그릴 수 있음
+    """
+    data = job["data"]
+    stage_limits = stage_limits or {}
+
+    async def start(stage):
+        print(f"▶️ [작업 {job['id']}] TTS {stage} 단계: {job['url']}")
+        await asyncio.to_thread(queue.report_progress, job, stage)
+        if on_stage:
+            await on_stage(job, stage)
+
+    if not stage_done(job, "tts_done"):
+        async with stage_limits.get("tts_done") or contextlib.nullcontext():
+            await start("tts_done")
+            fields = await run_blocking(add_tts_fields, dict(data["fields"]))
+            await asyncio.to_thread(queue.checkpoint, job, "tts_done", fields=fields)
+
+    if not stage_done(job, "stored"):
+        async with stage_limits.get("stored") or contextlib.nullcontext():
+            await start("stored")
+            updated = await update_airtable_record_async(
+                AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME, job["meta"]["record_id"],
+                {key: data["fields"].get(key, "") for key in TTS_FIELDS}
+            )
+            if not updated:
+                raise JobFailed("Airtable TTS 필드 업데이트 실패")
+            await asyncio.to_thread(queue.checkpoint, job, "notified")
+
+    await asyncio.to_thread(queue.complete, job)
+    print(f"✅ [작업 {job['id']}] 음성 생성 완료: {data['fields'].get('TTS_URL')}")
+    return data
+
+async def process_job(queue: JobQueue, job: Dict, on_stage=None, stage_limits=None) -> Dict:
+    """
+    run_url_job을 실행하고 결과에 따라 작업 상태를 정리
+    반환: {"status": "done" | "deferred" | "failed", "data": ..., "retry_in": 초, "error": ...}
+    """
+    runner = run_tts_job if job["meta"].get("kind") == "tts" else run_url_job
+    try:
+        data = await runner(queue, job, on_stage, stage_limits)
+        return {"status": "done", "data": data}
+    except SummaryUnavailable as e:
+        # 끝난 단계는 그대로 두고 나중에 요약부터 다시
+        retry_in = await asyncio.to_thread(queue.defer, job, str(e))
+        if retry_in is None:
+            return {"status": "failed", "data": job["data"], "error": str(e)}
+        print(f"⏸️ [작업 {job['id']}] {retry_in:.0f}초 후 다시 시도: {job['url']}")
+        return {"status": "deferred", "data": job["data"], "retry_in": retry_in, "error": str(e)}
+    except Exception as e:
+        print(f"❌ [작업 {job['id']}] 실패: {str(e)}")
+        if not isinstance(e, JobFailed):
+            import traceback
+            print(traceback.format_exc())
+        await asyncio.to_thread(queue.fail, job, str(e))
+        return {"status": "failed", "data": job["data"], "error": str(e)}
+
+async def consume_queue(queue: JobQueue, worker_id: str = None, source: str = None, concurrency: int = 3,
+                        poll_seconds: float = 30.0, wakeup: asyncio.Event = None, stop: asyncio.Event = None,
+                        on_stage=None, on_finish: Optional[Callable[[Dict], None]] = None, stage_limits=None):
+    """
+    큐에서 작업을 가져와 concurrency개까지 동시에 process_job으로 처리
+    가져갈 작업이 없으면 wakeup이 설정되거나 poll_seconds가 지날 때까지 대기 (미뤄둔 작업 재시도용)
+    stop이 설정되면 새 작업은 가져가지 않고 진행 중인 작업을 마친 뒤 반환
+    on_finish(job): 작업 하나가 끝날 때마다 호출 (완료/미룸/실패 모두)
+    stage_limits: run_url_job 참고 (concurrency는 동시에 들고 있는 작업 수, stage_limits는 그중 각 단계를 실행 중인 수)
+    """
+    wakeup = wakeup or asyncio.Event()
+    stop = stop or asyncio.Event()
+    running = set()
+
+    async def run(job):
+        try:
+            await process_job(queue, job, on_stage, stage_limits)
+        finally:
+            wakeup.set()
+            if on_finish:
+                on_finish(job)
+
+    while not stop.is_set():
+        wakeup.clear()
+        while len(running) < concurrency:
+            job = await asyncio.to_thread(queue.claim, worker_id, source)
+            if job is None:
+                break
+            task = asyncio.create_task(run(job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        waiters = [asyncio.create_task(wakeup.wait()), asyncio.create_task(stop.wait())]
+        await asyncio.wait(waiters, timeout=poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waiters:
+            waiter.cancel()
+
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,94 @@
+# url_utils.py - 중복 확인용 URL 정규화 (모든 중복 확인 경로에서 공통으로 사용)
+
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, List, Set
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+URL_CANON_CACHE_SIZE = int(os.getenv('URL_CANON_CACHE_SIZE', '4096'))
+
+# 정규화 규칙이 바뀌면 올려서 로컬 URL 인덱스를 다시 만들게 함
+CANON_VERSION = "1"
+
+# 제거할 추적용 쿼리 파라미터
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', 'ref', 'ref_src', '_hsenc', '_hsmi'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def is_tracking_param(key: str) -> bool:
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+@lru_cache(maxsize=URL_CANON_CACHE_SIZE)
+def canonicalize_url(url: str) -> str:
+    """
+    URL을 비교 가능한 형태로 정규화합니다. (대소문자 구분 없음)
+    - http/https 통일 (https로), 프로토콜이 없으면 https 추가
+    - 호스트 소문자화, www. 제거, IDN(한글 도메인 등)은 punycode로 변환
+    - 기본 포트(:80, :443) 제거
+    - 끝의 슬래시 및 중복 슬래시 제거
+    - 추적용 파라미터(utm_*, fbclid, ref 등) 제거, 나머지는 정렬
+    - #fragment 제거
+    """
+    if not url:
+        return ""
+
+    url = url.strip().lower()
+    if not url:
+        return ""
+
+    if '://' not in url:
+        url = 'https://' + url
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme
+    if scheme in DEFAULT_PORTS:
+        scheme = 'https'
+
+    host = (parts.hostname or '').rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        host = host.encode('idna').decode('ascii')
+    except UnicodeError:
+        pass
+
+    netloc = host
+    if port and port != DEFAULT_PORTS.get(parts.scheme):
+        netloc = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not is_tracking_param(k)]
+    query.sort()
+
+    canonical = f"{scheme}://{netloc}{path}"
+    if query:
+        canonical += '?' + urlencode(query)
+    return canonical
+
+def canonicalize_urls(urls: Iterable[str]) -> List[str]:
+    """
+    여러 URL을 한 번에 정규화합니다. (마이그레이션용)
+    같은 URL은 한 번만 계산하고, 입력 순서대로 결과를 돌려줍니다.
+    """
+    urls = list(urls)
+    unique = {url: canonicalize_url(url) for url in set(urls)}
+    return [unique[url] for url in urls]
+
+def canonical_url_set(urls: Iterable[str]) -> Set[str]:
+    """정규화된 URL 집합 (빈 값 제외)"""
+    return {url for url in canonicalize_urls(urls) if url}
@@ -0,0 +1,120 @@
+# worker.py - 작업 큐를 처리하는 워커 프로세스
+# 디스코드 봇(main.py)을 JOB_RUNNER=worker로 실행하면 봇은 URL을 큐에 넣고 상태 메시지만 갱신하고,
+# 크롤링/요약/TTS/저장/전송은 이 스크립트가 띄운 프로세스들이 나눠서 처리 (진행 상황은 큐에 기록 → 봇이 읽어서 표시)
+# 사용법: python worker.py [프로세스 수]
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from dotenv import load_dotenv
+from job_queue import JobQueue, default_worker_id
+from pipeline import shutdown_executor
+from rate_limit import share_rate_limits
+from url_jobs import consume_queue
+
+# 환경 변수 로드
+load_dotenv()
+
+# 띄울 프로세스 수 / 프로세스 하나가 동시에 처리할 작업 수
+WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', '2'))
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '3'))
+# 처리할 작업 출처 (비우면 전부)
+WORKER_SOURCE = os.getenv('WORKER_SOURCE', 'discord') or None
+# 봇이 새 작업을 알려줄 수 없으므로 이 간격(초)마다 큐를 확인
+WORKER_POLL_SECONDS = float(os.getenv('WORKER_POLL_SECONDS', '2'))
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def requeue_dead_workers(queue: JobQueue) -> int:
+    """
+    이 컴퓨터에서 작업을 가져간 채 종료된 워커(프로세스가 없는 워커)의 작업을 바로 대기열로 돌림
+    다른 컴퓨터의 워커 작업은 기한(JOB_LEASE_SECONDS)이 지나면 다시 가져감
+    """
+    prefix = f"{socket.gethostname()}:"
+    dead = []
+    for worker in queue.running_workers():
+        pid = worker[len(prefix):] if worker.startswith(prefix) else ""
+        if pid.isdigit() and int(pid) != os.getpid() and not is_process_alive(int(pid)):
+            dead.append(worker)
+    return queue.requeue_running(dead) if dead else 0
+
+async def run_worker(queue: JobQueue, worker_id: str, concurrency: int = WORKER_CONCURRENCY, source: str = WORKER_SOURCE,
+                     poll_seconds: float = WORKER_POLL_SECONDS, stop: asyncio.Event = None):
+    """stop이 설정될 때까지 큐의 작업을 처리 (설정되면 진행 중인 작업을 마치고 반환)"""
+    print(f"👷 워커 {worker_id} 시작 (동시 처리 {concurrency}개, 출처 {source or '전체'})")
+    await consume_queue(queue, worker_id=worker_id, source=source, concurrency=concurrency,
+                        poll_seconds=poll_seconds, stop=stop)
+    print(f"👋 워커 {worker_id} 종료")
+
+def worker_process(processes: int):
+    """자식 프로세스 진입점 - SIGTERM을 받으면 진행 중인 작업을 마치고 종료"""
+    # API 한도는 프로세스마다 따로 세므로 전체 한도를 프로세스 수로 나눠 씀
+    share_rate_limits(processes)
+    queue = JobQueue()
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, stop.set)
+        loop.add_signal_handler(signal.SIGINT, stop.set)
+        await run_worker(queue, default_worker_id(), stop=stop)
+
+    try:
+        asyncio.run(main())
+    finally:
+        queue.close()
+        shutdown_executor(wait=False)
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else WORKER_PROCESSES
+
+    queue = JobQueue()
+    resumed = requeue_dead_workers(queue)
+    queue.close()
+    if resumed:
+        print(f"🗃️ 종료된 워커가 처리 중이던 작업 {resumed}개를 다시 대기열에 넣었습니다.")
+
+    # 부모 프로세스의 스레드/DB 연결을 물려받지 않도록 spawn으로 시작
+    context = multiprocessing.get_context("spawn")
+    workers = {}
+
+    def start(index):
+        process = context.Process(target=worker_process, args=(processes,), name=f"worker-{index}")
+        process.start()
+        workers[index] = process
+
+    print(f"🚀 워커 프로세스 {processes}개 시작")
+    for index in range(processes):
+        start(index)
+    try:
+        # 비정상 종료한 프로세스는 다시 띄움 (처리 중이던 작업은 다음 프로세스가 이어서 처리)
+        while True:
+            time.sleep(5)
+            for index, process in list(workers.items()):
+                if not process.is_alive():
+                    print(f"⚠️ {process.name} 종료됨 (코드 {process.exitcode}) - 다시 시작")
+                    queue = JobQueue()
+                    requeue_dead_workers(queue)
+                    queue.close()
+                    start(index)
+    except KeyboardInterrupt:
+        print("🛑 종료 요청 - 진행 중인 작업을 마치는 중...")
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()
+        for process in workers.values():
+            process.join()
+
+if __name__ == "__main__":
+    main()